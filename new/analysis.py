@@ -0,0 +1,478 @@
+'''
+Static analysis of the compiled patterns of the rules. The patterns are parsed with the standard library's regex parser, which understands everything the
+rules use, including the variable-width lookbehinds only the regex module can compile.
+'''
+
+import re
+from typing import Optional
+
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+def parse(pattern: str) -> sre_parse.SubPattern:
+    '''
+    Parses a pattern into the standard library's parse tree.
+
+    Parameters
+    ----------
+    pattern : str
+        The pattern to parse.
+
+    Returns
+    -------
+    sre_parse.SubPattern
+        The parsed pattern.
+    '''
+
+    return sre_parse.parse(pattern)
+
+def characters(items: list) -> Optional[frozenset[str]]:
+    '''
+    Returns the characters matched by the items of a character class, or None if the class is negated or uses a category like '\\w'.
+
+    Parameters
+    ----------
+    items : list
+        The items of an IN node.
+
+    Returns
+    -------
+    frozenset[str] | None
+        The matched characters.
+    '''
+
+    chars: set[str] = set()
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            chars.add(chr(av))
+        elif op is sre_parse.RANGE and av[1] - av[0] < 256:
+            chars.update(chr(i) for i in range(av[0], av[1] + 1))
+        else:
+            return None
+    return frozenset(chars)
+
+def _required(nodes) -> list[frozenset[str]]:
+    '''
+    Returns the clauses required by a sequence of nodes. See required_characters().
+    '''
+
+    clauses: list[frozenset[str]] = []
+    for op, av in nodes:
+        if op is sre_parse.LITERAL:
+            clauses.append(frozenset(chr(av)))
+        elif op is sre_parse.IN:
+            chars = characters(av)
+            if chars:
+                clauses.append(chars)
+        elif op is sre_parse.SUBPATTERN:
+            clauses.extend(_required(av[-1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, 'POSSESSIVE_REPEAT', None)):
+            if av[0] > 0:
+                clauses.extend(_required(av[2]))
+        elif op is sre_parse.ASSERT:
+            clauses.extend(_required(av[1]))
+        elif op is getattr(sre_parse, 'ATOMIC_GROUP', None):
+            clauses.extend(_required(av))
+        elif op is sre_parse.BRANCH:
+            # At least one of the branches has to match, so the smallest clause of each branch can be combined into a single clause. If any branch requires
+            # nothing, then neither does the alternation as a whole.
+            combined: set[str] = set()
+            for branch in av[1]:
+                options = _required(branch)
+                if not options:
+                    break
+                combined.update(min(options, key=len))
+            else:
+                clauses.append(frozenset(combined))
+    return clauses
+
+def required_characters(pattern: str) -> tuple[frozenset[str], ...]:
+    '''
+    Works out which characters a word has to contain for the pattern to be able to match it. The result is a list of clauses, each of which is a set of
+    characters at least one of which has to be present. For example, 'k(?=s|t)' gives ({'k'}, {'s', 't'}).
+
+    Parameters
+    ----------
+    pattern : str
+        The pattern to analyze.
+
+    Returns
+    -------
+    tuple[frozenset[str], ...]
+        The clauses, smallest (and so most selective) first, without any that are implied by another. A pattern which could match any word gives an empty
+        tuple.
+    '''
+
+    clauses = sorted(set(_required(parse(pattern))), key=len)
+    return tuple(c for i, c in enumerate(clauses) if not any(d <= c for d in clauses[:i]))
+
+def character_mapping(pattern: str, repl: str) -> Optional[tuple[frozenset[str], str]]:
+    '''
+    Checks whether a rule unconditionally replaces single characters with a fixed string of at most one character, as in 'ʦ' > 's' or 'θ|ð' > ''. Such
+    rules don't depend on context, so they can be carried out with str.translate.
+
+    Parameters
+    ----------
+    pattern : str
+        The pattern of the rule.
+    repl : str
+        The replacement string of the rule.
+
+    Returns
+    -------
+    tuple[frozenset[str], str] | None
+        The characters which are replaced and what they're replaced with, or None if the rule isn't a simple mapping.
+    '''
+
+    if len(repl) > 1 or '\\' in repl:
+        return None
+    nodes = list(parse(pattern))
+    if len(nodes) != 1:
+        return None
+    op, av = nodes[0]
+    if op is sre_parse.LITERAL:
+        return frozenset(chr(av)), repl
+    if op is sre_parse.IN:
+        chars = characters(av)
+        if chars:
+            return chars, repl
+    return None
+
+def _referenced(nodes) -> Optional[set[str]]:
+    '''
+    Returns every character a sequence of nodes tests for, or None if it uses anything other than literal characters, like a category or a backreference.
+    '''
+
+    chars: set[str] = set()
+    for op, av in nodes:
+        if op in (sre_parse.LITERAL, sre_parse.NOT_LITERAL):
+            chars.add(chr(av))
+        elif op is sre_parse.IN:
+            members = characters([item for item in av if item[0] is not sre_parse.NEGATE])
+            if members is None:
+                return None
+            chars.update(members)
+        elif op in (sre_parse.ANY, sre_parse.AT):
+            continue
+        else:
+            if op is sre_parse.BRANCH:
+                children = av[1]
+            elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+                children = [av[1]]
+            elif op is sre_parse.SUBPATTERN:
+                children = [av[-1]]
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+                children = [av[2]]
+            else:
+                return None
+            for child in children:
+                referenced = _referenced(child)
+                if referenced is None:
+                    return None
+                chars.update(referenced)
+    return chars
+
+def referenced_characters(pattern: str) -> Optional[frozenset[str]]:
+    '''
+    Returns every character a pattern tests for, whether it consumes it or only looks at it.
+
+    Parameters
+    ----------
+    pattern : str
+        The pattern to analyze.
+
+    Returns
+    -------
+    frozenset[str] | None
+        The characters, or None if the pattern uses anything other than literal characters, like a category or a backreference.
+    '''
+
+    referenced = _referenced(parse(pattern))
+    return None if referenced is None else frozenset(referenced)
+
+def substitution(pattern: str, repl: str) -> Optional[tuple[frozenset[str], str, frozenset[str]]]:
+    '''
+    Checks whether a rule replaces a single character with another single character, with any conditions on its surroundings expressed through anchors and
+    lookarounds, as in 'b$' > 'p' or '(?<!/)ɛ' > 'e'.
+
+    Parameters
+    ----------
+    pattern : str
+        The pattern of the rule.
+    repl : str
+        The replacement string of the rule.
+
+    Returns
+    -------
+    tuple[frozenset[str], str, frozenset[str]] | None
+        The characters which are replaced, what they're replaced with, and every character the lookarounds test for, or None if the rule isn't a single
+        character substitution.
+    '''
+
+    if len(repl) != 1 or '\\' in repl:
+        return None
+    consumed: Optional[frozenset[str]] = None
+    context: set[str] = set()
+    for op, av in parse(pattern):
+        if op in (sre_parse.LITERAL, sre_parse.IN) and consumed is None:
+            consumed = frozenset(chr(av)) if op is sre_parse.LITERAL else characters(av)
+            if consumed is None:
+                return None
+        elif op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            referenced = _referenced([(op, av)])
+            if referenced is None:
+                return None
+            context.update(referenced)
+        else:
+            return None
+    if consumed is None:
+        return None
+    return consumed, repl, frozenset(context)
+
+def commute(substitutions: list[tuple[frozenset[str], str, frozenset[str]]]) -> bool:
+    '''
+    Checks whether a group of single character substitutions (see substitution()) can be applied in a single pass with the same result as applying them
+    one after another. This is the case when none of them writes a character that another one reads, either as the character it replaces or in its
+    lookarounds: none of them can then feed or bleed another, and no two of them can match the same character.
+
+    Parameters
+    ----------
+    substitutions : list[tuple[frozenset[str], str, frozenset[str]]]
+        The substitutions, in order.
+
+    Returns
+    -------
+    bool
+        True if the substitutions commute.
+    '''
+
+    for i, (consumed, target, _) in enumerate(substitutions):
+        writes = consumed | {target}
+        for j, (other_consumed, _, other_context) in enumerate(substitutions):
+            if i != j and not writes.isdisjoint(other_consumed | other_context):
+                return False
+    return True
+
+def _lookaround_widths(nodes) -> tuple[int, int]:
+    '''
+    Returns the total maximum width of the lookbehinds and lookaheads in a sequence of nodes, including nested ones.
+    '''
+
+    behind = ahead = 0
+    for op, av in nodes:
+        if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            width = av[1].getwidth()[1]
+            if av[0] < 0:
+                behind += width
+            else:
+                ahead += width
+            children = [av[1]]
+        elif op is sre_parse.BRANCH:
+            children = av[1]
+        elif op is sre_parse.SUBPATTERN:
+            children = [av[-1]]
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            children = [av[2]]
+        else:
+            continue
+        for child in children:
+            nested_behind, nested_ahead = _lookaround_widths(child)
+            behind += nested_behind
+            ahead += nested_ahead
+    return behind, ahead
+
+def reach(pattern: str) -> Optional[tuple[int, int, int, int]]:
+    '''
+    Works out how far around the position it's tried at a pattern can look.
+
+    Parameters
+    ----------
+    pattern : str
+        The pattern to analyze.
+
+    Returns
+    -------
+    tuple[int, int, int, int] | None
+        The minimum and maximum number of characters a match consumes, the number of characters before the position the pattern can look at, and the number
+        of characters from the position onwards it can look at, or None if any of them is unbounded.
+    '''
+
+    parsed = parse(pattern)
+    low, high = parsed.getwidth()
+    behind, ahead = _lookaround_widths(parsed)
+    if max(high, behind, ahead) >= sre_parse.MAXREPEAT:
+        return None
+    return low, high, behind, high + ahead
+
+def _first(nodes) -> tuple[Optional[frozenset[str]], bool]:
+    '''
+    Returns the characters a match of a sequence of nodes can start with, or None if that can't be worked out, and whether the sequence can match the empty
+    string. Lookarounds and anchors are skipped over, as they don't consume anything.
+    '''
+
+    chars: set[str] = set()
+    for op, av in nodes:
+        if op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            continue
+        if op is sre_parse.LITERAL:
+            first, nullable = frozenset(chr(av)), False
+        elif op is sre_parse.IN:
+            first, nullable = characters(av), False
+        elif op is sre_parse.SUBPATTERN:
+            first, nullable = _first(av[-1])
+        elif op is sre_parse.BRANCH:
+            options = [_first(branch) for branch in av[1]]
+            first = None if any(o[0] is None for o in options) else frozenset().union(*(o[0] for o in options))
+            nullable = any(o[1] for o in options)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            first, nullable = _first(av[2])
+            nullable = nullable or av[0] == 0
+        else:
+            return None, True
+        if first is None:
+            return None, nullable
+        chars.update(first)
+        if not nullable:
+            return frozenset(chars), False
+    return frozenset(chars), True
+
+def _reversed(nodes) -> list:
+    '''
+    Reverses a sequence of nodes, including the ones nested inside it, so that _first() gives the characters a match can end with. Lookarounds are left
+    out, as they don't consume anything.
+    '''
+
+    result = []
+    for op, av in reversed(list(nodes)):
+        if op is sre_parse.SUBPATTERN:
+            av = (*av[:-1], _reversed(av[-1]))
+        elif op is sre_parse.BRANCH:
+            av = (av[0], [_reversed(branch) for branch in av[1]])
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            av = (av[0], av[1], _reversed(av[2]))
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            continue
+        result.append((op, av))
+    return result
+
+def _contradiction(nodes) -> Optional[str]:
+    '''
+    Looks for a lookaround in a sequence of nodes which contradicts what's consumed next to it. See contradiction().
+    '''
+
+    nodes = list(nodes)
+    for i, (op, av) in enumerate(nodes):
+        if op is sre_parse.ASSERT:
+            direction, lookaround = av
+            if direction > 0:
+                expected, expected_empty = _first(lookaround)
+                found, found_empty = _first(nodes[i + 1:])
+            else:
+                expected, expected_empty = _first(_reversed(lookaround))
+                found, found_empty = _first(_reversed(nodes[:i]))
+            if expected is not None and found is not None and not expected_empty and not found_empty and expected.isdisjoint(found):
+                kind = 'lookahead' if direction > 0 else 'lookbehind'
+                side = 'next' if direction > 0 else 'previous'
+                return f'the {kind} requires the {side} character to be one of {sorted(expected)}, but it is always one of {sorted(found)}'
+            reason = _contradiction(lookaround)
+        elif op is sre_parse.SUBPATTERN:
+            reason = _contradiction(av[-1])
+        elif op is sre_parse.BRANCH:
+            reasons = [_contradiction(branch) for branch in av[1]]
+            reason = reasons[0] if all(reasons) else None
+        else:
+            continue
+        if reason:
+            return reason
+    return None
+
+def contradiction(pattern: str) -> Optional[str]:
+    '''
+    Checks whether a pattern can never match because one of its lookarounds contradicts the characters consumed right next to it, as in '(?=o|u)g', where
+    the lookahead needs the next character to be a vowel but the pattern goes on to consume a 'g'.
+
+    Parameters
+    ----------
+    pattern : str
+        The pattern to analyze.
+
+    Returns
+    -------
+    str | None
+        A description of the contradiction, or None if none was found. A pattern without one can still be impossible to match.
+    '''
+
+    return _contradiction(parse(pattern))
+
+def _risks(nodes, risks: set[str], repeated: bool, lookaround: bool, widths: dict[int, tuple[int, int]]) -> None:
+    '''
+    Collects the backtracking risks of a sequence of nodes. See backtracking_risks(). widths holds the minimum and maximum widths of the groups seen so far.
+    '''
+
+    for op, av in nodes:
+        if op is sre_parse.GROUPREF:
+            if widths.get(av, (0, sre_parse.MAXREPEAT))[1] >= sre_parse.MAXREPEAT:
+                risks.add('backreference to an unbounded group, which is retried for every width the group can take')
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            unbounded = av[1] >= sre_parse.MAXREPEAT
+            if unbounded and repeated:
+                risks.add('nested unbounded repeats, which can backtrack exponentially')
+            elif unbounded and lookaround:
+                risks.add('unbounded repeat inside a lookaround, which is rescanned from every position the lookaround is tried at')
+            elif unbounded:
+                risks.add('unbounded repeat, which is rescanned from every position the pattern is tried at if what follows it fails')
+            _risks(av[2], risks, repeated or unbounded, lookaround, widths)
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            _risks(av[1], risks, repeated, True, widths)
+        elif op is sre_parse.SUBPATTERN:
+            if av[0] is not None:
+                widths[av[0]] = av[-1].getwidth()
+            _risks(av[-1], risks, repeated, lookaround, widths)
+        elif op is sre_parse.BRANCH:
+            for branch in av[1]:
+                _risks(branch, risks, repeated, lookaround, widths)
+
+def backtracking_risks(pattern: str) -> list[str]:
+    '''
+    Lists the constructs in a pattern which can make it take more than linear time in the length of the word. A pattern anchored to the start of the word
+    is only tried once, so its unbounded repeats aren't rescanned.
+
+    Parameters
+    ----------
+    pattern : str
+        The pattern to analyze.
+
+    Returns
+    -------
+    list[str]
+        A description of each risk, or an empty list if the pattern always runs in linear time.
+    '''
+
+    parsed = parse(pattern)
+    risks: set[str] = set()
+    _risks(parsed, risks, False, False, {})
+    if parsed and parsed[0] == (sre_parse.AT, sre_parse.AT_BEGINNING):
+        risks.discard('unbounded repeat, which is rescanned from every position the pattern is tried at if what follows it fails')
+    return sorted(risks)
+
+# A group reference or an escaped character in a replacement string.
+_escape = re.compile(r'\\(?:\d+|g<[^>]*>|(.))')
+
+def replacement_characters(repl: str) -> frozenset[str]:
+    '''
+    Returns the characters a replacement string writes itself, as opposed to the ones it copies from the match through group references.
+
+    Parameters
+    ----------
+    repl : str
+        The replacement string.
+
+    Returns
+    -------
+    frozenset[str]
+        The characters written by the replacement.
+    '''
+
+    return frozenset(_escape.sub(lambda m: {'n': '\n', 't': '\t'}.get(m[1], m[1] or ''), repl))
@@ -0,0 +1,144 @@
+'''
+An audit of the rules for catastrophic backtracking. Each rule is checked statically for constructs which can take more than linear time (see
+analysis.backtracking_risks()), and then stress tested with long words built to trigger them. Neither regex engine reports how many steps a match took, so
+the audit times each rule instead, and measures how that time grows as the words get longer. Run this file directly to print the results, worst first.
+'''
+
+import analysis
+import math
+import random
+import time
+import french_converter
+import rules
+from french_converter import CompiledRule, CompiledStage, Encoding
+from rules import Stage
+from typing import NamedTuple, Optional
+
+# The longest a rule can take on a single word before the audit gives up on it, in seconds.
+LIMIT = 1.0
+
+class AuditResult(NamedTuple):
+    '''
+    The result of stress testing a rule.
+
+    Attributes
+    ----------
+    rule_id : str
+        The id of the rule.
+    risks : list[str]
+        The risks found by analysis.backtracking_risks().
+    word : str
+        The input the rule took the longest on, decoded.
+    seconds : float
+        The time the rule took on that input, or LIMIT if it timed out.
+    growth : float
+        The exponent of the rule's running time in the length of that input: about 1 if the rule runs in linear time, 2 if it runs in quadratic time,
+        and so on. This is infinite if the rule timed out.
+    '''
+
+    rule_id: str
+    risks: list[str]
+    word: str
+    seconds: float
+    growth: float
+
+def adversarial_inputs(pattern: str, length: int, samples: int = 8) -> list[str]:
+    '''
+    Builds words designed to make a pattern backtrack from the characters it tests for: runs of each character on its own and followed by a character
+    which can't be part of the run, all of the characters in turn, and random strings of them.
+
+    Parameters
+    ----------
+    pattern : str
+        The pattern to build words for.
+    length : int
+        The length of the words.
+    samples : int
+        The number of random strings.
+
+    Returns
+    -------
+    list[str]
+        The words.
+    '''
+
+    chars = sorted(analysis.referenced_characters(pattern) or set('aeiou' + french_converter.MARKS))
+    words = []
+    for char in chars:
+        words.append(char * length)
+        words.append(char * (length - 1) + ('/' if char != '/' else 'a'))
+    words.append((''.join(chars) * length)[:length])
+    generator = random.Random(length)
+    words.extend(''.join(generator.choices(chars, k=length)) for _ in range(samples))
+    return words
+
+def _time(compiled: CompiledRule, word: str) -> float:
+    '''
+    Times a rule on a word, returning LIMIT if it times out.
+    '''
+
+    start = time.perf_counter()
+    try:
+        compiled.pattern.sub(compiled.rule.repl, word, timeout=LIMIT)
+    except TimeoutError:
+        return LIMIT
+    return time.perf_counter() - start
+
+def audit_rule(compiled: CompiledRule, encoding: Encoding, length: int = 500) -> AuditResult:
+    '''
+    Stress tests a rule compiled with the regex module.
+
+    Parameters
+    ----------
+    compiled : CompiledRule
+        The rule to audit.
+    encoding : Encoding
+        The encoding the rule was compiled against.
+    length : int
+        The length of the adversarial inputs. The input the rule takes the longest on is then timed again at twice the length to work out the growth.
+
+    Returns
+    -------
+    AuditResult
+        The result.
+    '''
+
+    pattern = compiled.pattern.pattern
+    words = adversarial_inputs(pattern, length)
+    seconds, worst = max((_time(compiled, word), i) for i, word in enumerate(words))
+    if seconds >= LIMIT:
+        growth = math.inf
+    else:
+        # The times are noisy, so the worst input is timed a few more times at both lengths, keeping the fastest.
+        seconds = min(seconds, *(_time(compiled, words[worst]) for _ in range(2)))
+        longer = min(_time(compiled, adversarial_inputs(pattern, length * 2)[worst]) for _ in range(3))
+        growth = math.inf if longer >= LIMIT else math.log2(max(longer, 1e-9) / max(seconds, 1e-9))
+    return AuditResult(compiled.rule.id, analysis.backtracking_risks(encoding.decode(pattern)), encoding.decode(words[worst]), seconds, growth)
+
+def audit(rulebook: Optional[dict[Stage, CompiledStage]] = None, length: int = 500) -> list[AuditResult]:
+    '''
+    Stress tests every rule.
+
+    Parameters
+    ----------
+    rulebook : dict[Stage, CompiledStage] | None
+        The compiled rules. Every pattern has to be compiled with the regex module, which is the only one to support timeouts. Defaults to the rules in
+        sound_changes.py compiled with the regex module.
+    length : int
+        The length of the adversarial inputs. See audit_rule().
+
+    Returns
+    -------
+    list[AuditResult]
+        The results, slowest first.
+    '''
+
+    rulebook = rulebook or french_converter.compile_rules(rules.load_rules(), backend='regex')
+    results = [audit_rule(compiled, stage.encoding, length) for stage in rulebook.values() for compiled in stage.rules]
+    return sorted(results, key=lambda result: result.seconds, reverse=True)
+
+if __name__ == '__main__':
+    print(f'{"rule":<45}{"worst (µs)":>12}{"growth":>8}  worst input, risks')
+    for result in audit():
+        sample = result.word[:12] + ('…' if len(result.word) > 12 else '')
+        print(f'{result.rule_id:<45}{result.seconds * 1e6:>12.1f}{result.growth:>8.2f}  {sample!r} {"; ".join(result.risks)}')
@@ -0,0 +1,466 @@
+'''
+A batch mode which evolves many words with a single regex pass per step. The words are joined into one buffer, one word per line, and every pattern is
+compiled with the MULTILINE flag, so '^' and '$' match at the start and end of each word. Nothing the rules match can match a line break, so no match
+or lookaround can reach into the next word, and running a step over the buffer gives the same result as running it over each word separately. The few
+patterns for which that can't be shown are still run over each word separately.
+'''
+
+import analysis
+import concurrent.futures
+import functools
+import french_converter
+import multiprocessing
+import re
+import regex
+import sys
+import threading
+from analysis import sre_parse
+from array import array
+from french_converter import CompiledStage, Step
+from rules import Stage
+from typing import Callable, Iterable, Iterator, Optional, Union, overload
+
+SEPARATOR = '\n'
+
+def line_safe(pattern: str) -> bool:
+    '''
+    Checks whether a pattern behaves the same on a buffer of words, one per line, compiled with the MULTILINE flag, as on each word separately. This is
+    the case when nothing in it can match a line break and it doesn't use anchors which only match at the very start or end of the string.
+
+    Parameters
+    ----------
+    pattern : str
+        The pattern to check.
+
+    Returns
+    -------
+    bool
+        True if the pattern can be run over a buffer.
+    '''
+
+    def safe(nodes) -> bool:
+        for op, av in nodes:
+            if op is sre_parse.NOT_LITERAL and av != ord(SEPARATOR):
+                return False
+            if op is sre_parse.IN:
+                negated = bool(av) and av[0][0] is sre_parse.NEGATE
+                chars = analysis.characters(av[1:] if negated else av)
+                if chars is None or (SEPARATOR in chars) != negated:
+                    return False
+            elif op is sre_parse.AT and av in (sre_parse.AT_BEGINNING_STRING, sre_parse.AT_END_STRING):
+                return False
+            elif op is sre_parse.BRANCH:
+                if not all(safe(branch) for branch in av[1]):
+                    return False
+            elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+                if not safe(av[1]):
+                    return False
+            elif op is sre_parse.SUBPATTERN:
+                # Inline flags could turn on DOTALL.
+                if av[1] or av[2] or not safe(av[-1]):
+                    return False
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, 'POSSESSIVE_REPEAT', None)):
+                if not safe(av[2]):
+                    return False
+            elif op is getattr(sre_parse, 'ATOMIC_GROUP', None):
+                if not safe(av):
+                    return False
+        return True
+
+    parsed = analysis.parse(pattern)
+    return not parsed.state.flags & (re.DOTALL | re.MULTILINE) and safe(parsed)
+
+class EvolvedBatch:
+    '''
+    The result of evolving a batch: a single buffer holding every evolved word, one per line, and the offset at which each word starts. Words are only
+    sliced out of the buffer when they're asked for.
+    '''
+
+    __slots__ = ('buffer', 'offsets')
+
+    def __init__(self, buffer: str, offsets: array) -> None:
+        '''
+        Parameters
+        ----------
+        buffer : str
+            The evolved words, separated by line breaks.
+        offsets : array
+            The offset of the start of each word, followed by the length of the buffer plus one.
+        '''
+
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, list[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('EvolvedBatch index out of range')
+        return self.buffer[self.offsets[index]:self.offsets[index + 1] - 1]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.buffer.split(SEPARATOR)) if len(self) else iter(())
+
+class BufferCascade:
+    '''
+    The cascade run over buffers of words, one word per line.
+    '''
+
+    def __init__(self, rulebook: Optional[dict[Stage, CompiledStage]] = None, concurrent: bool = False) -> None:
+        '''
+        Parameters
+        ----------
+        rulebook : dict[Stage, CompiledStage] | None
+            The compiled rules. Defaults to french_converter.compile_rulebook().
+        concurrent : bool
+            If True, the steps compiled with the regex module release the GIL while they run, so several threads can evolve buffers at the same time.
+        '''
+
+        self.rulebook = rulebook or french_converter.compile_rulebook()
+        self.encoding = self.rulebook[Stage.PROTO_WESTERN_ROMANCE].encoding
+        self.stages: dict[Stage, list[tuple[Callable[[str], str], tuple[frozenset[str], ...]]]] = {}
+        for stage, compiled in self.rulebook.items():
+            self.stages[stage] = [(self._buffered(step, concurrent), step.requires) for step in compiled.steps]
+
+    @staticmethod
+    def _buffered(step: Step, concurrent: bool = False) -> Callable[[str], str]:
+        '''
+        Returns a function which carries out a step over a whole buffer.
+        '''
+
+        if step.pattern is None:
+            # Translation tables never touch the separator.
+            return step.apply
+        if not line_safe(step.pattern.pattern):
+            return lambda buffer: SEPARATOR.join(map(step.apply, buffer.split(SEPARATOR)))
+        if isinstance(step.pattern, re.Pattern):
+            sub = re.compile(step.pattern.pattern, re.MULTILINE).sub
+        elif concurrent:
+            sub = functools.partial(regex.compile(step.pattern.pattern, regex.MULTILINE).sub, concurrent=True)
+        else:
+            sub = regex.compile(step.pattern.pattern, regex.MULTILINE).sub
+        if isinstance(step.repl, dict):
+            targets = step.repl
+            return lambda buffer: sub(lambda m: targets[m[0]], buffer)
+        repl = step.repl
+        return lambda buffer: sub(repl, buffer)
+
+    def evolve_buffer(self, buffer: str) -> str:
+        '''
+        Runs every step over a buffer of encoded words, skipping the steps none of the words can match.
+
+        Parameters
+        ----------
+        buffer : str
+            The words, in the internal encoding, separated by line breaks.
+
+        Returns
+        -------
+        str
+            The evolved words, in the same form.
+        '''
+
+        for buffer in self.stage_buffers(buffer):
+            pass
+        return buffer
+
+    def stage_buffers(self, buffer: str) -> Iterator[str]:
+        '''
+        Runs every step over a buffer of encoded words like evolve_buffer(), yielding the buffer as it stands at the end of each stage.
+
+        Parameters
+        ----------
+        buffer : str
+            The words, in the internal encoding, separated by line breaks.
+
+        Returns
+        -------
+        Iterator[str]
+            The evolved words at the end of each stage, in the same form, in order.
+        '''
+
+        present = set(buffer)
+        for steps in self.stages.values():
+            for apply, requires in steps:
+                for clause in requires:
+                    if present.isdisjoint(clause):
+                        break
+                else:
+                    result = apply(buffer)
+                    if result != buffer:
+                        buffer = result
+                        present = set(buffer)
+            yield buffer
+
+    def evolve(self, words: Iterable[str], chunk_size: int = 10_000) -> EvolvedBatch:
+        '''
+        Simulates the sound changes that occurred between Latin and French on a batch of words. See french_converter.evolve().
+
+        Parameters
+        ----------
+        words : Iterable[str]
+            The words to apply the sound changes to. They can't contain line breaks.
+        chunk_size : int
+            How many words to put in each buffer. Each step is run once per buffer.
+
+        Returns
+        -------
+        EvolvedBatch
+            The evolved words, in the same order.
+
+        Raises
+        ------
+        ValueError
+            If a word contains a line break.
+        '''
+
+        return self.collect(map(self.evolve_buffer, self.buffers(words, chunk_size)))
+
+    def evolve_stages(self, words: Iterable[str], chunk_size: int = 10_000) -> dict[Stage, EvolvedBatch]:
+        '''
+        Evolves a batch of words like evolve(), keeping every word as it stands at the end of each stage. See french_converter.evolve_stages().
+
+        Parameters
+        ----------
+        words : Iterable[str]
+            The words to apply the sound changes to. They can't contain line breaks.
+        chunk_size : int
+            How many words to put in each buffer. Each step is run once per buffer.
+
+        Returns
+        -------
+        dict[Stage, EvolvedBatch]
+            A column for each stage, holding the evolved words at the end of it in the same order as the words.
+
+        Raises
+        ------
+        ValueError
+            If a word contains a line break.
+        '''
+
+        columns: dict[Stage, list[str]] = {stage: [] for stage in self.stages}
+        for buffer in self.buffers(words, chunk_size):
+            for column, evolved in zip(columns.values(), self.stage_buffers(buffer)):
+                column.append(evolved)
+        return {stage: self.collect(buffers) for stage, buffers in columns.items()}
+
+    def buffers(self, words: Iterable[str], chunk_size: int) -> Iterator[str]:
+        '''
+        Splits words into encoded buffers.
+
+        Parameters
+        ----------
+        words : Iterable[str]
+            The words. They can't contain line breaks.
+        chunk_size : int
+            How many words to put in each buffer.
+
+        Returns
+        -------
+        Iterator[str]
+            The buffers, in order.
+
+        Raises
+        ------
+        ValueError
+            If a word contains a line break.
+        '''
+
+        chunk: list[str] = []
+        for word in words:
+            if SEPARATOR in word:
+                raise ValueError(f'Word {word!r} contains a line break')
+            chunk.append(word)
+            if len(chunk) == chunk_size:
+                yield self.encoding.encode(SEPARATOR.join(chunk))
+                chunk.clear()
+        if chunk:
+            yield self.encoding.encode(SEPARATOR.join(chunk))
+
+    def collect(self, buffers: Iterable[str]) -> EvolvedBatch:
+        '''
+        Joins evolved buffers back together.
+
+        Parameters
+        ----------
+        buffers : Iterable[str]
+            The evolved buffers, in order.
+
+        Returns
+        -------
+        EvolvedBatch
+            The evolved words.
+        '''
+
+        buffers = list(buffers)
+        if not buffers:
+            return EvolvedBatch('', array('q', [0]))
+        buffer = self.encoding.decode(SEPARATOR.join(buffers))
+        offsets = array('q', [0])
+        offsets.extend(m.end() for m in re.finditer(SEPARATOR, buffer))
+        offsets.append(len(buffer) + 1)
+        return EvolvedBatch(buffer, offsets)
+
+def gil_enabled() -> bool:
+    '''
+    Checks whether the interpreter has a GIL. Only free-threaded builds of Python 3.13 or later don't.
+    '''
+
+    return getattr(sys, '_is_gil_enabled', lambda: True)()
+
+def threaded_cascade() -> BufferCascade:
+    '''
+    Returns the cascade evolve_threaded() uses. With a GIL, only the regex module can run in parallel, as it can release the GIL while it matches, so every
+    rule is compiled with it. Without one, the default rules are used as they are. The cascade is cached for the default engine, so it's rebuilt when
+    the rules are reloaded (see french_converter.reload_rules()).
+
+    Returns
+    -------
+    BufferCascade
+        The cascade. It has no mutable state, so all the threads share it.
+    '''
+
+    return _threaded_cascade(french_converter.default_engine())
+
+@functools.lru_cache(maxsize=1)
+def _threaded_cascade(engine: french_converter.Engine) -> BufferCascade:
+    if gil_enabled():
+        return BufferCascade(french_converter.recompile(engine.rulebook, 'regex'), concurrent=True)
+    return BufferCascade(engine.rulebook)
+
+def evolve_threaded(words: Iterable[str], workers: Optional[int] = None, chunk_size: int = 1_000) -> EvolvedBatch:
+    '''
+    Evolves a batch of words on a pool of threads. The words are split into buffers (see BufferCascade), and each thread evolves one buffer at a time.
+
+    Parameters
+    ----------
+    words : Iterable[str]
+        The words to apply the sound changes to. They can't contain line breaks.
+    workers : int | None
+        The number of threads. Defaults to the ThreadPoolExecutor default.
+    chunk_size : int
+        How many words to put in each buffer.
+
+    Returns
+    -------
+    EvolvedBatch
+        The evolved words, in the same order.
+
+    Raises
+    ------
+    ValueError
+        If a word contains a line break.
+    '''
+
+    cascade = threaded_cascade()
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        return cascade.collect(executor.map(cascade.evolve_buffer, cascade.buffers(words, chunk_size)))
+
+# The cascade used by the worker processes of evolve_parallel(). It's set in the parent before the workers are forked, so they inherit it compiled, and
+# rebuilt there if the rules have been reloaded since. Workers which aren't forked compile it themselves.
+_worker_cascade: Optional[BufferCascade] = None
+
+def _init_worker() -> None:
+    '''
+    Sets up a worker process which wasn't forked, and so didn't inherit the cascade.
+    '''
+
+    global _worker_cascade
+    if _worker_cascade is None:
+        _worker_cascade = BufferCascade()
+
+def _evolve_chunk(chunk: tuple[int, list[str]]) -> tuple[int, list[str]]:
+    '''
+    Evolves a chunk of words in a worker process.
+    '''
+
+    start, words = chunk
+    return start, list(_worker_cascade.evolve(words, len(words)))
+
+def pool_context() -> multiprocessing.context.BaseContext:
+    '''
+    Picks how to start worker processes. Forking lets them inherit everything this process has compiled, but it's only safe while this process has a
+    single thread: a lock held by another thread at the time, like the ones guarding the rules and the result cache, would be copied into the workers
+    held, and never released. Otherwise a fork server is used where the platform has one, and fresh processes where it doesn't.
+
+    Returns
+    -------
+    multiprocessing.context.BaseContext
+        The context to create the pool with.
+    '''
+
+    methods = multiprocessing.get_all_start_methods()
+    if 'fork' in methods and threading.active_count() == 1:
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+def _chunks(words: list[str], size: int) -> Iterator[tuple[int, list[str]]]:
+    '''
+    Splits words into consecutive chunks with roughly the given number of characters each, along with the index of the first word of each chunk.
+    '''
+
+    start = total = 0
+    for i, word in enumerate(words):
+        total += len(word) + 1
+        if total >= size:
+            yield start, words[start:i + 1]
+            start, total = i + 1, 0
+    if start < len(words):
+        yield start, words[start:]
+
+def evolve_parallel(words: Iterable[str], processes: Optional[int] = None, chunksize: Optional[int] = None,
+                    ordered: bool = True) -> Iterator[Union[str, tuple[int, str]]]:
+    '''
+    Evolves a batch of words on a pool of processes. The rules are compiled once in this process and, where it's safe (see pool_context()), the workers
+    are forked afterwards so they inherit them. Each worker evolves a chunk at a time as a buffer (see BufferCascade). Chunks are balanced by their total
+    length rather than their number of words, so a chunk of long words doesn't hold up the rest.
+
+    Parameters
+    ----------
+    words : Iterable[str]
+        The words to apply the sound changes to. They can't contain line breaks.
+    processes : int | None
+        The number of worker processes. Defaults to the number of cores.
+    chunksize : int | None
+        The average number of words per chunk. Defaults to enough to give each process about eight chunks, up to 10,000 words.
+    ordered : bool
+        If True, the evolved words are yielded in the same order as the words. Otherwise pairs of the index of each word and the evolved word are yielded
+        as soon as they're ready.
+
+    Returns
+    -------
+    Iterator[str | tuple[int, str]]
+        The evolved words, or pairs of indices and evolved words if ordered is False.
+
+    Raises
+    ------
+    ValueError
+        If a word contains a line break.
+    '''
+
+    global _worker_cascade
+    words = list(words)
+    processes = processes or multiprocessing.cpu_count()
+    chunksize = chunksize or min(max(len(words) // (processes * 8), 1), 10_000)
+    average = sum(map(len, words)) / len(words) + 1 if words else 1
+    if _worker_cascade is None or _worker_cascade.rulebook is not french_converter.compile_rulebook():
+        _worker_cascade = BufferCascade()
+    with pool_context().Pool(processes, _init_worker) as pool:
+        chunks = _chunks(words, int(chunksize * average))
+        if ordered:
+            for _, results in pool.imap(_evolve_chunk, chunks):
+                yield from results
+        else:
+            for start, results in pool.imap_unordered(_evolve_chunk, chunks):
+                yield from enumerate(results, start)
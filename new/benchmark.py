@@ -0,0 +1,210 @@
+'''
+Benchmarks for the rule engine. Run this file directly to print the results.
+'''
+
+import re
+import timeit
+import french_converter
+import rules
+from test import tests
+
+def rule_inputs(words: list[str]) -> dict[str, list[str]]:
+    '''
+    Runs the words through the cascade and collects the input each rule receives.
+
+    Parameters
+    ----------
+    words : list[str]
+        The words to evolve.
+
+    Returns
+    -------
+    dict[str, list[str]]
+        The inputs of each rule, in the internal encoding, keyed by rule id.
+    '''
+
+    inputs: dict[str, list[str]] = {}
+    for word in words:
+        word = french_converter.compile_rulebook()[rules.Stage.PROTO_WESTERN_ROMANCE].encoding.encode(word)
+        for stage in french_converter.compile_rulebook().values():
+            for rule, pattern, _ in stage.rules:
+                inputs.setdefault(rule.id, []).append(word)
+                word = pattern.sub(rule.repl, word)
+    return inputs
+
+def bench_backends(number: int = 100) -> None:
+    '''
+    Times every rule which can be compiled with the re module against the same rule compiled with the regex module and prints the speedup.
+
+    Parameters
+    ----------
+    number : int
+        How many times to run each rule over its inputs.
+    '''
+
+    inputs = rule_inputs(list(tests))
+    regex_only = french_converter.compile_rules(rules.load_rules(), backend='regex')
+    print(f'{"rule":<45}{"regex (µs)":>12}{"re (µs)":>12}{"speedup":>10}')
+    total_regex = total_re = 0.0
+    for stage in rules.Stage:
+        for fast, slow in zip(french_converter.compile_rulebook()[stage].rules, regex_only[stage].rules):
+            if not isinstance(fast.pattern, re.Pattern):
+                continue
+            words = inputs[fast.rule.id]
+            time_regex = timeit.timeit(lambda: [slow.pattern.sub(slow.rule.repl, w) for w in words], number=number) / number * 1e6
+            time_re = timeit.timeit(lambda: [fast.pattern.sub(fast.rule.repl, w) for w in words], number=number) / number * 1e6
+            total_regex += time_regex
+            total_re += time_re
+            print(f'{fast.rule.id:<45}{time_regex:>12.1f}{time_re:>12.1f}{time_regex / time_re:>9.2f}x')
+    print(f'{"total":<45}{total_regex:>12.1f}{total_re:>12.1f}{total_regex / total_re:>9.2f}x')
+
+def report_fusion() -> None:
+    '''
+    Prints the groups of rules which are carried out in a single pass, along with the number of passes per word with and without them.
+    '''
+
+    rulebook = french_converter.compile_rulebook()
+    for group in french_converter.fused_groups(rulebook):
+        print('fused: ' + ', '.join(group))
+    rule_count = sum(len(stage.rules) for stage in rulebook.values())
+    step_count = sum(len(stage.steps) for stage in rulebook.values())
+    print(f'{rule_count} rules in {step_count} passes')
+
+def bench_vectorized(copies: int = 100) -> None:
+    '''
+    Times the vectorized engine against evolve() on a batch made of copies of the test words.
+
+    Parameters
+    ----------
+    copies : int
+        How many copies of the test words to put in the batch.
+    '''
+
+    import vectorized
+    words = list(tests) * copies
+    cascade = vectorized.VectorizedCascade()
+    vectorized_count, step_count = cascade.coverage
+    time_evolve = timeit.timeit(lambda: [french_converter.evolve(w) for w in words], number=1) / len(words) * 1e6
+    time_vectorized = timeit.timeit(lambda: cascade.evolve(words), number=1) / len(words) * 1e6
+    print(f'{vectorized_count} of {step_count} passes vectorized')
+    print(f'evolve: {time_evolve:.1f} µs/word, vectorized: {time_vectorized:.1f} µs/word, {time_evolve / time_vectorized:.2f}x')
+
+def bench_batch(copies: int = 100) -> None:
+    '''
+    Times the batch mode against evolve() on a batch made of copies of the test words.
+
+    Parameters
+    ----------
+    copies : int
+        How many copies of the test words to put in the batch.
+    '''
+
+    import batch
+    words = list(tests) * copies
+    cascade = batch.BufferCascade()
+    time_evolve = timeit.timeit(lambda: [french_converter.evolve(w) for w in words], number=1) / len(words) * 1e6
+    time_batch = timeit.timeit(lambda: cascade.evolve(words), number=1) / len(words) * 1e6
+    print(f'evolve: {time_evolve:.1f} µs/word, batch: {time_batch:.1f} µs/word, {time_evolve / time_batch:.2f}x')
+
+def bench_threaded(workers: tuple[int, ...] = (1, 2, 4, 8), copies: int = 100) -> None:
+    '''
+    Times batch.evolve_threaded() with different numbers of threads on a batch made of copies of the test words. Threads only help on a machine with
+    several cores, and scale best on a free-threaded build of Python.
+
+    Parameters
+    ----------
+    workers : tuple[int, ...]
+        The numbers of threads to try.
+    copies : int
+        How many copies of the test words to put in the batch.
+    '''
+
+    import batch
+    import os
+    words = list(tests) * copies
+    batch.threaded_cascade()
+    print(f'{os.cpu_count()} cores, GIL {"enabled" if batch.gil_enabled() else "disabled"}')
+    base = None
+    for count in workers:
+        time_threaded = timeit.timeit(lambda: batch.evolve_threaded(words, count), number=1) / len(words) * 1e6
+        base = base or time_threaded
+        print(f'{count} threads: {time_threaded:.1f} µs/word, {base / time_threaded:.2f}x')
+
+def bench_parallel(processes: tuple[int, ...] = (1, 2, 4, 8), copies: int = 100) -> None:
+    '''
+    Times batch.evolve_parallel() with different numbers of processes on a batch made of copies of the test words.
+
+    Parameters
+    ----------
+    processes : tuple[int, ...]
+        The numbers of processes to try.
+    copies : int
+        How many copies of the test words to put in the batch.
+    '''
+
+    import batch
+    import os
+    words = list(tests) * copies
+    print(f'{os.cpu_count()} cores')
+    base = None
+    for count in processes:
+        time_parallel = timeit.timeit(lambda: list(batch.evolve_parallel(words, count)), number=1) / len(words) * 1e6
+        base = base or time_parallel
+        print(f'{count} processes: {time_parallel:.1f} µs/word, {base / time_parallel:.2f}x')
+
+def bench_many(copies: int = 100) -> None:
+    '''
+    Times evolve_many() against evolve() on a batch made of copies of the test words, so that most of the words are repeats.
+
+    Parameters
+    ----------
+    copies : int
+        How many copies of the test words to put in the batch.
+    '''
+
+    words = list(tests) * copies
+    time_evolve = timeit.timeit(lambda: [french_converter.evolve(w) for w in words], number=1) / len(words) * 1e6
+    stats = []
+    french_converter.evolve_many(words, report=stats.append)
+    time_many = stats[0].seconds / len(words) * 1e6
+    print(f'evolve: {time_evolve:.1f} µs/word, evolve_many: {time_many:.1f} µs/word ({stats[0].unique} unique, {stats[0].words_per_second:,.0f} words/s), '
+          f'{time_evolve / time_many:.2f}x')
+
+def bench_transducer(count: int = 2_000) -> None:
+    '''
+    Times the transducer engine against evolve() on random words: cold, on new words once it has seen the same number of others, and on the same words
+    again.
+
+    Parameters
+    ----------
+    count : int
+        The number of words in each batch.
+    '''
+
+    import fuzz
+    import transducer
+    seen, unseen = fuzz.generate_words(0, count), fuzz.generate_words(1, count)
+    cascade = transducer.TransducerCascade()
+    time_evolve = timeit.timeit(lambda: [french_converter.evolve(w) for w in unseen], number=1) / count * 1e6
+    time_cold = timeit.timeit(lambda: [cascade.evolve(w) for w in seen], number=1) / count * 1e6
+    time_unseen = timeit.timeit(lambda: [cascade.evolve(w) for w in unseen], number=1) / count * 1e6
+    time_repeated = timeit.timeit(lambda: [cascade.evolve(w) for w in unseen], number=1) / count * 1e6
+    print(f'evolve: {time_evolve:.1f} µs/word, transducer: {time_cold:.1f} µs/word cold, {time_unseen:.1f} µs/word on unseen words, '
+          f'{time_repeated:.1f} µs/word on repeated words, {cascade.size:,} states')
+
+if __name__ == '__main__':
+    bench_backends()
+    print()
+    report_fusion()
+    print()
+    bench_vectorized()
+    print()
+    bench_batch()
+    print()
+    bench_many()
+    print()
+    bench_transducer()
+    print()
+    bench_threaded()
+    print()
+    bench_parallel()
@@ -0,0 +1,138 @@
+'''
+Generates a flat Python module which carries out the cascade without going through the rule engine. Every pass is written out as a single line using a
+compiled pattern bound to a local variable, with no debug checks and no inventory bookkeeping. Run this file directly to write the module to
+generated_converter.py and check it against evolve().
+'''
+
+import re
+import sys
+import types
+import french_converter
+from french_converter import CompiledStage, Step
+from rules import Stage
+from typing import Optional
+
+# Clauses with more characters than this aren't checked before a pass, as checking them costs more than it saves.
+MAX_CLAUSE = 3
+
+def _condition(step: Step) -> str:
+    '''
+    Writes the check for the characters a word needs to contain for the step to do anything.
+    '''
+
+    tests = []
+    for clause in step.requires:
+        if len(clause) <= MAX_CLAUSE:
+            tests.append(' or '.join(f'{c!r} in word' for c in sorted(clause)))
+    if len(tests) > 1:
+        tests = [f'({t})' if ' or ' in t else t for t in tests]
+    return ' and '.join(tests)
+
+def generate(rulebook: Optional[dict[Stage, CompiledStage]] = None) -> str:
+    '''
+    Generates the source of the module.
+
+    Parameters
+    ----------
+    rulebook : dict[Stage, CompiledStage] | None
+        The compiled rules. Defaults to french_converter.compile_rulebook().
+
+    Returns
+    -------
+    str
+        The source of a module with a single evolve(word) function.
+    '''
+
+    rulebook = rulebook or french_converter.compile_rulebook()
+    setup: list[str] = [f'    encoding = {rulebook[Stage.PROTO_WESTERN_ROMANCE].encoding.table!r}']
+    body: list[str] = ['        word = word.translate(encoding)']
+    for stage, compiled in rulebook.items():
+        body.append(f'        # {stage.name.replace("_", " ").title()}.')
+        for i, step in enumerate(compiled.steps):
+            name = f'{stage.name.lower()}_{i}'
+            ids = ', '.join(rule.id for rule in step.rules)
+            if step.pattern is None:
+                if len(step.repl) == 1:
+                    [(source, target)] = step.repl.items()
+                    line = f'word = word.replace({source!r}, {target!r})'
+                else:
+                    setup.append(f'    {name} = {str.maketrans(step.repl)!r}')
+                    line = f'word = word.translate({name})'
+            else:
+                module = 're' if isinstance(step.pattern, re.Pattern) else 'regex'
+                setup.append(f'    {name} = {module}.compile({step.pattern.pattern!r}).sub')
+                if isinstance(step.repl, dict):
+                    setup.append(f'    {name}_table = {step.repl!r}')
+                    setup.append(f'    {name}_repl = lambda m, table={name}_table: table[m[0]]')
+                    line = f'word = {name}({name}_repl, word)'
+                else:
+                    line = f'word = {name}({step.repl!r}, word)'
+            condition = _condition(step)
+            body.append(f'        # {ids}')
+            body.append(f'        if {condition}:\n            {line}' if condition else f'        {line}')
+    return '\n'.join([
+        '# Generated by codegen.py from sound_changes.py. Do not edit this file; edit the rules and regenerate it instead.',
+        'import re',
+        'import regex',
+        '',
+        'def _build():',
+        *setup,
+        '',
+        '    def evolve(word: str) -> str:',
+        *body,
+        '        return word.translate(encoding)',
+        '',
+        '    return evolve',
+        '',
+        'evolve = _build()',
+        '',
+    ])
+
+def load(source: str, name: str = 'generated_converter') -> types.ModuleType:
+    '''
+    Executes generated source as a module without writing it to disk.
+
+    Parameters
+    ----------
+    source : str
+        The source, as returned by generate().
+    name : str
+        The name to give the module.
+
+    Returns
+    -------
+    types.ModuleType
+        The module.
+    '''
+
+    module = types.ModuleType(name)
+    exec(compile(source, f'<{name}>', 'exec'), module.__dict__)
+    return module
+
+def check(module: types.ModuleType, words: list[str]) -> list[tuple[str, str, str]]:
+    '''
+    Compares a generated module against evolve().
+
+    Parameters
+    ----------
+    module : types.ModuleType
+        The generated module.
+    words : list[str]
+        The words to compare on.
+
+    Returns
+    -------
+    list[tuple[str, str, str]]
+        The word, the result of evolve() and the result of the generated module for every word they differ on.
+    '''
+
+    return [(w, expected, result) for w in words if (expected := french_converter.evolve(w)) != (result := module.evolve(w))]
+
+if __name__ == '__main__':
+    from test import tests
+    source = generate()
+    path = sys.argv[1] if len(sys.argv) > 1 else 'generated_converter.py'
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(source)
+    for word, expected, result in check(load(source), list(tests)):
+        print(f'Generated module differs on {word} - expected {expected} but got {result}')
@@ -0,0 +1,90 @@
+'''
+Finds rules which never match. Rules which provably can't match are found statically by compile_rules() (see its drop_dead argument), and the engine
+leaves them out. Rules which just didn't match any word of a corpus are only reported, as the corpus might not cover every case. Run this file directly
+with files of words, one per line, to print both lists. Without any files, the test words are used.
+'''
+
+import sys
+import french_converter
+import rules
+from french_converter import CompiledStage, DeadRule
+from rules import Stage
+from typing import Iterable, Optional
+
+def dead_rules(rulebook: Optional[dict[Stage, CompiledStage]] = None) -> list[DeadRule]:
+    '''
+    Returns the rules which can never match, along with the reason why.
+
+    Parameters
+    ----------
+    rulebook : dict[Stage, CompiledStage] | None
+        The compiled rules. Defaults to the rules in sound_changes.py, compiled with drop_dead.
+
+    Returns
+    -------
+    list[DeadRule]
+        The dead rules, in order.
+    '''
+
+    rulebook = rulebook or french_converter.compile_rules(rules.load_rules(), drop_dead=True)
+    return [dead for stage in rulebook.values() for dead in stage.dropped]
+
+def profile(words: Iterable[str], rulebook: Optional[dict[Stage, CompiledStage]] = None) -> dict[str, int]:
+    '''
+    Runs the words through the cascade one rule at a time and counts how many of them each rule matches.
+
+    Parameters
+    ----------
+    words : Iterable[str]
+        The words to evolve.
+    rulebook : dict[Stage, CompiledStage] | None
+        The compiled rules. Defaults to the rules in sound_changes.py, with none dropped.
+
+    Returns
+    -------
+    dict[str, int]
+        The number of words each rule matched, keyed by rule id, in order.
+    '''
+
+    rulebook = rulebook or french_converter.compile_rules(rules.load_rules())
+    encoding = rulebook[Stage.PROTO_WESTERN_ROMANCE].encoding
+    counts = {compiled.rule.id: 0 for stage in rulebook.values() for compiled in stage.rules}
+    for word in words:
+        word = encoding.encode(word)
+        for stage in rulebook.values():
+            for rule, pattern, _ in stage.rules:
+                word, matches = pattern.subn(rule.repl, word)
+                if matches:
+                    counts[rule.id] += 1
+    return counts
+
+def report(words: Iterable[str]) -> None:
+    '''
+    Prints the rules which can never match, and the other rules which didn't match any of the words.
+
+    Parameters
+    ----------
+    words : Iterable[str]
+        The corpus to profile the rules against.
+    '''
+
+    dead = dead_rules()
+    for rule, reason, _ in dead:
+        print(f'dead: {rule.id}: {reason}')
+    proven = {rule.id for rule, _, _ in dead}
+    counts = profile(words)
+    for rule_id, count in counts.items():
+        if not count and rule_id not in proven:
+            print(f'unused: {rule_id}: never matched in the corpus')
+    print(f'{len(dead)} dead and {sum(not c for c in counts.values()) - len(dead)} unused of {len(counts)} rules')
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        corpus: list[str] = []
+        for path in sys.argv[1:]:
+            with open(path, encoding='utf-8') as file:
+                corpus.extend(line.strip() for line in file if line.strip())
+    else:
+        from test import tests
+        corpus = list(tests)
+    report(corpus)
@@ -0,0 +1,219 @@
+'''
+A distinctive feature model of the phonemes the rules use. Every phoneme is described by a bitmask of the features it has, and natural classes are defined
+as queries over those features instead of being listed out by hand. A rule can then refer to a class by name, as in '{nasal}' or '{stop-ɟ}', and it's
+resolved against the consonants and vowels at the time the rule applies, so a class can't drift out of sync with the inventories: a phoneme which is added
+to the inventories joins every class it belongs to, and one which is removed leaves them.
+'''
+
+import functools
+from enum import IntFlag
+from typing import NamedTuple, Sequence
+
+class Feature(IntFlag):
+    '''
+    The distinctive features. Features which a phoneme lacks are simply unset, so '-voice' is the absence of VOICE.
+    '''
+
+    SYLLABIC = 1 << 0
+    CONSONANTAL = 1 << 1
+    SONORANT = 1 << 2
+    CONTINUANT = 1 << 3
+    DELAYED_RELEASE = 1 << 4
+    NASAL = 1 << 5
+    LATERAL = 1 << 6
+    RHOTIC = 1 << 7
+    VOICE = 1 << 8
+    LABIAL = 1 << 9
+    CORONAL = 1 << 10
+    DORSAL = 1 << 11
+    # Palatal or postalveolar, i.e. articulated with the tongue body raised towards the hard palate.
+    PALATAL = 1 << 12
+    # Secondary articulations, as in /kʷ/ and /ɫ/.
+    LABIALIZED = 1 << 13
+    VELARIZED = 1 << 14
+    HIGH = 1 << 15
+    LOW = 1 << 16
+    FRONT = 1 << 17
+    BACK = 1 << 18
+    ROUND = 1 << 19
+    TENSE = 1 << 20
+
+_OBSTRUENT = Feature.CONSONANTAL
+_SONORANT = Feature.CONSONANTAL | Feature.SONORANT | Feature.VOICE
+_GLIDE = Feature.SONORANT | Feature.CONTINUANT | Feature.VOICE
+_VOWEL = Feature.SYLLABIC | Feature.SONORANT | Feature.CONTINUANT | Feature.VOICE
+
+_F = Feature
+
+FEATURES: dict[str, Feature] = {
+    # Stops and affricates
+    'p': _OBSTRUENT | _F.LABIAL,
+    'b': _OBSTRUENT | _F.VOICE | _F.LABIAL,
+    't': _OBSTRUENT | _F.CORONAL,
+    'd': _OBSTRUENT | _F.VOICE | _F.CORONAL,
+    'k': _OBSTRUENT | _F.DORSAL,
+    'g': _OBSTRUENT | _F.VOICE | _F.DORSAL,
+    'kʷ': _OBSTRUENT | _F.DORSAL | _F.LABIALIZED,
+    'gʷ': _OBSTRUENT | _F.VOICE | _F.DORSAL | _F.LABIALIZED,
+    'ɟ': _OBSTRUENT | _F.VOICE | _F.DORSAL | _F.PALATAL,
+    'ʦ': _OBSTRUENT | _F.DELAYED_RELEASE | _F.CORONAL,
+    'ʣ': _OBSTRUENT | _F.DELAYED_RELEASE | _F.VOICE | _F.CORONAL,
+    'ʧ': _OBSTRUENT | _F.DELAYED_RELEASE | _F.CORONAL | _F.PALATAL,
+    'ʤ': _OBSTRUENT | _F.DELAYED_RELEASE | _F.VOICE | _F.CORONAL | _F.PALATAL,
+    # Fricatives
+    'f': _OBSTRUENT | _F.CONTINUANT | _F.LABIAL,
+    'v': _OBSTRUENT | _F.CONTINUANT | _F.VOICE | _F.LABIAL,
+    'θ': _OBSTRUENT | _F.CONTINUANT | _F.CORONAL,
+    'ð': _OBSTRUENT | _F.CONTINUANT | _F.VOICE | _F.CORONAL,
+    's': _OBSTRUENT | _F.CONTINUANT | _F.CORONAL,
+    'z': _OBSTRUENT | _F.CONTINUANT | _F.VOICE | _F.CORONAL,
+    'ʃ': _OBSTRUENT | _F.CONTINUANT | _F.CORONAL | _F.PALATAL,
+    'ʒ': _OBSTRUENT | _F.CONTINUANT | _F.VOICE | _F.CORONAL | _F.PALATAL,
+    'h': _F.CONTINUANT,
+    # Sonorants
+    'm': _SONORANT | _F.NASAL | _F.LABIAL,
+    'n': _SONORANT | _F.NASAL | _F.CORONAL,
+    'ɲ': _SONORANT | _F.NASAL | _F.DORSAL | _F.PALATAL,
+    'l': _SONORANT | _F.CONTINUANT | _F.LATERAL | _F.CORONAL,
+    'ɫ': _SONORANT | _F.CONTINUANT | _F.LATERAL | _F.CORONAL | _F.VELARIZED,
+    'ʎ': _SONORANT | _F.CONTINUANT | _F.LATERAL | _F.DORSAL | _F.PALATAL,
+    'r': _SONORANT | _F.CONTINUANT | _F.RHOTIC | _F.CORONAL,
+    'ʁ': _SONORANT | _F.CONTINUANT | _F.RHOTIC | _F.DORSAL,
+    # Glides
+    'j': _GLIDE | _F.DORSAL | _F.HIGH | _F.FRONT,
+    'ɥ': _GLIDE | _F.LABIAL | _F.DORSAL | _F.HIGH | _F.FRONT | _F.ROUND,
+    'w': _GLIDE | _F.LABIAL | _F.DORSAL | _F.HIGH | _F.BACK | _F.ROUND,
+    # Vowels
+    'i': _VOWEL | _F.HIGH | _F.FRONT | _F.TENSE,
+    'y': _VOWEL | _F.HIGH | _F.FRONT | _F.ROUND | _F.TENSE,
+    'u': _VOWEL | _F.HIGH | _F.BACK | _F.ROUND | _F.TENSE,
+    'e': _VOWEL | _F.FRONT | _F.TENSE,
+    'ø': _VOWEL | _F.FRONT | _F.ROUND | _F.TENSE,
+    'o': _VOWEL | _F.BACK | _F.ROUND | _F.TENSE,
+    'ɛ': _VOWEL | _F.FRONT,
+    'œ': _VOWEL | _F.FRONT | _F.ROUND,
+    'ɔ': _VOWEL | _F.BACK | _F.ROUND,
+    # A mid front vowel whose height isn't decided until Modern French.
+    'E': _VOWEL | _F.FRONT,
+    'ə': _VOWEL,
+    'æ': _VOWEL | _F.LOW | _F.FRONT,
+    'a': _VOWEL | _F.LOW,
+    'ɑ': _VOWEL | _F.LOW | _F.BACK,
+}
+
+class Query(NamedTuple):
+    '''
+    A query over the features: a phoneme matches if it has every required feature and none of the forbidden ones.
+
+    Attributes
+    ----------
+    required : Feature
+        The features a phoneme has to have.
+    forbidden : Feature
+        The features a phoneme can't have.
+    '''
+
+    required: Feature
+    forbidden: Feature = Feature(0)
+
+    def matches(self, mask: int) -> bool:
+        return mask & self.required == self.required and not mask & self.forbidden
+
+
+# The natural classes rules can refer to by name. A class is the union of its queries.
+CLASSES: dict[str, tuple[Query, ...]] = {
+    'nasal': (Query(_F.CONSONANTAL | _F.NASAL),),
+    # Oral stops, without the labialized ones.
+    'stop': (Query(_F.CONSONANTAL, _F.SONORANT | _F.CONTINUANT | _F.DELAYED_RELEASE | _F.LABIALIZED),),
+    # Plain /l/ and /r/, which form clusters with a preceding stop.
+    'liquid': (Query(_F.CONSONANTAL | _F.LATERAL, _F.PALATAL | _F.VELARIZED), Query(_F.CONSONANTAL | _F.RHOTIC)),
+    'labial': (Query(_F.CONSONANTAL | _F.LABIAL),),
+    'velar': (Query(_F.CONSONANTAL | _F.DORSAL, _F.SONORANT | _F.PALATAL | _F.LABIALIZED),),
+    'front': (Query(_F.SYLLABIC | _F.FRONT, _F.ROUND),),
+    'back_rounded': (Query(_F.SYLLABIC | _F.BACK | _F.ROUND),),
+    'high': (Query(_F.SYLLABIC | _F.HIGH),),
+}
+
+def features(phoneme: str) -> Feature:
+    '''
+    Returns the features of a phoneme.
+
+    Parameters
+    ----------
+    phoneme : str
+        The phoneme, in IPA.
+
+    Returns
+    -------
+    Feature
+        The features of the phoneme.
+
+    Raises
+    ------
+    ValueError
+        If the phoneme isn't in the feature table.
+    '''
+
+    try:
+        return FEATURES[phoneme]
+    except KeyError:
+        raise ValueError(f'No features for phoneme {phoneme!r}') from None
+
+def in_class(phoneme: str, name: str) -> bool:
+    '''
+    Checks whether a phoneme belongs to a natural class. This is a bit test against the phoneme's features, so it's cheap enough for code which works on
+    phonemes directly instead of through the rules' patterns.
+
+    Parameters
+    ----------
+    phoneme : str
+        The phoneme, in IPA.
+    name : str
+        The name of the class (see CLASSES).
+
+    Returns
+    -------
+    bool
+        True if the phoneme belongs to the class.
+    '''
+
+    mask = features(phoneme)
+    return any(query.matches(mask) for query in _queries(name))
+
+def _queries(name: str) -> tuple[Query, ...]:
+    try:
+        return CLASSES[name]
+    except KeyError:
+        raise ValueError(f'Unknown natural class {name!r}') from None
+
+@functools.lru_cache(maxsize=None)
+def _resolve(name: str, inventory: tuple[str, ...]) -> tuple[str, ...]:
+    queries = _queries(name)
+    return tuple(p for p in inventory if any(query.matches(features(p)) for query in queries))
+
+def natural_class(name: str, consonants: Sequence[str], vowels: Sequence[str]) -> tuple[str, ...]:
+    '''
+    Resolves a natural class against an inventory snapshot. This is cached per snapshot, as the same classes are resolved over and over while compiling the
+    rules.
+
+    Parameters
+    ----------
+    name : str
+        The name of the class (see CLASSES).
+    consonants : Sequence[str]
+        The consonants at the time the class is used.
+    vowels : Sequence[str]
+        The vowels at the time the class is used.
+
+    Returns
+    -------
+    tuple[str, ...]
+        The members of the class, in inventory order.
+
+    Raises
+    ------
+    ValueError
+        If the class is unknown, or a phoneme in the inventories isn't in the feature table.
+    '''
+
+    return _resolve(name, tuple(consonants) + tuple(vowels))
@@ -1,520 +1,1204 @@
+import analysis
+import bisect
+import collections
+import concurrent.futures
+import features
+import functools
+import hashlib
 import log_setup
+import operator
+import re
 import regex
+import rules
+import threading
+import time
+from rules import Rule, RuleTable, Stage
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Sequence, Union
 
 log = log_setup.get_log()
 
-def sub(pattern: str, repl: str, string: str, debug: bool = False) -> str:
+def join(include: Sequence[str], *exclude: str) -> str:
     '''
-    Wrapper for the regex.sub function which includes an optional debug argument.
+    Returns a non-capturing regex group matching any of the elements of the list. Duplicates are ignored, single characters are collected into a character
+    class, and longer elements are tried first, so the group takes the form '(?:e12|e3|[e4e5e6...])'.
 
     Parameters
     ----------
-    pattern : str
-        The regex pattern to match against.
-    repl : str
-        The replacement string.
-    string : str
-        The string in which to perform the replacement.
-    debug : bool
-        If True, will log the output of the substitution. 
+    include : Sequence[str]
+        The list of elements to include in the group.
+    *exclude : str
+        Elements which should be excluded from the list.
 
     Returns
     -------
     str
-        A new string with the substitution applied (if applicable).
+        The non-capturing group.
     '''
 
-    word = regex.sub(pattern, repl, string)
-    if debug:
-        log(word, stacklevel=2)
-    return word
-
-consonants: list[str] = []
-vowels: list[str] = []
+    return _natural_class(tuple(include), frozenset(exclude))
 
-def reset() -> None:
+@functools.lru_cache(maxsize=None)
+def _natural_class(include: tuple[str, ...], exclude: frozenset[str]) -> str:
     '''
-    Resets the consonants and vowels to their initial (i.e., Latin) state.
+    Builds the group for join(). This is cached per inventory snapshot, as the same classes are built over and over while compiling the rules.
     '''
 
-    global consonants, vowels
-    consonants = ['b', 'd', 'f', 'g', 'h', 'j', 'k', 'l', 'm', 'n', 'p', 'r', 's', 't', 'v', 'w', 'z']
-    vowels = ['a', 'e', 'i', 'o', 'u']
+    members = [i for i in dict.fromkeys(include) if i not in exclude]
+    single = ''.join(regex.escape(i) for i in members if len(i) == 1)
+    alternatives = sorted((regex.escape(i) for i in members if len(i) > 1), key=len, reverse=True)
+    if single:
+        alternatives.append(f'[{single}]' if len(single) > 1 else single)
+    return '(?:' + '|'.join(alternatives) + ')'
 
-def join(include: list[str], *exclude: str) -> str:
+_placeholder = regex.compile(r'\{([CV]|[a-z_]+)((?:-[^-{}]+)*)\}')
+
+def expand(pattern: str, consonants: Sequence[str], vowels: Sequence[str], encoding: Optional['Encoding'] = None) -> str:
     '''
-    Joins the elements of the list and returns a non-capturing regex group of the form '(?:e1|e2|e3...)'.
+    Replaces the placeholders in a rule's pattern with groups of phonemes: '{C}' and '{V}' stand for the given consonants and vowels, and a name like
+    '{nasal}' for a natural class (see features.CLASSES) resolved against them.
 
     Parameters
     ----------
-    include : list[str]
-        The list of elements to include in the group.
-    *exclude : str
-        Elements which should be excluded from the list.
+    pattern : str
+        The pattern of the rule.
+    consonants : Sequence[str]
+        The consonants at the time the rule applies.
+    vowels : Sequence[str]
+        The vowels at the time the rule applies.
+    encoding : Encoding | None
+        The encoding the pattern has been encoded with, if any. The phonemes are encoded before they're inserted into the pattern.
 
     Returns
     -------
     str
-        The non-capturing group.
+        The expanded pattern.
+
+    Raises
+    ------
+    ValueError
+        If the pattern uses an unknown natural class, or a phoneme in the inventories has no features.
     '''
 
-    return '(?:' + '|'.join(i for i in include if i not in exclude) + ')'
+    def group(match: regex.Match) -> str:
+        if match[1] == 'C':
+            members: Sequence[str] = consonants
+        elif match[1] == 'V':
+            members = vowels
+        else:
+            members = features.natural_class(match[1], consonants, vowels)
+        if encoding:
+            members = [encoding.encode(p) for p in members]
+        return join(members, *match[2].split('-')[1:])
 
-def to_proto_western_romance(word: str, debug: bool = False) -> str:
+    return _placeholder.sub(group, pattern)
+
+def change_inventory(inventory: list[str], changes: Sequence[str]) -> None:
     '''
-    Simulates the sounds changes that occurred between Latin and Proto-Western Romance and returns the result.
+    Applies a rule's changes to the consonants or vowels in place.
 
     Parameters
     ----------
-    word : str
-        The word to apply the sound changes to.
-    debug : bool
-        If True, debug information will be output.
+    inventory : list[str]
+        The consonants or vowels.
+    changes : Sequence[str]
+        The changes, where '+x' adds x and '-x' removes it.
+    '''
 
-    Returns
-    -------
-    str
-        The evolved word.
+    for change in changes:
+        sign, phoneme = change[0], change[1:]
+        if sign == '+':
+            if phoneme not in inventory:
+                inventory.append(phoneme)
+        elif sign == '-':
+            if phoneme in inventory:
+                inventory.remove(phoneme)
+        else:
+            raise ValueError(f'Invalid inventory change {change!r}')
+
+class Encoding(NamedTuple):
     '''
-    
-    global consonants, vowels
+    The encoding the rules are compiled against. Python stores a string with two bytes per character as soon as it contains a single character outside
+    Latin-1, which most IPA symbols are, so those characters are swapped with C1 control characters, which never appear in the input. The swap is its own
+    inverse, so the same table both encodes and decodes, and a word which contains control characters anyway still comes back unchanged.
 
-    # Substitute "kʷ" for /kw/ and "gʷ" for /gw/. The velarized forms of /k/ and /g/ evolve differently from regular /k/ and /g/, but they're difficult to type, so this substitution should help.
-    word = sub('kw', 'kʷ', word, debug)
-    word = sub('gw', 'gʷ', word, debug)
+    Phonemes written with more than one character (like 'kʷ', 'a~' and 'a:') are left as they are. The rules match their parts separately (':' is dropped
+    by itself, 'k' in a lookbehind also precedes 'ʷ', and so on), so merging them into single characters would change what the rules do.
+    '''
 
-    consonants.extend(['kʷ', 'gʷ'])
+    table: dict[int, int]
 
-    # Dissimilation of multiple /kw/s.
-    word = sub('kʷ(?=.+kʷ)', 'k', word, debug)
+    def encode(self, word: str) -> str:
+        return word.translate(self.table) if self.table else word
 
-    # Introduction of short /i/ before initial /s/ + consonant.
-    word = sub(f'^(?=s{join(consonants)})', 'i', word, debug)
+    def decode(self, word: str) -> str:
+        return word.translate(self.table) if self.table else word
 
-    # Reduction of 10 vowels to 7. Unstressed /ɛ/, /ɔ/ raised to /e/, /o/, respectively.
-    # TODO: I'm not sure at the moment if this only affected /aj/ from <ae> or if it affected /ai/ + vowel clusters as well. Similarly for /oj/. For now I'm going to assume that it only affected <ae>/<oe>.
-    word = sub('a:', 'a', word, debug)
-    word = sub(f'aj(?={join(consonants)}|$)|e(?!:)', 'ɛ', word, debug)
-    word = sub(f'oj(?={join(consonants)}|$)|e:|(?:i|y)(?!:)', 'e', word, debug)
-    word = sub('(?:i|y):', 'i', word, debug)
-    word = sub('o(?!:)', 'ɔ', word, debug)
-    word = sub('u(?!:)|o:', 'o', word, debug)
-    word = sub('u:', 'u', word, debug)
-    word = sub('(?<!/)ɛ', 'e', word, debug)
-    word = sub('(?<!/)ɔ', 'o', word, debug)
+# The C1 control characters, except for NEL, which the regex module can treat as a line break.
+_CONTROL_CHARACTERS = [chr(i) for i in range(0x80, 0xa0) if i != 0x85]
 
-    vowels.extend(['ɛ', 'ɔ'])
+def make_encoding(table: RuleTable) -> Encoding:
+    '''
+    Works out the encoding for a rule table. Every character outside Latin-1 used by the rules or the inventories is swapped with a control character. If
+    there are more of them than there are control characters, the rest are left as they are, which is still correct, just not as compact.
 
-    # Loss of final /m/ except in monosyllables, which becomes /n/.
-    # TODO: Based on examples, this appears to have also happened to final /n/ in words borrowed from Gaulish.
-    word = sub(f'(?<={join(vowels)}{join(consonants)}*/?{join(vowels)})(?:m|n)$', '', word, debug)
-    word = sub('m$', 'n', word, debug)
+    Parameters
+    ----------
+    table : RuleTable
+        The rules to encode.
 
-    # Loss of /h/.
-    word = sub('h', '', word, debug)
+    Returns
+    -------
+    Encoding
+        The encoding.
+    '''
 
-    # I'm going to leave /h/ in the list for the time being as it can reappear in Germanic borrowings in later periods.
-    # consonants.remove('h')
+    used: set[str] = set()
+    for phoneme in table.consonants + table.vowels:
+        used.update(phoneme)
+    for rule in table.rules:
+        used.update(rule.pattern, rule.repl)
+    wide = sorted(char for char in used if ord(char) > 0xff)
+    swaps: dict[int, int] = {}
+    for char, control in zip(wide, _CONTROL_CHARACTERS):
+        swaps[ord(char)] = ord(control)
+        swaps[ord(control)] = ord(char)
+    return Encoding(swaps)
+
+class CompiledRule(NamedTuple):
+    '''
+    A rule along with its compiled pattern and the characters a word has to contain for the pattern to match (see analysis.required_characters()).
+    '''
 
-    # /ns/ > /s/.
-    word = sub('ns', 's', word, debug)
+    rule: Rule
+    pattern: Union[re.Pattern, regex.Pattern]
+    requires: tuple[frozenset[str], ...]
 
-    # /rs/ > /ss/.
-    # TODO: There are some expections to this, but they aren't clearly defined, so I'm going to ignore them now.
-    word = sub('rs', 'ss', word, debug)
+class DeadRule(NamedTuple):
+    '''
+    A rule which can never match, along with the reason why and the number of rules of its stage which were kept before it (where it would have been
+    among them).
+    '''
 
-    # Final /er/ > /re/, /or/ > /ro/.
-    # TODO: It's unspecified if this happens to /ɛr/ and /ɔr/ as well. I don't believe Latin ever allowed stress on the final syllable, and since /ɛ/ and /ɔ/ are only ever stressed, these combinations might not be possible. As such, I'm going to ignore them for now. However, it doesn't indicate whether it happens with stressed /e/ and /o/ either, but again, since I don't believe Latin ever allowed stress to fall on the final syllable, this probably doesn't occur, so I'm going to assume it's only unstressed until I see an example indicating otherwise. I also suspect that this doesn't happen in single syllable words, since Latin <per> > French <par>.
-    word = sub(f'(?<={join(vowels)}{join(consonants)}+)(e|o)r$', 'r\\1', word, debug)
+    rule: Rule
+    reason: str
+    position: int
 
-    # Loss of unstressed interior syllables between /k/, /g/ and /r/, /l/.
-    # TODO: It's unspecified if this applies to /a/ or not, which typically resists being lost in other situations. For now, I'm going to assume that it's lost with the others.
-    word = sub(f'(?<=k|g){join(vowels)}(?=r|l)', '', word, debug)
+class Step(NamedTuple):
+    '''
+    A single pass over the word which carries out one or more consecutive rules, along with the characters a word has to contain for it to do anything.
+    The pattern and replacement describe what apply() does: a pattern with a replacement string is a plain substitution, a pattern with a table replaces
+    whatever character it matches according to the table, and a table without a pattern is a str.translate table.
+    '''
 
-    # Reduction of /e/, /i/ in hiatus to /j/, followed by palatalization. Stress shifts forward. /k/ geminates before palatalization.
-    word = sub(f'(/?)(?:e|i)(?=/?{join(vowels)})', 'j\\1', word, debug)
-    word = sub(f'(?<={join(consonants)})j', 'ʲ', word, debug)
-    word = sub('(?<!k)kʲ', 'kkʲ', word, debug)
+    rules: tuple[Rule, ...]
+    apply: Callable[[str], str]
+    requires: tuple[frozenset[str], ...]
+    pattern: Optional[Union[re.Pattern, regex.Pattern]]
+    repl: Union[str, dict[str, str]]
 
-    # Reduction of /o/, /u/ in hiatus to /w/. Stress shifts backward if possible. Initial /w/ > /v/.
-    # TODO: Not gonna lie, I'm purely guessing on the "initial /w/ > /v/" part based on some examples that I've seen, but I have no idea how to explain certain later changes otherwise.
-    word = sub(f'({join(vowels)})(/?)(?:o|u)(?=/?{join(vowels)})', '\\1\\2w', word, debug)
-    word = sub(f'(/?)(?:o|u)(?=/?{join(vowels)})', 'w\\1', word, debug)
-    word = sub('^w', 'v', word, debug)
+class CompiledStage(NamedTuple):
+    '''
+    The compiled rules of a stage, the steps which carry them out, the consonants and vowels once the stage is complete, the encoding the rules and steps
+    work in, and the rules which were left out because they can never match (see compile_rules()). The consonants and vowels aren't encoded.
+    '''
 
-    # /k/, /g/ palatalized before front vowels.
-    word = sub('(?<=k|g)(/?(?:e|i|ɛ))', 'ʲ\\1', word, debug)
+    rules: tuple[CompiledRule, ...]
+    steps: tuple[Step, ...]
+    consonants: tuple[str, ...]
+    vowels: tuple[str, ...]
+    encoding: Encoding
+    dropped: tuple[DeadRule, ...] = ()
 
-    # Initial /j/ and /dʲ/, /gʲ/, /z/ > /ɟ/.
-    word = sub('^j|dʲ|gʲ|z', 'ɟ', word, debug)
+def compile_pattern(pattern: str, backend: str = 'auto') -> Union[re.Pattern, regex.Pattern]:
+    '''
+    Compiles a pattern with the given backend. The regex module is only needed for a few features (mainly variable-width lookbehinds), so with 'auto' the
+    pattern is compiled with the faster re module whenever it can be.
 
-    consonants.append('ɟ')
+    Parameters
+    ----------
+    pattern : str
+        The pattern to compile.
+    backend : str
+        'auto', 're' or 'regex'.
 
-    return word
+    Returns
+    -------
+    re.Pattern | regex.Pattern
+        The compiled pattern.
+    '''
 
-def to_proto_gallo_ibero_romance(word: str, debug: bool = False) -> str:
+    if backend == 'regex':
+        return regex.compile(pattern)
+    if backend == 're':
+        return re.compile(pattern)
+    if backend != 'auto':
+        raise ValueError(f'Unknown backend {backend!r}')
+    try:
+        return re.compile(pattern)
+    except re.error:
+        return regex.compile(pattern)
+
+def plan_steps(compiled: Sequence[CompiledRule], fuse: bool = True, backend: str = 'auto') -> tuple[Step, ...]:
     '''
-    Simulates the sounds changes that occurred between Latin and Proto-Gallo-Ibero-Romance and returns the result.
+    Works out the passes needed to carry out a sequence of rules. Runs of adjacent rules which just map single characters to other characters (see
+    analysis.character_mapping()) are combined into a single str.translate call. Runs of adjacent single character substitutions which provably commute
+    (see analysis.commute()) are combined into a single regex which looks up the replacement of whatever character it matched. Every other rule gets a
+    pass of its own.
 
     Parameters
     ----------
-    word : str
-        The word to apply the sound changes to.
-    debug : bool
-        If True, debug information will be output.
+    compiled : Sequence[CompiledRule]
+        The rules, in order.
+    fuse : bool
+        If False, every rule gets a pass of its own.
+    backend : str
+        The backend to compile combined patterns with. See compile_pattern().
 
     Returns
     -------
-    str
-        The evolved word.
+    tuple[Step, ...]
+        The steps, in order.
     '''
-    
-    global consonants, vowels
-
-    # /kʲ/, /tʲ/ merge to /ʦʲ/.
-    word = sub('kkʲ', 'ttʲ', word, debug)
-    word = sub('(?:k|t)ʲ', 'ʦʲ', word, debug)
-
-    consonants.append('ʦ')
-
-    # /nkt/ > /nt/, /nks/ > /ns/, /kt/ > /jt/, /ks/ > /jss/, /gm/ > /wm/.
-    # TODO: I think the /ks/ case becomes /jss/ as opposed to /js/ as suggested because it maintains an /s/ in French, rather than leniting to /z/, so it must've been long.
-    # word = sub('(?<=n)k(?=s|t)', '', word, debug)
-    word = sub('k(?=s)', 'js', word, debug)
-    word = sub('k(?=t)', 'j', word, debug)
-    word = sub('gm', 'wm', word, debug)
-
-    # First diphthongization: stressed open /ɛ/ > /jɛ/, /ɔ/ > /wɔ/. This also happens in closed syllables before /j/.
-    # TODO: Based on examples, it appears that /ɔ/ remains before nasals.
-    word = sub(f'/ɛ(?={join(consonants)}ʲ?{join(vowels)}|j)', 'j/ɛ', word, debug)
-    word = sub(f'(?<!w)/ɔ(?=(?:{join(consonants, "n", "m")}|(?:p|b|t|d|g|k)(?:r|l))ʲ?{join(vowels)}|j)', 'w/ɔ', word, debug)
-
-    # /a/ > /ɔ/ before back rounded vowels or /g/ + back rounded vowels. This also happens to /aw/ before /g/ + back rounded vowels.
-    # TODO: Based on examples, I think the /a/ might need to be stressed. If you allow both stressed and unstressed /a/, you get contradicting examples. I'm not entirely sure on this though, so I might change it later.
-    word = sub(f'/a(?=(?:o|u|ɔ)|w{join(vowels)}|(?:g|k)(?:o|u|ɔ))', '/ɔ', word, debug)
-    word = sub(f'aw(?=(?:g|k)/?(?:o|u|ɔ))', 'ɔ', word, debug)
-    word = sub(f'(?<={join(vowels, "ɔ")})w(?=/?{join(vowels)})', 'v', word, debug)
-
-    # First lenition.
-    # TODO: Based on examples, I'm guessing that preceding diphthongs still count.
-    word = sub(f'(?<={join(vowels)}w?j?)(?:b|f)(?=r?ʲ?/?{join(vowels)})', 'v', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)p(?=(?:r|l)?ʲ?/?{join(vowels)})', 'b', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)d(?=r?ʲ?/?{join(vowels)}|$)', 'ð', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)t(?=r?ʲ?/?{join(vowels)}|$)', 'd', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)s(?=ʲ?/?{join(vowels)})', 'z', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)ʦ(?=ʲ?/?{join(vowels)})', 'ʣ', word, debug)
-    word = sub(f'(?<=ɔ)(?:g|k)(?=/?(?:o|u|ɔ|w))', 'w', word, debug)
-    word = sub(f'(?<={join(vowels)})g(?=/?(?:o|u|ɔ))', '', word, debug)
-    word = sub('(?<=u|w)g(?=/?a)', '', word, debug)
-    word = sub('(?<=o|ɔ)g(?=/?a)', 'v', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)g(?=(?:n|r|l)?ʲ?/?{join(vowels)})', 'j', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)k(?=(?:r|l)?ʲ?/?{join(vowels)})', 'g', word, debug)
-    word = sub(f'(?<=i|e|ɛ)kʷ(?=/?{join(vowels)})', 'w', word, debug)
-
-    consonants.extend(['ð', 'ʣ'])
-
-    # Formation of palatal new palatal consonants: /ɲ/, /ʎ/.
-    word = sub('jn|nj|nɟ|nʲ', 'ɲ', word, debug)
-    word = sub('jl|gl|lʲ', 'ʎ', word, debug)
-
-    consonants.extend(['ɲ', 'ʎ'])
-
-    # First vowel loss: loss of pretonic vowels except /a/ when not initial. This sporadically occurs before the first lenition.
-    # TODO: Based on examples, it looks like initial vowels are then reduced to /ə/.
-    word = sub(f'(?<={join(vowels)}{join(consonants)}*){join(vowels, "a")}(?={join(consonants)}*(?:ʲ|j|w)?/{join(vowels)})', '', word, debug)
-
-    # TODO: Consonant clusters are reduced here, but the mechanisms are complicated. Ignoring it for now.
 
-    return word
+    steps: list[Step] = []
+    run: list[Rule] = []
+    table: dict[str, str] = {}
+    group: list[CompiledRule] = []
+    substitutions: list[tuple[frozenset[str], str, frozenset[str]]] = []
+
+    def end_run() -> None:
+        if not run:
+            return
+        if len(table) == 1:
+            [(source, target)] = table.items()
+            apply = operator.methodcaller('replace', source, target)
+        else:
+            apply = operator.methodcaller('translate', str.maketrans(table))
+        steps.append(Step(tuple(run), apply, (frozenset(table),), None, dict(table)))
+        run.clear()
+        table.clear()
+
+    def end_group() -> None:
+        if len(group) == 1:
+            rule, pattern, requires = group[0]
+            steps.append(Step((rule,), functools.partial(pattern.sub, rule.repl), requires, pattern, rule.repl))
+        elif group:
+            # The characters the rules replace don't overlap, so the matched character is enough to tell which rule matched.
+            targets = {char: target for consumed, target, _ in substitutions for char in consumed}
+            pattern = compile_pattern('|'.join(f'(?:{c.pattern.pattern})' for c in group), backend)
+            steps.append(Step(tuple(c.rule for c in group), functools.partial(pattern.sub, lambda m: targets[m[0]]), (frozenset(targets),), pattern, targets))
+        group.clear()
+        substitutions.clear()
+
+    for rule, pattern, requires in compiled:
+        mapping = analysis.character_mapping(pattern.pattern, rule.repl) if fuse else None
+        if mapping is None:
+            end_run()
+            substitution = analysis.substitution(pattern.pattern, rule.repl) if fuse else None
+            if substitution is None or not analysis.commute(substitutions + [substitution]):
+                end_group()
+            group.append(CompiledRule(rule, pattern, requires))
+            if substitution is None:
+                end_group()
+            else:
+                substitutions.append(substitution)
+            continue
+        end_group()
+        # Apply the mapping to the output of the earlier rules in the run, then to the characters none of them touch.
+        sources, target = mapping
+        for char in table:
+            if table[char] in sources:
+                table[char] = target
+        for char in sources:
+            table.setdefault(char, target)
+        run.append(rule)
+    end_run()
+    end_group()
+    return tuple(steps)
+
+# The characters a word can contain besides the phonemes of the initial inventories: the stress and length marks.
+MARKS = '/:'
+
+def _dead_reason(requires: tuple[frozenset[str], ...], present: set[str], removed: dict[str, str], encoding: Encoding) -> Optional[str]:
+    '''
+    Works out why a rule can never match for lack of a character, if it can't. present holds the characters which can occur in a word when the rule
+    applies, and removed which rule last removed each of the characters which can't.
+    '''
 
-def to_early_old_french(word: str, debug: bool = False) -> str:
+    for clause in requires:
+        if clause.isdisjoint(present):
+            needed = ', '.join(repr(encoding.decode(c)) for c in sorted(clause))
+            needed = needed if len(clause) == 1 else f'one of {needed}'
+            removers = sorted({removed[c] for c in clause if c in removed})
+            if removers:
+                return f'it needs {needed}, which {", ".join(removers)} removed and no rule since has written back'
+            return f'it needs {needed}, which neither the input nor any earlier rule can produce'
+    return None
+
+def compile_rules(table: RuleTable, backend: str = 'auto', encode: bool = True, drop_dead: bool = False) -> dict[Stage, CompiledStage]:
     '''
-    Simulates the sounds changes that occurred between Latin and Early Old French and returns the result.
+    Compiles the pattern of every rule in the table against the consonants and vowels at the time it applies.
+
+    Rules can also be checked for whether they can ever match. A rule can't if it needs a character which can't occur in a word at the time it applies,
+    because it's not one of the MARKS or part of a phoneme of the inventories the word entered the cascade with and no earlier rule writes it, or because
+    an earlier rule removes it everywhere, like an unconditional deletion. It also can't if one of its lookarounds contradicts what the pattern consumes
+    right next to it (see analysis.contradiction()). Such rules only cost a scan of every word, so they can be dropped. As a word can enter the cascade at
+    any rule (see Engine.evolve()), a rule is only dropped if it can't match wherever the word entered. This relies on the words following the
+    input conventions.
 
     Parameters
     ----------
-    word : str
-        The word to apply the sound changes to.
-    debug : bool
-        If True, debug information will be output.
+    table : RuleTable
+        The rules to compile.
+    backend : str
+        The backend to compile the patterns with. See compile_pattern().
+    encode : bool
+        If True, the rules are compiled against the encoding from make_encoding(). Otherwise they work on IPA directly.
+    drop_dead : bool
+        If True, rules which can never match are left out, and listed in the dropped rules of their stage along with the reason why.
 
     Returns
     -------
-    str
-        The evolved word.
+    dict[Stage, CompiledStage]
+        The compiled stages, in order.
     '''
-    
-    global consonants, vowels
-
-    # /ɟ/ when initial and following a consonant become /ʤ/. All others become /j/.
-    word = sub(f'^ɟ|(?<={join(consonants, "w", "j")}ʲ?)ɟ', 'ʤ', word, debug)
-    word = sub('ɟ', 'j', word, debug)
-
-    consonants.remove('ɟ')
-
-    # /j/ palatalizes following consonants.
-    # TODO: It's unspecified if the palatalization passes through clusters. For now I'll assume that that situation doesn't occur.
-    word = sub(f'j({join(consonants, "ɲ", "ʎ")}(?!ʲ))', 'j\\1ʲ', word, debug)
 
-    # Consonants depalatalize and eject a /j/ (sometimes two).
-    word = sub(f'(?<={join(vowels)})(?:b|v)ʲ(?=/?{join(vowels)})', 'ʤ', word, debug)
-    word = sub(f'(?<={join(vowels)})(?:p|f)ʲ(?=/?{join(vowels)})', 'ʧ', word, debug)
-    word = sub(f'(?<={join(vowels)})mʲ(?=/?{join(vowels)})', 'nʤ', word, debug)
-    word = sub(f'arʲ(?=/?{join(vowels)})', 'jarʲ', word, debug)
-    word = sub(f'(?<={join(vowels)})((?:{join(consonants, "r")}|ss)ʲ)(?=/?{join(vowels)})', 'j\\1', word, debug)
-    word = sub(f'({join(consonants)}ʲ|ʤ|ʧ)(?=/(?:a|æ|e)j?w?(?:{join(consonants)}ʲ?{join(vowels)}|$))', '\\1j', word, debug)
-    word = sub('ʲ', '', word, debug)
-
-    consonants.append('ʧ')
-
-    # Second diphthongization: stressed open /e/ > /ej/, /o/ > /ow/, /a/ > /æ/ when not followed by /j/.
-    # TODO: Based on examples, it appears that /o/ remains before nasals, and /a/ remains before /ɲ/.
-    word = sub(f'/e(?=(?:{join(consonants, "j")}|(?:p|b|t|d|g|k)(?:r|l)){join(vowels)}|$)', '/ej', word, debug)
-    word = sub(f'/o(?=(?:{join(consonants, "j", "n", "m", "ɲ")}|(?:p|b|t|d|g|k)(?:r|l)){join(vowels)}|$)', '/ow', word, debug)
-    word = sub(f'/a(?=(?:{join(consonants, "j", "ɲ")}|(?:p|b|t|d|g|k)(?:r|l)){join(vowels)}|$)', '/æ', word, debug)
-
-    vowels.append('æ')
-
-    # /ɔ/ combines with back rounded vowels to produce /ɔw/.
-    word = sub('(?<=ɔ)g?(?:o|u|ɔ)', 'w', word, debug)
-
-    # TODO: I originally included these steps as part of the second lenition below, but based on examples, these need to happen before the posttonic vowel loss.
-    word = sub(f'(?<={join(vowels)})g(?=/?(?:o|u|ɔ))', '', word, debug)
-    word = sub('(?=o|u|ɔ|w)g(?=/?a)', '', word, debug)
-
-    # Loss of posttonic vowels except /a/, which reduces to /ə/. Remaining final vowels except /a/ reduced to /ə/.
-    # TODO: Because the vocalization of /l/ needed to occur after the vowel loss, this step continues with the reduction to /ə/ after the vocalization step below.
-    word = sub(f'(?<=/{join(vowels)}{join(consonants)}*){join(vowels, "a")}', '', word, debug)
-
-    # Vocalization of /l/ before consonants began in the ninth century with /l/ > /ɫ/. It's not specified exactly when, but it for certain had to have begun before the loss of gemination as vocalization occurred in /ll/ as well except before /a/. Vocalization won't complete until much later, however, when /ɫ/ > /w/.
-    # TODO: Based on examples, it looks like this affects /ʎ/ before consonants as well.
-    word = sub('lla', 'la', word, debug)
-    word = sub('ll', 'ɫɫ', word, debug)
-    word = sub(f'(?:l|ʎ)(?={join(consonants, "j", "w")})', 'ɫ', word, debug)
-
-    consonants.append('ɫ')
-
-    # This is the continuation of the vowel loss mentioned above.
-    word = sub(f'(?<=/{join(vowels)}{join(consonants)}*){join(vowels)}', 'ə', word, debug)
-
-    vowels.append('ə')
-
-    # TODO: Consonant clusters may be reduced here again.
-    # /tl/ > /kl/.
-    word = sub('tl', 'kl', word, debug)
-
-    # Second lenition.
-    # TODO: Based on examples, I'm guessing preceding diphthongs still count.
-    word = sub(f'(?<={join(vowels)}w?j?)(?:b|f)(?=r?/?{join(vowels)})', 'v', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)p(?=(?:r|l)?/?{join(vowels)})', 'b', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)d(?=r?/?{join(vowels)}|$)', 'ð', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)t(?=r?/?{join(vowels)}|$)', 'd', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)s(?=/?{join(vowels)})', 'z', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)ʦ(?=/?{join(vowels)})', 'ʣ', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)g(?=(?:n|r|l)?/?{join(vowels)})', 'j', word, debug)
-    word = sub(f'(?<={join(vowels)}w?j?)k(?=(?:r|l)?/?{join(vowels)})', 'g', word, debug)
-    word = sub(f'(?<=i|e|ɛ|æ)kʷ(?=/?{join(vowels)})', 'w', word, debug)
-
-    # Palatalization of /k/ > /ʧ/, /g/ > /ʤ/ before /a/.
-    # TODO: Although unspecified. I suspect this happened before /æ/ as well. It looks like this also affected /kk/ and /gg/.
-    word = sub('k?k(?=/?(?:a|æ))', 'ʧ', word, debug)
-    word = sub('g?g(?=/?(?:a|æ))', 'ʤ', word, debug)
-
-    consonants.append('ʧ')
-    
-    # /æ/ > /jɛ/ after /ʧ/ or /ʤ/ and followed by a nasal or /j/, or /aj/ before nasals if not preceeded by /j/, otherwise /ɛ/.
-    # TODO: The addition of /j/ after /ʧ/ or /ʤ/ seems to have been universal, but by Modern French, based on examples, the /j/ only remains if followed by a nasal. Compare the evolution of <cher> vs <chien>.
-    word = sub('(?<=ʧ|ʤ)/æ(?=(?:j|n|m|ɲ))', 'j/ɛ', word, debug)
-    word = sub('(?<!j)/æ(?=(?:n|m|ɲ))', '/aj', word, debug)
-    word = sub('æ', 'ɛ', word, debug)
-
-    vowels.remove('æ')
-
-    # /aw/ > /ɔ/.
-    word = sub('aw', 'ɔ', word, debug)
-
-    # Loss of gemination accept for /rr/.
-    word = sub(f'({join(consonants, "r")})\\1', '\\1', word, debug)
-
-    # Final stops and fricatives devoiced.
-    # TODO: I'm assuming this also happens to affricates based on /ʣ/ not being listed in the deaffrication step which happens later in combination with the following step in which it deaffricates to /z/. Otherwise, this sound would still exist in modern French.
-    word = sub('b$', 'p', word, debug)
-    word = sub('v$', 'f', word, debug)
-    word = sub('d$', 't', word, debug)
-    word = sub('ð$', 'θ', word, debug)
-    word = sub('z$', 's', word, debug)
-    word = sub('ʣ$', 'ʦ', word, debug)
-    word = sub('g$', 'k', word, debug)
-
-    consonants.append('θ')
-
-    # /ʣ/ > /z/ when not final.
-    word = sub('ʣ(?!$)', 'z', word, debug)
-
-    consonants.remove('ʣ')
-
-    # /t/ inserted between /ɲ/, /ʎ/ and following /s/.
-    word = sub('(ɲ|ʎ)s', '\\1ʦ', word, debug)
-
-    # Depalatalization of /ɲ/, /ʎ/ when following a consonant or final.
-    # TODO: Based on examples, it looks like it happens to /ɲ/ when followed by consonants also.
-    word = sub(f'ɲ(?={join(consonants)})', 'jn', word, debug)
-    word = sub(f'(?<={join(consonants, "j")})ɲ|(?<!j)ɲ$', 'jn', word, debug)
-    word = sub(f'(?<={join(consonants)})ʎ|ʎ$', 'l', word, debug)
-
-    # /jaj/, /jɛj/, /jej/ > /i/ and /wɔj/ > /uj/.
-    word = sub('j(/?)(?:a|ɛ|e)j', '\\1i', word, debug)
-    word = sub('w(/?)ɔj', '\\1uj', word, debug)
-
-    # Final /a/ > /ə/.
-    # TODO: I think this occurs for unstressed /a/s in other places too, but need examples.
-    word = sub('a$', 'ə', word, debug)
+    encoding = make_encoding(table) if encode else Encoding({})
+    consonants = list(table.consonants)
+    vowels = list(table.vowels)
+    # The characters which can occur in a word, and the rules which removed the ones which can't, for a word entering at each rule so far.
+    entries: list[tuple[set[str], dict[str, str]]] = []
+    stages: dict[Stage, CompiledStage] = {}
+    for stage in Stage:
+        compiled: list[CompiledRule] = []
+        dropped: list[DeadRule] = []
+        for rule in table.rules:
+            if rule.stage != stage:
+                continue
+            if drop_dead:
+                entries.append((set(encoding.encode(''.join(consonants + vowels) + MARKS)), {}))
+            rule_ = rule._replace(pattern=encoding.encode(rule.pattern), repl=encoding.encode(rule.repl))
+            pattern = expand(rule_.pattern, consonants, vowels, encoding)
+            requires = analysis.required_characters(pattern)
+            change_inventory(consonants, rule.consonants)
+            change_inventory(vowels, rule.vowels)
+            if drop_dead:
+                if contradiction := analysis.contradiction(encoding.decode(pattern)):
+                    dropped.append(DeadRule(rule, f'it can never match, as {contradiction}', len(compiled)))
+                    continue
+                reasons = [_dead_reason(requires, present, removed, encoding) for present, removed in entries]
+                if all(reasons):
+                    dropped.append(DeadRule(rule, reasons[0], len(compiled)))
+                    continue
+                written = analysis.replacement_characters(rule_.repl)
+                mapping = analysis.character_mapping(pattern, rule_.repl)
+                for reason, (present, removed) in zip(reasons, entries):
+                    # A rule which can't match a word entering at some stage doesn't change what that word can contain.
+                    if reason:
+                        continue
+                    for char in written:
+                        present.add(char)
+                        removed.pop(char, None)
+                    if mapping:
+                        for char in mapping[0] - set(mapping[1]):
+                            present.discard(char)
+                            removed[char] = rule.id
+            compiled.append(CompiledRule(rule_, compile_pattern(pattern, backend), requires))
+        steps = plan_steps(compiled, backend=backend)
+        stages[stage] = CompiledStage(tuple(compiled), steps, tuple(consonants), tuple(vowels), encoding, tuple(dropped))
+    return stages
+
+def recompile(rulebook: dict[Stage, CompiledStage], backend: str) -> dict[Stage, CompiledStage]:
+    '''
+    Compiles the patterns of a compiled rulebook again with another backend.
 
-    return word
+    Parameters
+    ----------
+    rulebook : dict[Stage, CompiledStage]
+        The compiled rules.
+    backend : str
+        The backend to compile the patterns with. See compile_pattern().
 
-def to_old_french(word: str, debug: bool = False) -> str:
+    Returns
+    -------
+    dict[Stage, CompiledStage]
+        The recompiled stages.
     '''
-    Simulates the sounds changes that occurred between Latin and Old French and returns the result.
+
+    stages: dict[Stage, CompiledStage] = {}
+    for stage, compiled in rulebook.items():
+        recompiled = tuple(c._replace(pattern=compile_pattern(c.pattern.pattern, backend)) for c in compiled.rules)
+        stages[stage] = compiled._replace(rules=recompiled, steps=plan_steps(recompiled, backend=backend))
+    return stages
+
+def rulebook_hash(rulebook: dict[Stage, CompiledStage]) -> str:
+    '''
+    Hashes a compiled rulebook: its rules, the consonants and vowels after each stage, and the rules it dropped. Two rulebooks with the same hash give the
+    same results, so anything derived from a rulebook can be cached under its hash.
 
     Parameters
     ----------
-    word : str
-        The word to apply the sound changes to.
-    debug : bool
-        If True, debug information will be output.
+    rulebook : dict[Stage, CompiledStage]
+        The compiled rules.
 
     Returns
     -------
     str
-        The evolved word.
+        The SHA-256 hash, in hex.
     '''
-    
-    global consonants, vowels
 
-    # Loss of /f/, /p/, /k/ before final /s/, /t/.
-    word = sub('(?:f|p|k)(?=s$|t$)', '', word, debug)
+    contents = [(stage, [c.rule for c in compiled.rules], compiled.consonants, compiled.vowels, compiled.dropped) for stage, compiled in rulebook.items()]
+    return hashlib.sha256(repr(contents).encode('utf-8')).hexdigest()
 
-    # Nasalization of low vowels before all nasals.
-    word = sub('((?:a|e|o|ɛ|ɔ|ɑ)(?:w|j)?)(?=m|n|ɲ)', '\\1~', word, debug)
+class RuleTimeoutError(TimeoutError):
+    '''
+    Raised when a rule takes longer to run over a word than the engine's timeout allows.
 
-    # /ej/ > /oj/ (blocked by nasalization).
-    word = sub('ej(?!~)', 'oj', word, debug)
+    Attributes
+    ----------
+    rule_id : str
+        The id of the rule.
+    stage : Stage
+        The stage the rule belongs to.
+    word : str
+        The word the rule was run over, as the rule received it.
+    timeout : float
+        The timeout, in seconds.
+    '''
 
-    # /ow/ > /ew/ (blocked by labials and nasalization).
-    word = sub('ow(?!p|b|v|f|m|~)', 'ew', word, debug)
+    def __init__(self, rule_id: str, stage: Stage, word: str, timeout: float) -> None:
+        super().__init__(f'Rule {rule_id!r} timed out after {timeout}s on {word!r}')
+        self.rule_id = rule_id
+        self.stage = stage
+        self.word = word
+        self.timeout = timeout
 
-    # /wɔ/ > /wɛ/ (blocked by nasalization).
-    word = sub('w(/?)ɔ(?!~)', 'w\\1ɛ', word, debug)
+    def __reduce__(self) -> tuple:
+        # The error has to survive being sent back from a worker process.
+        return type(self), (self.rule_id, self.stage, self.word, self.timeout)
 
-    # /a/ > /ɑ/ before /s/ or /z/.
-    word = sub('a(?=s|z)', 'ɑ', word, debug)
+class Throughput(NamedTuple):
+    '''
+    Statistics of a call to evolve_many().
 
-    vowels.append('ɑ')
+    Attributes
+    ----------
+    words : int
+        The number of words.
+    unique : int
+        The number of distinct words, each of which was only evolved once.
+    seconds : float
+        The time spent in evolve_many(). For a lazy call, the time the caller spent between words isn't included.
+    '''
+
+    words: int
+    unique: int
+    seconds: float
 
-    # Loss of /θ/ and /ð/. When it results in a hiatus of /a/ with a following vowel, the /a/ becomes /ə/.
-    word = sub('θ|ð', '', word, debug)
-    word = sub(f'a(?={join(vowels)})', 'ə', word, debug)
+    @property
+    def words_per_second(self) -> float:
+        return self.words / self.seconds if self.seconds else float('inf')
 
-    consonants = [i for i in consonants if i not in ('θ', 'ð')]
+class StageForms:
+    '''
+    The forms of a word at the end of every stage, from a single run of the cascade. Each form is an attribute named after its stage, as in
+    forms.old_french, and can also be looked up by stage, as in forms[Stage.OLD_FRENCH]. Iterating gives the forms in chronological order.
+    '''
 
-    # /kʷ/ > /k/ and /gʷ/ > /g/.
-    word = sub('kʷ', 'k', word, debug)
-    word = sub('gʷ', 'g', word, debug)
+    __slots__ = tuple(stage.name.lower() for stage in Stage)
 
-    consonants = [i for i in consonants if i not in ('kʷ', 'gʷ')]
+    def __init__(self, *forms: str) -> None:
+        '''
+        Parameters
+        ----------
+        *forms : str
+            The form at the end of each stage, in order.
 
-    # /u/ > /y/.
-    word = sub('u', 'y', word, debug)
+        Raises
+        ------
+        ValueError
+            If there isn't exactly one form per stage.
+        '''
 
-    vowels.append('y')
+        if len(forms) != len(self.__slots__):
+            raise ValueError(f'Expected {len(self.__slots__)} forms but got {len(forms)}')
+        for name, form in zip(self.__slots__, forms):
+            setattr(self, name, form)
 
-    # Merge of /e~/ and /ɛ~/ to /a~/, but not in /jɛ~/ or /ej~/.
-    word = sub('(?<!j)/(?:e|ɛ)(?=~)', '/a', word, debug)
-    word = sub('(?<!j|/)(?:e|ɛ)(?=~)', 'a', word, debug)
+    def __getitem__(self, stage: Stage) -> str:
+        return getattr(self, Stage(stage).name.lower())
 
-    # Nasalization of high vowels before all nasals.
-    word = sub('((?:i|u|y)(?:w|j)?)(?=m|n|ɲ)', '\\1~', word, debug)
+    def __iter__(self) -> Iterator[str]:
+        return (getattr(self, name) for name in self.__slots__)
 
-    # Reduction of /e/ and /ɛ/ in hiatus to /ə/.
-    word = sub(f'(?:e|ɛ)(?=/{join(vowels)}|(?:w|j)/{join(vowels)})', 'ə', word, debug)
+    def __len__(self) -> int:
+        return len(self.__slots__)
 
-    # Final /rn/, /rm/ > /r/.
-    # TODO: What about /rɲ/?
-    word = sub('r(?:n|m)$', 'r', word, debug)
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, StageForms) and tuple(self) == tuple(other)
 
+    def __repr__(self) -> str:
+        return 'StageForms(' + ', '.join(f'{name}={form!r}' for name, form in zip(self.__slots__, self)) + ')'
+
+def _apply_stage(compiled: CompiledStage, word: str, debug: bool) -> str:
+    '''
+    Applies the steps of a compiled stage to a word which is already encoded, or its rules one by one if debug is True.
+    '''
+
+    if debug:
+        for rule, pattern, _ in compiled.rules:
+            word = pattern.sub(rule.repl, word)
+            log(f'{rule.id}: {compiled.encoding.decode(word)}')
+        return word
+
+    # Most rules can't match most words, so skip the ones which need a character the word doesn't have. The set of characters is kept up to date as
+    # rules change the word.
+    present = set(word)
+    for _, apply, requires, _, _ in compiled.steps:
+        for clause in requires:
+            if present.isdisjoint(clause):
+                break
+        else:
+            result = apply(word)
+            if result != word:
+                word = result
+                present = set(word)
     return word
 
-def to_late_old_french(word: str, debug: bool = False) -> str:
+class CacheInfo(NamedTuple):
     '''
-    Simulates the sounds changes that occurred between Latin and Late Old French and returns the result.
+    Statistics of a ResultCache.
+
+    Attributes
+    ----------
+    hits : int
+        The number of lookups which found a result.
+    misses : int
+        The number of lookups which didn't.
+    maxsize : int
+        The most results the cache holds.
+    currsize : int
+        The number of results it holds now.
+    '''
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+class ResultCache:
+    '''
+    A bounded cache of evolved words, which engines given it check before running the cascade (see Engine). Results are keyed by the version and the
+    timeout of the engine along with the word and the options, so engines with different rules or timeouts can share a cache, and results of rules which
+    have since been edited are never returned. They're simply never looked up again, and are evicted in time. A call which runs out of time caches
+    nothing. It's safe to use from several threads at once.
+    '''
+
+    def __init__(self, maxsize: int = 4096, policy: str = 'lru') -> None:
+        '''
+        Parameters
+        ----------
+        maxsize : int
+            The most results to hold.
+        policy : str
+            Which result to evict when the cache is full: 'lru' evicts the least recently used, and 'lfu' the least frequently used, and of those the
+            least recently used.
+
+        Raises
+        ------
+        ValueError
+            If maxsize isn't positive or the policy is unknown.
+        '''
+
+        if maxsize < 1:
+            raise ValueError(f'Cache size must be positive, not {maxsize!r}')
+        if policy not in ('lru', 'lfu'):
+            raise ValueError(f'Unknown eviction policy {policy!r}')
+        self.maxsize = maxsize
+        self.policy = policy
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        # For LRU, the results from least to most recently used. For LFU, each result along with how often it's been used, and for each count, the keys
+        # used that often from least to most recently used.
+        self._results: collections.OrderedDict[tuple, str] = collections.OrderedDict()
+        self._counts: dict[tuple, int] = {}
+        self._by_count: dict[int, collections.OrderedDict[tuple, None]] = collections.defaultdict(collections.OrderedDict)
+        self._least = 0
+
+    def get(self, key: tuple) -> Optional[str]:
+        '''
+        Looks up a result, counting a hit or a miss.
+
+        Parameters
+        ----------
+        key : tuple
+            The key of the result.
+
+        Returns
+        -------
+        str | None
+            The result, or None if it isn't cached.
+        '''
+
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self.policy == 'lru':
+                self._results.move_to_end(key)
+            else:
+                self._use(key)
+            return result
+
+    def put(self, key: tuple, result: str) -> None:
+        '''
+        Caches a result, evicting another if the cache is full.
+
+        Parameters
+        ----------
+        key : tuple
+            The key of the result.
+        result : str
+            The result.
+        '''
+
+        with self._lock:
+            if key in self._results:
+                return
+            if len(self._results) >= self.maxsize:
+                if self.policy == 'lru':
+                    self._results.popitem(last=False)
+                else:
+                    evicted, _ = self._by_count[self._least].popitem(last=False)
+                    if not self._by_count[self._least]:
+                        del self._by_count[self._least]
+                    del self._results[evicted], self._counts[evicted]
+            self._results[key] = result
+            if self.policy == 'lfu':
+                self._counts[key] = 1
+                self._by_count[1][key] = None
+                self._least = 1
+
+    def _use(self, key: tuple) -> None:
+        '''
+        Moves a key up to the next count, for LFU.
+        '''
+
+        count = self._counts[key]
+        del self._by_count[count][key]
+        if not self._by_count[count]:
+            del self._by_count[count]
+            if self._least == count:
+                self._least = count + 1
+        self._counts[key] = count + 1
+        self._by_count[count + 1][key] = None
+
+    def clear(self) -> None:
+        '''
+        Empties the cache and resets the counters.
+        '''
+
+        with self._lock:
+            self._results.clear()
+            self._counts.clear()
+            self._by_count.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        '''
+        Returns the statistics of the cache.
+        '''
+
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._results))
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+class Engine:
+    '''
+    A compiled cascade. Its rules, and everything worked out from them, like the consonants and vowels at the end of each stage, are set when it's
+    created and never change afterwards, so a single engine can be used from any number of threads at once. The one thing in it which does change is
+    its cache, if it has one: results are added to it and evicted as the engine runs, under the cache's own lock (see ResultCache). Its version is the
+    hash of its rulebook (see rulebook_hash()).
+    '''
+
+    def __init__(self, rulebook: Optional[dict[Stage, CompiledStage]] = None, timeout: Optional[float] = None,
+                 cache: Optional[ResultCache] = None) -> None:
+        '''
+        Parameters
+        ----------
+        rulebook : dict[Stage, CompiledStage] | None
+            The compiled rules. Defaults to compiling the rules in sound_changes.py, leaving out the ones which can never match.
+        timeout : float | None
+            If given, the maximum time in seconds a single rule can take on a word, after which a RuleTimeoutError is raised. Only the regex module
+            supports timeouts, so every rule is then run one by one with a pattern compiled by it, which is slower than running the fused steps.
+        cache : ResultCache | None
+            If given, evolve() returns the results it holds for this engine without running the cascade, and adds the ones it doesn't.
+        '''
+
+        self.rulebook = rulebook or compile_rules(rules.load_rules(), drop_dead=True)
+        self.encoding = self.rulebook[Stage.PROTO_WESTERN_ROMANCE].encoding
+        self.timeout = timeout
+        self.cache = cache
+        if timeout is not None:
+            # The patterns compiled with the re module are recompiled with the regex module, which gives the same results (see test.py).
+            self._timed = {stage: tuple(c._replace(pattern=compile_pattern(c.pattern.pattern, 'regex')) for c in compiled.rules)
+                           for stage, compiled in self.rulebook.items()}
+        # The chronology: the date of every rule in order, the rules each rule id stands for in it (the rule itself, or none for a dropped rule, which
+        # sits right before the next rule that was kept), and the first and last rule of each stage.
+        self._dates: list[Optional[int]] = []
+        self._positions: dict[str, tuple[int, int]] = {}
+        self._bounds: dict[Stage, tuple[int, int]] = {}
+        for stage, compiled in self.rulebook.items():
+            start = len(self._dates)
+            for c in compiled.rules:
+                self._positions[c.rule.id] = (len(self._dates), len(self._dates) + 1)
+                self._dates.append(c.rule.date)
+            for dead in compiled.dropped:
+                self._positions[dead.rule.id] = (start + dead.position, start + dead.position)
+            self._bounds[stage] = (start, len(self._dates))
+
+    @functools.cached_property
+    def version(self) -> str:
+        '''
+        The hash of the rulebook (see rulebook_hash()). It's only worked out the first time it's needed.
+        '''
+
+        return rulebook_hash(self.rulebook)
+
+    def inventory(self, stage: Stage) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        '''
+        Returns the consonants and vowels once a stage is complete.
+
+        Parameters
+        ----------
+        stage : Stage
+            The stage.
+
+        Returns
+        -------
+        tuple[tuple[str, ...], tuple[str, ...]]
+            The consonants and the vowels.
+        '''
+
+        return self.rulebook[stage].consonants, self.rulebook[stage].vowels
+
+    def run_stage(self, stage: Stage, word: str, debug: bool = False) -> str:
+        '''
+        Applies the rules of a single stage to a word.
+
+        Parameters
+        ----------
+        stage : Stage
+            The stage to apply.
+        word : str
+            The word to apply the sound changes to.
+        debug : bool
+            If True, will log the id of every rule along with its output.
+
+        Returns
+        -------
+        str
+            The evolved word.
+        '''
+
+        return self.encoding.decode(self._run_stage(stage, self.encoding.encode(word), debug))
+
+    def _run_stage(self, stage: Stage, word: str, debug: bool) -> str:
+        '''
+        Applies the rules of a single stage to a word which is already encoded.
+        '''
+
+        if self.timeout is not None:
+            return self._run_rules(stage, word, debug)
+        return _apply_stage(self.rulebook[stage], word, debug)
+
+    def _run_rules(self, stage: Stage, word: str, debug: bool, first: int = 0, last: Optional[int] = None) -> str:
+        '''
+        Applies the rules of a single stage from first up to last to a word which is already encoded, one rule at a time, with the timeout if there is one.
+        '''
+
+        present = set(word)
+        timed = self.timeout is not None
+        for rule, pattern, requires in (self._timed[stage] if timed else self.rulebook[stage].rules)[first:last]:
+            if not debug and any(present.isdisjoint(clause) for clause in requires):
+                continue
+            try:
+                result = pattern.sub(rule.repl, word, timeout=self.timeout) if timed else pattern.sub(rule.repl, word)
+            except TimeoutError:
+                raise RuleTimeoutError(rule.id, stage, self.encoding.decode(word), self.timeout) from None
+            if debug:
+                log(f'{rule.id}: {self.encoding.decode(result)}')
+            if result != word:
+                word = result
+                present = set(word)
+        return word
+
+    def chronology(self, entered: Optional[Union[int, str]] = None, until: Optional[Union[int, str]] = None) -> tuple[int, int]:
+        '''
+        Finds the rules between two points of the cascade, given either as years, which are found by binary search over the dates of the rules, or as rule
+        ids. Most dates are only estimates (see rules.Rule), so a rule id is the only way to pick out an exact point. The id of a rule which was dropped because
+        it can never match stands for the point right before the next rule which was kept.
+
+        Parameters
+        ----------
+        entered : int | str | None
+            The year a word entered the language, after which the rules dated in or after it apply, or the id of the first rule which applies. Defaults to
+            the first rule.
+        until : int | str | None
+            The last year to evolve a word to, after which the rules dated in or before it apply, or the id of the last rule which applies. Defaults to the
+            last rule.
+
+        Returns
+        -------
+        tuple[int, int]
+            The position of the first rule which applies in the chronology, and of the one after the last.
+
+        Raises
+        ------
+        ValueError
+            If there's no rule with a given id, or a year is given but some of the rules aren't dated.
+        '''
+
+        if (isinstance(entered, int) or isinstance(until, int)) and None in self._dates:
+            raise ValueError('The rules aren\'t all dated')
+        if entered is None:
+            first = 0
+        elif isinstance(entered, str):
+            first = self._position(entered)[0]
+        else:
+            first = bisect.bisect_left(self._dates, entered)
+        if until is None:
+            last = len(self._dates)
+        elif isinstance(until, str):
+            last = self._position(until)[1]
+        else:
+            last = bisect.bisect_right(self._dates, until)
+        return first, last
+
+    def _position(self, rule_id: str) -> tuple[int, int]:
+        try:
+            return self._positions[rule_id]
+        except KeyError:
+            raise ValueError(f'No rule {rule_id!r}') from None
+
+    def evolve(self, word: str, debug: bool = False, start: Stage = Stage.PROTO_WESTERN_ROMANCE, stop: Stage = Stage.MODERN,
+               entered: Optional[Union[int, str]] = None, until: Optional[Union[int, str]] = None) -> str:
+        '''
+        Simulates the sounds changes that occurred between Latin and French and returns the result. See evolve().
+
+        Parameters
+        ----------
+        word : str
+            The word to apply the sound changes to.
+        debug : bool
+            If True, will log the id of every rule along with its output.
+        start : Stage
+            The first stage to apply. The word has to be in the form of the stage before it.
+        stop : Stage
+            The last stage to apply.
+        entered : int | str | None
+            The year the word entered the language, or the id of the first rule to apply (see chronology()). The rules before it are skipped, and the word
+            has to be in the form of that time.
+        until : int | str | None
+            The last year to evolve the word to, or the id of the last rule to apply. The rules after it are skipped.
+
+        Returns
+        -------
+        str
+            The evolved word.
+
+        Raises
+        ------
+        ValueError
+            If start is after stop, there's no rule with a given id, or a year is given but some of the rules aren't dated.
+        '''
+
+        if self.cache is None or debug:
+            return self._evolve(word, debug, start, stop, entered, until)
+        key = (self.version, self.timeout, word, start, stop, entered, until)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._evolve(word, debug, start, stop, entered, until)
+            self.cache.put(key, result)
+        return result
+
+    def _evolve(self, word: str, debug: bool, start: Stage, stop: Stage, entered: Optional[Union[int, str]], until: Optional[Union[int, str]]) -> str:
+        '''
+        Runs the cascade on a word. See evolve().
+        '''
+
+        if start > stop:
+            raise ValueError(f'Start stage {Stage(start).name} is after stop stage {Stage(stop).name}')
+        first, last = self.chronology(entered, until)
+        # The word is only encoded and decoded once, rather than for every stage. The rules before the first one are skipped entirely, as every pattern
+        # was compiled against the inventories at the time it applies. A stage which only partly applies is run one rule at a time.
+        word = self.encoding.encode(word)
+        for stage in map(Stage, range(start, stop + 1)):
+            lower, upper = self._bounds[stage]
+            if first <= lower and upper <= last:
+                word = self._run_stage(stage, word, debug)
+            elif max(first, lower) < min(last, upper):
+                word = self._run_rules(stage, word, debug, max(first - lower, 0), min(last, upper) - lower)
+        return self.encoding.decode(word)
+
+    def evolve_stages(self, word: str) -> StageForms:
+        '''
+        Simulates the sound changes that occurred between Latin and French, keeping the word as it stands at the end of each stage.
+
+        Parameters
+        ----------
+        word : str
+            The word to apply the sound changes to.
+
+        Returns
+        -------
+        StageForms
+            The forms of the word at the end of every stage.
+        '''
+
+        word = self.encoding.encode(word)
+        forms = []
+        for stage in Stage:
+            word = self._run_stage(stage, word, False)
+            forms.append(word)
+        return StageForms(*map(self.encoding.decode, forms))
+
+    def evolve_many(self, words: Iterable[str], lazy: bool = False,
+                    report: Optional[Callable[[Throughput], None]] = None) -> Union[list[str], Iterator[str]]:
+        '''
+        Evolves a batch of words. Each distinct word is only evolved once, however many times it appears.
+
+        Parameters
+        ----------
+        words : Iterable[str]
+            The words to apply the sound changes to.
+        lazy : bool
+            If True, the words are read and the evolved words yielded one at a time. Otherwise all of them are returned at once.
+        report : ((Throughput) -> None) | None
+            Called with the statistics of the call once every word has been evolved.
+
+        Returns
+        -------
+        list[str] | Iterator[str]
+            The evolved words, in the same order as the words.
+        '''
+
+        if lazy:
+            return self._evolve_lazily(words, report)
+        start = time.perf_counter()
+        words = list(words)
+        evolved = {word: self.evolve(word) for word in dict.fromkeys(words)}
+        results = [evolved[word] for word in words]
+        if report:
+            report(Throughput(len(words), len(evolved), time.perf_counter() - start))
+        return results
+
+    def _evolve_lazily(self, words: Iterable[str], report: Optional[Callable[[Throughput], None]]) -> Iterator[str]:
+        '''
+        Evolves a batch of words one at a time. See evolve_many().
+        '''
+
+        evolved: dict[str, str] = {}
+        count = 0
+        seconds = 0.0
+        start = time.perf_counter()
+        for word in words:
+            count += 1
+            result = evolved.get(word)
+            if result is None:
+                result = evolved[word] = self.evolve(word)
+            seconds += time.perf_counter() - start
+            yield result
+            start = time.perf_counter()
+        if report:
+            report(Throughput(count, len(evolved), seconds + time.perf_counter() - start))
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+# The cache the default engine uses, if any (see set_cache()).
+_cache: Optional[ResultCache] = None
+
+def default_engine() -> Engine:
+    '''
+    Returns the engine for the rules in sound_changes.py, which the module level functions use. It's created the first time it's needed.
+
+    Returns
+    -------
+    Engine
+        The engine.
+    '''
+
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = Engine(cache=_cache)
+    return _engine
+
+_reloader: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+def reload_rules(module: str = 'sound_changes') -> 'concurrent.futures.Future[Engine]':
+    '''
+    Reloads the rules from disk and compiles them in the background, then swaps the new engine in as the default engine. The rules of an engine never
+    change, so calls which are already running finish with the old engine, and every call made after the swap uses the new one. The new engine is given
+    the default cache (see set_cache()) under the same lock as the swap, before any other thread can see it, and keeps the results cached for the old
+    one, which are keyed by its version. If the rules haven't changed, the old engine is kept, along with everything cached for it. If they fail to load or compile, the old engine is kept too, and the error is raised by the
+    future's result().
 
     Parameters
     ----------
-    word : str
-        The word to apply the sound changes to.
-    debug : bool
-        If True, debug information will be output.
+    module : str
+        The name of the module containing the rules.
 
     Returns
     -------
-    str
-        The evolved word.
+    concurrent.futures.Future[Engine]
+        The default engine once the reload is done.
     '''
-    
-    global consonants, vowels
 
-    # /o/ > /u/.
-    word = sub('o(?!j)', 'u', word, debug)
+    global _reloader
+
+    def reload() -> Engine:
+        global _engine
+        engine = Engine(compile_rules(rules.load_rules(module, fresh=True), drop_dead=True))
+        # The rulebook is hashed before taking the lock, and the cache is only read while holding it, so a reload can't undo a call to set_cache().
+        version = engine.version
+        with _engine_lock:
+            if _engine is None or _engine.version != version:
+                engine.cache = _cache
+                _engine = engine
+            return _engine
+
+    with _engine_lock:
+        if _reloader is None:
+            # A single thread, so that reloads are carried out in the order they were asked for.
+            _reloader = concurrent.futures.ThreadPoolExecutor(1, 'reload_rules')
+    return _reloader.submit(reload)
+
+def set_cache(cache: Optional[ResultCache]) -> None:
+    '''
+    Sets the cache the default engine, and with it the module level functions, checks before running the cascade. The default engine is replaced by one
+    with the same rules and the new cache rather than changed, so calls already running keep the cache they started with. Results are keyed by the
+    version of the engine, so the cache can be kept across reloads of the rules. The cache is off by default.
 
-    # /ɔ/ > /o/ before /s/ or /z/.
-    word = sub('ɔ(?=s|z)', 'o', word, debug)
+    Parameters
+    ----------
+    cache : ResultCache | None
+        The cache, or None to turn caching off.
+    '''
 
-    # /wɛ/, /ew/ > /œ/, but /ø/ before /s/, /z/, or /t/ and /jœ/ before /ɫ/ when not after a labial or velar.
-    word = sub('w(/?)ɛ|ew', '\\1œ', word, debug)
-    word = sub('(?<!m|p|b|v|f|k|g)/œ(?=ɫ)', 'j/œ', word, debug)
-    word = sub('(?<!m|p|b|v|f|k|g|/)œ(?=ɫ)', 'jœ', word, debug)
-    word = sub('œ(?=s|z|t)', 'ø', word, debug)
+    global _cache, _engine
+    with _engine_lock:
+        _cache = cache
+        if _engine is not None:
+            _engine = Engine(_engine.rulebook, _engine.timeout, cache)
 
-    vowels.extend(['ø', 'œ'])
+def watch_rules(module: str = 'sound_changes', interval: float = 1.0) -> threading.Event:
+    '''
+    Starts a background thread which checks the rules for changes on disk every so often, and reloads them when they've changed (see reload_rules()).
 
-    # Stress shift to second element of diphthongs.
-    # TODO: I'll probably add more as I encounter them.
-    word = sub('(/?)yj', 'ɥ\\1i', word, debug)
-    word = sub(f'y(?=/?{join(vowels)})', 'ɥ', word, debug)
+    Parameters
+    ----------
+    module : str
+        The name of the module containing the rules.
+    interval : float
+        The time between checks, in seconds.
 
-    consonants.append('ɥ')
+    Returns
+    -------
+    threading.Event
+        Set this to stop watching.
+    '''
 
-    # /oj/, /ɔj/ > /wɛ/.
-    word = sub('(/?)(?:o|ɔ)j', 'w\\1ɛ', word, debug)
+    stop = threading.Event()
+
+    def watch() -> None:
+        last: Optional[str] = None
+        failing = False
+        while True:
+            try:
+                current = rules.source_hash(module)
+            except (OSError, ImportError) as e:
+                # The file can briefly disappear while an editor saves it, so the check is retried, and a run of failures is only logged once.
+                if not failing:
+                    log(f'Checking {module} for changes failed: {e!r}')
+                failing = True
+            else:
+                # If the first checks failed, the rules may have changed since they were loaded, so they're reloaded to be sure. Unchanged rules keep the
+                # engine anyway.
+                if current != last and (last is not None or failing):
+                    reload_rules(module).add_done_callback(lambda future: future.exception() and log(f'Reloading {module} failed: {future.exception()!r}'))
+                last = current
+                failing = False
+            if stop.wait(interval):
+                return
+
+    threading.Thread(target=watch, name='watch_rules', daemon=True).start()
+    return stop
+
+def compile_rulebook() -> dict[Stage, CompiledStage]:
+    '''
+    Compiles the rules in sound_changes.py. The result is cached, so this only does any work the first time it's called.
 
-    # /aj/ > /ɛ/.
-    # TODO: I'm marking /ɛ/ which evolve from /aj/ with "E", as it apparently evolves differently from other /ɛ/s.
-    word = sub('aj', 'E', word, debug)
+    Returns
+    -------
+    dict[Stage, CompiledStage]
+        The compiled stages, in order.
+    '''
 
-    vowels.append('E')
+    return default_engine().rulebook
 
-    # Closed /e/ > /ɛ/.
-    word = sub(f'e(?={join(consonants, "j", "ɫ")}{{2,}}|{join(consonants, "j", "ɫ")}$)', 'ɛ', word, debug)
+def fused_groups(rulebook: Optional[dict[Stage, CompiledStage]] = None) -> list[tuple[str, ...]]:
+    '''
+    Lists the groups of rules which are carried out in a single pass.
 
-    # Deaffrication.
-    word = sub('ʦ', 's', word, debug)
-    word = sub('ʧ', 'ʃ', word, debug)
-    word = sub('ʤ', 'ʒ', word, debug)
+    Parameters
+    ----------
+    rulebook : dict[Stage, CompiledStage] | None
+        The compiled rules to report on. Defaults to compile_rulebook().
 
-    consonants = [i for i in consonants if i not in ('ʦ', 'ʧ', 'ʤ')]
-    consonants.extend(['ʃ', 'ʒ'])
+    Returns
+    -------
+    list[tuple[str, ...]]
+        The ids of the rules in each group.
+    '''
 
-    # /ɫ/ > /w/.
-    word = sub(f'ɫ', 'w', word, debug)
+    return [tuple(rule.id for rule in step.rules) for stage in (rulebook or compile_rulebook()).values() for step in stage.steps if len(step.rules) > 1]
 
-    # Loss of /s/ before consonants with lengthening of preceeding vowel.
-    word = sub(f's(?={join(consonants, "j", "w", "ɥ")})', ':', word, debug)
+def run_stage(stage: Stage, word: str, debug: bool = False, rulebook: Optional[dict[Stage, CompiledStage]] = None) -> str:
+    '''
+    Applies the rules of a single stage to a word.
 
-    return word
+    Parameters
+    ----------
+    stage : Stage
+        The stage to apply.
+    word : str
+        The word to apply the sound changes to.
+    debug : bool
+        If True, will log the id of every rule along with its output.
+    rulebook : dict[Stage, CompiledStage] | None
+        The compiled rules to use. Defaults to compile_rulebook().
 
-def to_middle_french(word: str, debug: bool = False) -> str:
+    Returns
+    -------
+    str
+        The evolved word.
     '''
-    Simulates the sounds changes that occurred between Latin and Middle French and returns the result.
+
+    if rulebook is None:
+        return default_engine().run_stage(stage, word, debug)
+    # An engine would work out its version and chronology for nothing, so the stage is applied directly.
+    compiled = rulebook[stage]
+    return compiled.encoding.decode(_apply_stage(compiled, compiled.encoding.encode(word), debug))
+
+def to_proto_western_romance(word: str, debug: bool = False) -> str:
+    '''
+    Simulates the sounds changes that occurred between Latin and Proto-Western Romance and returns the result.
 
     Parameters
     ----------
@@ -528,35 +1212,31 @@ def to_middle_french(word: str, debug: bool = False) -> str:
     str
         The evolved word.
     '''
-    
-    global consonants, vowels
 
-    # /aw/ > /o/ (from previous /aɫ/).
-    # TODO: I'm going to assume the other vowel + /w/ (from vowel + /ɫ/) combinations take affect here as well.
-    word = sub('aw', 'o', word, debug)
-    word = sub('(?<!j)/ɛw', '/o', word, debug)
-    word = sub('(?<!j|/)ɛw', 'o', word, debug)
-    word = sub('(?:ɛ|e|œ)w', 'œ', word, debug)
-    word = sub('œ(?=s|z|t)', 'ø', word, debug)
-    word = sub('uw', 'u', word, debug)
+    return default_engine().run_stage(Stage.PROTO_WESTERN_ROMANCE, word, debug)
 
-    # /ej/ > /ɛ/.
-    word = sub('ej', 'ɛ', word, debug)
-
-    # Nasal /u~/ > /ɔ~/.
-    word = sub('u~', 'ɔ~', word, debug)
+def to_proto_gallo_ibero_romance(word: str, debug: bool = False) -> str:
+    '''
+    Simulates the sounds changes that occurred between Latin and Proto-Gallo-Ibero-Romance and returns the result.
 
-    # Denasalization of open vowels.
-    word = sub(f'~(?=(?:n|m|ɲ)(?:/?{join(vowels)}|j|w))', '', word, debug)
+    Parameters
+    ----------
+    word : str
+        The word to apply the sound changes to.
+    debug : bool
+        If True, debug information will be output.
 
-    # Loss of nasals after nasal vowels.
-    word = sub('(?<=~)(?:n|m|ɲ)', '', word, debug)
+    Returns
+    -------
+    str
+        The evolved word.
+    '''
 
-    return word
+    return default_engine().run_stage(Stage.PROTO_GALLO_IBERO_ROMANCE, word, debug)
 
-def to_early_modern_french(word: str, debug: bool = False) -> str:
+def to_early_old_french(word: str, debug: bool = False) -> str:
     '''
-    Simulates the sounds changes that occurred between Latin and Early Modern French and returns the result.
+    Simulates the sounds changes that occurred between Latin and Early Old French and returns the result.
 
     Parameters
     ----------
@@ -570,34 +1250,50 @@ def to_early_modern_french(word: str, debug: bool = False) -> str:
     str
         The evolved word.
     '''
-    
-    global consonants, vowels
 
-    # Loss of long vowels.
-    word = sub(':', '', word, debug)
+    return default_engine().run_stage(Stage.EARLY_OLD_FRENCH, word, debug)
 
-    # Loss of final consonants. This actually started in Middle French, but it was based on external sandhi.
-    # TODO: Wikipedia isn't very specific regarding which consonants are lost. Based on examples, it looks like /r/, /l/, /f/ and /k/ remain. Beyond that, I need to refer to other sources. For now, I'm going to just assume all other consonants except those that form diphthongs. Addtionally, based on examples, /l/ does appear to be lost after high vowels, however, I've seen one example, /nu:llum/ > /nyl/, which suggests it's not always true. One source suggested that examples like this are the exception, based on influence from Latin.
-    word = sub(f'{join(consonants, "f", "k", "r", "l", "j", "w", "ɥ")}+$', '', word, debug)
-    word = sub('(?<=i|u|y)l$', '', word, debug)
+def to_old_french(word: str, debug: bool = False) -> str:
+    '''
+    Simulates the sounds changes that occurred between Latin and Old French and returns the result.
 
-    # /wɛ/ > /wa/ or sometimes /ɛ/.
-    # TODO: Wikipedia doesn't indicate when it becomes /ɛ/. I need to check other sources. Based on examples, it also appears to be blocked by nasalization.
-    word = sub('w(/?)ɛ(?!~)', 'w\\1a', word, debug)
+    Parameters
+    ----------
+    word : str
+        The word to apply the sound changes to.
+    debug : bool
+        If True, debug information will be output.
 
-    # /ɔw/ > /u/.
-    word = sub('ɔw', 'u', word, debug)
+    Returns
+    -------
+    str
+        The evolved word.
+    '''
 
-    # Loss of /h/. It reemerged in borrowings from Germanic languages.
-    word = sub('h', '', word, debug)
+    return default_engine().run_stage(Stage.OLD_FRENCH, word, debug)
 
-    consonants.remove('h')
+def to_late_old_french(word: str, debug: bool = False) -> str:
+    '''
+    Simulates the sounds changes that occurred between Latin and Late Old French and returns the result.
 
-    return word
+    Parameters
+    ----------
+    word : str
+        The word to apply the sound changes to.
+    debug : bool
+        If True, debug information will be output.
 
-def to_modern_french(word: str, debug: bool = False) -> str:
+    Returns
+    -------
+    str
+        The evolved word.
     '''
-    Simulates the sounds changes that occurred between Latin and Modern French and returns the result.
+
+    return default_engine().run_stage(Stage.LATE_OLD_FRENCH, word, debug)
+
+def to_middle_french(word: str, debug: bool = False) -> str:
+    '''
+    Simulates the sounds changes that occurred between Latin and Middle French and returns the result.
 
     Parameters
     ----------
@@ -611,44 +1307,54 @@ def to_modern_french(word: str, debug: bool = False) -> str:
     str
         The evolved word.
     '''
-    
-    global consonants, vowels
-
-    # /r/ > /ʁ/.
-    word = sub('r', 'ʁ', word, debug)
 
-    consonants.remove('r')
-    consonants.append('ʁ')
+    return default_engine().run_stage(Stage.MIDDLE_FRENCH, word, debug)
 
-    # /ʎ/ merges with /j/.
-    word = sub('ʎ', 'j', word, debug)
+def to_early_modern_french(word: str, debug: bool = False) -> str:
+    '''
+    Simulates the sounds changes that occurred between Latin and Early Modern French and returns the result.
 
-    # Loss of /ə/ unless it results in an invalid consonant cluster.
-    # TODO: Handling all possible resulting consonant clusters sounds like a huge pain, so for now I'm going to just remove all of them and then chalk it up to "use your best judgement".
-    word = sub('ə', '', word, debug)
+    Parameters
+    ----------
+    word : str
+        The word to apply the sound changes to.
+    debug : bool
+        If True, debug information will be output.
 
-    # Lowering of nasal /i~/, /e~/ to /ɛ~/. In the 20th century, this has started to happen with /y~/, which originally shifted to /œ~/. As such, I've implemented this change as well.
-    word = sub('(?:i|e|y)(?=~)', 'ɛ', word, debug)
+    Returns
+    -------
+    str
+        The evolved word.
+    '''
 
-    # Merge of /ɑ/ with /a/.
-    word = sub('ɑ', 'a', word, debug)
+    return default_engine().run_stage(Stage.EARLY_MODERN_FRENCH, word, debug)
 
-    # Nasal /a~/ shifts to /ɑ~/.
-    word = sub('a~', 'ɑ~', word, debug)
+def to_modern_french(word: str, debug: bool = False) -> str:
+    '''
+    Simulates the sounds changes that occurred between Latin and Modern French and returns the result.
 
-    # Final /ɔ/ > /o/, /ɛ/ > /e/, /œ/ > /ø/.
-    word = sub('ɔ$', 'o', word, debug)
-    word = sub('ɛ$', 'e', word, debug)
-    word = sub('œ$', 'ø', word, debug)
-    word = sub('E', 'ɛ', word, debug)
+    Parameters
+    ----------
+    word : str
+        The word to apply the sound changes to.
+    debug : bool
+        If True, debug information will be output.
 
-    vowels.remove('E')
+    Returns
+    -------
+    str
+        The evolved word.
+    '''
 
-    return word
+    return default_engine().run_stage(Stage.MODERN_FRENCH, word, debug)
 
-def evolve(word: str, debug: bool = False) -> str:
+def evolve(word: str, debug: bool = False, start: Stage = Stage.PROTO_WESTERN_ROMANCE, stop: Stage = Stage.MODERN,
+           entered: Optional[Union[int, str]] = None, until: Optional[Union[int, str]] = None) -> str:
     '''
-    Simulates the sounds changes that occurred between Latin and French and returns the result.
+    Simulates the sounds changes that occurred between Latin and French and returns the result. Words borrowed later, or already evolved to some stage,
+    can enter the cascade at a later stage with start, or at a given rule or in a given year with entered, and the cascade can end early with stop or
+    until. Only some changes are dated, and the others only have estimated dates (see rules.Rule), so a rule id is the way to enter or stop at an exact
+    change. A word entering later should be written in the form of that time, using the consonants and vowels of that time (see Engine.inventory()).
 
     To ensure the word is converted as expected, use the following conventions. In general, the word should be written phonetically, rather than as it's spelled in Latin.
         - Stress falls on the penultimate syllable unless short, in which case it falls on the antepenultimate if possible.
@@ -665,20 +1371,65 @@ def evolve(word: str, debug: bool = False) -> str:
         The word to apply the sound changes to.
     debug : bool
         If True, debug information will be output.
+    start : Stage
+        The first stage to apply.
+    stop : Stage
+        The last stage to apply.
+    entered : int | str | None
+        The year the word entered the language, or the id of the first rule to apply.
+    until : int | str | None
+        The last year to evolve the word to, or the id of the last rule to apply.
 
     Returns
     -------
     str
         The evolved word.
+
+    Raises
+    ------
+    ValueError
+        If start is after stop or there's no rule with a given id.
     '''
 
-    reset()
-    word = to_proto_western_romance(word, debug)
-    word = to_proto_gallo_ibero_romance(word, debug)
-    word = to_early_old_french(word, debug)
-    word = to_old_french(word, debug)
-    word = to_late_old_french(word, debug)
-    word = to_middle_french(word, debug)
-    word = to_early_modern_french(word, debug)
-    word = to_modern_french(word, debug)
-    return word
+    return default_engine().evolve(word, debug, start, stop, entered, until)
+
+def evolve_stages(word: str) -> StageForms:
+    '''
+    Simulates the sound changes that occurred between Latin and French, keeping the word as it stands at the end of each stage. This runs the cascade once,
+    rather than once per stage like calling each of the to_* functions on the result of the one before. See evolve() for the conventions the word should
+    follow.
+
+    Parameters
+    ----------
+    word : str
+        The word to apply the sound changes to.
+
+    Returns
+    -------
+    StageForms
+        The forms of the word at the end of every stage.
+    '''
+
+    return default_engine().evolve_stages(word)
+
+def evolve_many(words: Iterable[str], lazy: bool = False, report: Optional[Callable[[Throughput], None]] = None) -> Union[list[str], Iterator[str]]:
+    '''
+    Evolves a batch of words with the default engine. Each distinct word is only evolved once, however many times it appears. See evolve() for the
+    conventions the words should follow.
+
+    Parameters
+    ----------
+    words : Iterable[str]
+        The words to apply the sound changes to.
+    lazy : bool
+        If True, the words are read and the evolved words yielded one at a time. Otherwise all of them are returned at once.
+    report : ((Throughput) -> None) | None
+        Called with the statistics of the call once every word has been evolved.
+
+    Returns
+    -------
+    list[str] | Iterator[str]
+        The evolved words, in the same order as the words.
+    '''
+
+    return default_engine().evolve_many(words, lazy, report)
@@ -0,0 +1,295 @@
+'''
+A differential fuzzer for the engines. Random words following the input conventions (see french_converter.evolve()) are evolved by a reference cascade,
+the converter as it was originally written, and by each of the faster engines, and any word on which they disagree is shrunk to a minimal one.
+The words are generated and checked on a pool of processes. Run this file directly to fuzz, optionally with the number of words and the seed to start at.
+'''
+
+import importlib
+import multiprocessing
+import random
+import sys
+import time
+import batch
+import codegen
+import french_converter
+import reference_converter
+import transducer
+from typing import Callable, Iterator, NamedTuple, Optional, Sequence
+
+# The building blocks of the words, following the input conventions.
+_VOWELS = 'aeiou'
+_DIPHTHONGS = ('aj', 'oj', 'aw')
+_CONSONANTS = 'bdfghklmnprstvz'
+_CLUSTERS = ('pr', 'br', 'tr', 'dr', 'kr', 'gr', 'fr', 'pl', 'bl', 'kl', 'gl', 'fl', 'kw', 'gw')
+_INITIAL_CLUSTERS = ('st', 'sp', 'sk')
+_CODAS = 'snmrlktp'
+_FINAL_CODAS = ('s', 'm', 't', 'nt', 'r', 'n', 'ks', 'l')
+
+class _Syllable(NamedTuple):
+    onset: str
+    nucleus: str
+    coda: str
+
+def generate_word(generator: random.Random) -> str:
+    '''
+    Generates a random word which follows the input conventions: 'k' for 'c', 'kw' for 'qu' and 'ks' for 'x', 'j' and 'w' for 'i' and 'u' in hiatus,
+    long vowels marked with ':', and a '/' before the stressed vowel, which is placed according to the length of the penultimate syllable.
+
+    Parameters
+    ----------
+    generator : random.Random
+        The random number generator to use.
+
+    Returns
+    -------
+    str
+        The word.
+    '''
+
+    syllables: list[_Syllable] = []
+    count = generator.choice((1, 2, 2, 3, 3, 3, 4, 4, 5))
+    for i in range(count):
+        roll = generator.random()
+        if i == 0:
+            onset = '' if roll < 0.2 else generator.choice(_INITIAL_CLUSTERS + _CLUSTERS) if roll < 0.35 else generator.choice(_CONSONANTS + 'jw')
+        elif syllables[-1].coda:
+            onset = generator.choice(_CONSONANTS) if roll < 0.9 else generator.choice(_CLUSTERS)
+        else:
+            # A vowel can't be followed directly by another one, except in the odd hiatus with neither of them high.
+            onset = generator.choice(_CONSONANTS + 'jw') if roll < 0.8 else generator.choice(_CLUSTERS) if roll < 0.97 else ''
+        roll = generator.random()
+        if roll < 0.1:
+            nucleus = generator.choice(_DIPHTHONGS)
+        else:
+            nucleus = generator.choice(_VOWELS if onset or i == 0 else 'aeo') + (':' if roll > 0.7 else '')
+        if not onset and i > 0 and (syllables[-1].nucleus.rstrip(':')[-1] in 'iujw' or nucleus[0] in 'iu'):
+            onset = generator.choice(_CONSONANTS)
+        roll = generator.random()
+        if i == count - 1:
+            coda = generator.choice(_FINAL_CODAS) if roll < 0.6 else ''
+        else:
+            coda = generator.choice(_CODAS) if roll < 0.3 else ''
+        syllables.append(_Syllable(onset, nucleus, coda))
+
+    # Stress falls on the penultimate syllable if it's long, and otherwise on the antepenultimate if there is one.
+    if count == 1:
+        stressed = 0
+    else:
+        penultimate = syllables[-2]
+        long = penultimate.coda or penultimate.nucleus.endswith(':') or penultimate.nucleus in _DIPHTHONGS
+        stressed = count - 2 if long or count == 2 else count - 3
+    return ''.join(onset + ('/' if i == stressed else '') + nucleus + coda for i, (onset, nucleus, coda) in enumerate(syllables))
+
+def generate_words(seed: int, count: int) -> list[str]:
+    '''
+    Generates a reproducible batch of random words.
+
+    Parameters
+    ----------
+    seed : int
+        The seed of the random number generator.
+    count : int
+        The number of words.
+
+    Returns
+    -------
+    list[str]
+        The words.
+    '''
+
+    generator = random.Random(seed)
+    return [generate_word(generator) for _ in range(count)]
+
+# The stages of the reference converter, in order.
+_STAGES = (reference_converter.to_proto_western_romance, reference_converter.to_proto_gallo_ibero_romance, reference_converter.to_early_old_french,
+           reference_converter.to_old_french, reference_converter.to_late_old_french, reference_converter.to_middle_french,
+           reference_converter.to_early_modern_french, reference_converter.to_modern_french)
+
+class ReferenceCascade:
+    '''
+    The cascade as it was originally written (see reference_converter.py): every rule is run on its own with regex.sub, and none of the code of the
+    engines is shared with it, including the rule table and the way it's compiled. This is what every engine has to agree with.
+    '''
+
+    def evolve(self, word: str) -> str:
+        '''
+        Simulates the sounds changes that occurred between Latin and French and returns the result. See french_converter.evolve().
+
+        Parameters
+        ----------
+        word : str
+            The word to apply the sound changes to.
+
+        Returns
+        -------
+        str
+            The evolved word.
+        '''
+
+        return reference_converter.evolve(word)
+
+    def evolve_stages(self, word: str) -> list[str]:
+        '''
+        Simulates the sound changes that occurred between Latin and French, keeping the word as it stands at the end of each stage.
+
+        Parameters
+        ----------
+        word : str
+            The word to apply the sound changes to.
+
+        Returns
+        -------
+        list[str]
+            The forms of the word at the end of every stage, in order.
+        '''
+
+        reference_converter.reset()
+        forms = []
+        for to_stage in _STAGES:
+            word = to_stage(word)
+            forms.append(word)
+        return forms
+
+
+def _each(evolve: Callable[[str], str]) -> Callable[[list[str]], list[str]]:
+    return lambda words: [evolve(word) for word in words]
+
+# The engines to fuzz, each as a function which creates it and returns a function evolving a list of words.
+ENGINES: dict[str, Callable[[], Callable[[list[str]], Sequence[str]]]] = {
+    'evolve': lambda: _each(french_converter.evolve),
+    'timeout': lambda: _each(french_converter.Engine(timeout=1.0).evolve),
+    'transducer': lambda: _each(transducer.TransducerCascade().evolve),
+    'generated': lambda: _each(codegen.load(codegen.generate()).evolve),
+    'batch': lambda: batch.BufferCascade().evolve,
+    'vectorized': lambda: importlib.import_module('vectorized').VectorizedCascade().evolve,
+}
+
+class Mismatch(NamedTuple):
+    '''
+    A word on which an engine disagrees with the reference cascade.
+    '''
+
+    engine: str
+    word: str
+    expected: str
+    result: str
+
+# The reference cascade and the engines of a worker process.
+_reference: Optional[ReferenceCascade] = None
+_engines: dict[str, Callable[[list[str]], Sequence[str]]] = {}
+
+def _init_worker(names: Sequence[str]) -> None:
+    '''
+    Sets up the reference cascade and the engines in a worker process.
+    '''
+
+    global _reference
+    _reference = ReferenceCascade()
+    for name in names:
+        _engines[name] = ENGINES[name]()
+
+def _check(words: list[str]) -> list[Mismatch]:
+    '''
+    Evolves words with the reference cascade and every engine, returning the words on which they disagree.
+    '''
+
+    expected = [_reference.evolve(word) for word in words]
+    mismatches = []
+    for name, engine in _engines.items():
+        for word, reference, result in zip(words, expected, engine(words)):
+            if result != reference:
+                mismatches.append(Mismatch(name, word, reference, result))
+    return mismatches
+
+def _check_batch(task: tuple[int, int]) -> list[Mismatch]:
+    '''
+    Generates a batch of words in a worker process and checks it.
+    '''
+
+    return _check(generate_words(*task))
+
+def shrink(word: str, fails: Callable[[str], bool]) -> str:
+    '''
+    Shrinks a failing word by removing as much of it as possible while it still fails, first in large chunks, then in smaller ones, down to single
+    characters.
+
+    Parameters
+    ----------
+    word : str
+        The word, which has to fail.
+    fails : (str) -> bool
+        Checks whether a word fails.
+
+    Returns
+    -------
+    str
+        A word which still fails, and which no longer does if any single character is removed from it.
+    '''
+
+    size = len(word) // 2
+    while size >= 1:
+        start = 0
+        while start < len(word):
+            candidate = word[:start] + word[start + size:]
+            if candidate and fails(candidate):
+                word = candidate
+            else:
+                start += size
+        size //= 2
+    return word
+
+def fuzz(cases: int, processes: Optional[int] = None, seed: int = 0, batch_size: int = 1_000,
+         engines: Optional[Sequence[str]] = None) -> Iterator[Mismatch]:
+    '''
+    Fuzzes the engines against the reference cascade on a pool of processes. Batch n is generated from the seed plus n, so any batch can be reproduced
+    with generate_words().
+
+    Parameters
+    ----------
+    cases : int
+        The number of words to generate.
+    processes : int | None
+        The number of worker processes. Defaults to the number of cores.
+    seed : int
+        The seed of the first batch.
+    batch_size : int
+        The number of words in each batch.
+    engines : Sequence[str] | None
+        The names of the engines to fuzz (see ENGINES). Defaults to all of them, leaving out the vectorized engine if NumPy isn't installed.
+
+    Returns
+    -------
+    Iterator[Mismatch]
+        Every mismatch found, shrunk to a minimal word.
+    '''
+
+    if engines is None:
+        engines = list(ENGINES)
+        try:
+            import numpy
+        except ImportError:
+            engines.remove('vectorized')
+    tasks = [(seed + i, min(batch_size, cases - start)) for i, start in enumerate(range(0, cases, batch_size))]
+    seen: set[tuple[str, str]] = set()
+    with batch.pool_context().Pool(processes or multiprocessing.cpu_count(), _init_worker, (engines,)) as pool:
+        for mismatches in pool.imap_unordered(_check_batch, tasks):
+            if mismatches and _reference is None:
+                _init_worker(engines)
+            for mismatch in mismatches:
+                engine = _engines[mismatch.engine]
+                word = shrink(mismatch.word, lambda word: engine([word])[0] != _reference.evolve(word))
+                # Many words tend to shrink to the same one.
+                if (mismatch.engine, word) not in seen:
+                    seen.add((mismatch.engine, word))
+                    yield Mismatch(mismatch.engine, word, _reference.evolve(word), engine([word])[0])
+
+if __name__ == '__main__':
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    start = time.perf_counter()
+    found = 0
+    for engine, word, expected, result in fuzz(cases, seed=seed):
+        found += 1
+        print(f'{engine} differs on {word} - expected {expected} but got {result}')
+    elapsed = time.perf_counter() - start
+    print(f'{cases} words in {elapsed:.1f}s ({cases / elapsed * 3600:,.0f} words per hour), {found} mismatches')
@@ -0,0 +1,207 @@
+import hashlib
+import importlib
+import importlib.util
+import threading
+from enum import IntEnum
+from typing import NamedTuple, Optional
+
+class Stage(IntEnum):
+    '''
+    The stages of the cascade, in chronological order. Each stage is named after the period its sound changes lead to.
+    '''
+
+    PROTO_WESTERN_ROMANCE = 1
+    PROTO_GALLO_IBERO_ROMANCE = 2
+    EARLY_OLD_FRENCH = 3
+    OLD_FRENCH = 4
+    LATE_OLD_FRENCH = 5
+    MIDDLE_FRENCH = 6
+    EARLY_MODERN_FRENCH = 7
+    MODERN_FRENCH = 8
+    # An alias for the last stage.
+    MODERN = 8
+
+class Rule(NamedTuple):
+    '''
+    A single sound change.
+
+    Attributes
+    ----------
+    id : str
+        A unique name for the rule, prefixed with an abbreviation of its stage.
+    stage : Stage
+        The stage the rule belongs to.
+    pattern : str
+        The regex pattern to match against. '{C}' and '{V}' stand for the consonants and vowels at the time the rule applies, a name like '{nasal}' for a
+        natural class of them (see features.CLASSES), and excluded elements can be listed after a '-', as in '{C-n-m}'.
+    repl : str
+        The replacement string.
+    comment : str
+        A description of the change. Rules which leave this empty share the comment of the rule before them.
+    consonants : tuple[str, ...]
+        Changes to the consonants which take effect after the rule has been applied. '+x' adds x and '-x' removes it.
+    vowels : tuple[str, ...]
+        Changes to the vowels which take effect after the rule has been applied, in the same format as consonants.
+    date : int | None
+        The approximate year the change took place. Rules which leave the comment empty are part of the change before them and share its date, so they
+        can't have one of their own. Changes which leave this empty are only given an estimate by load_rules(), spread evenly between the dated changes
+        around them, or the start and end of the period of their stage.
+    interpolated : bool
+        True if the date is an estimate filled in by load_rules() rather than one given in the rule.
+    '''
+
+    id: str
+    stage: Stage
+    pattern: str
+    repl: str
+    comment: str = ''
+    consonants: tuple[str, ...] = ()
+    vowels: tuple[str, ...] = ()
+    date: Optional[int] = None
+    interpolated: bool = False
+
+class RuleTable(NamedTuple):
+    '''
+    A complete cascade of sound changes.
+
+    Attributes
+    ----------
+    consonants : tuple[str, ...]
+        The consonants before the first rule applies.
+    vowels : tuple[str, ...]
+        The vowels before the first rule applies.
+    rules : tuple[Rule, ...]
+        The rules, in the order they apply.
+    '''
+
+    consonants: tuple[str, ...]
+    vowels: tuple[str, ...]
+    rules: tuple[Rule, ...]
+
+# Held while a rule module is read or rerun, so that a table is never read half way through being replaced.
+_load_lock = threading.Lock()
+
+def load_rules(module: str = 'sound_changes', fresh: bool = False) -> RuleTable:
+    '''
+    Loads the rule table from the CONSONANTS, VOWELS, RULES and PERIODS attributes of the given module, checks it, and fills in the shared comments and
+    dates, and estimates for the missing dates. PERIODS gives the first and last year of the changes of each stage.
+
+    Parameters
+    ----------
+    module : str
+        The name of the module containing the table.
+    fresh : bool
+        If True, the module's source is read from disk again and rerun in place, so that any changes made to it since it was imported are picked up by
+        this and every later call. Unlike importlib.reload(), this never uses the cached bytecode, which can miss an edit made within a second of the last
+        one.
+
+    Returns
+    -------
+    RuleTable
+        The loaded table.
+
+    Raises
+    ------
+    ValueError
+        If two rules share an id, or the rules are out of stage or date order, or a rule is dated outside the period of its stage or has a date of its
+        own while sharing the comment of the rule before it.
+    '''
+
+    with _load_lock:
+        source = importlib.import_module(module)
+        if fresh:
+            # The source is run in a namespace of its own first, so that the module is left as it was if it fails.
+            namespace = {'__name__': source.__name__, '__file__': source.__file__}
+            exec(compile(read_source(module), source.__file__, 'exec'), namespace)
+            vars(source).update(namespace)
+        consonants, vowels, table, periods = source.CONSONANTS, source.VOWELS, source.RULES, source.PERIODS
+    loaded: list[Rule] = []
+    # The rules of each change: a rule which shares the comment of the rule before it is part of the same change.
+    changes: list[list[int]] = []
+    ids: set[str] = set()
+    for rule in table:
+        if rule.id in ids:
+            raise ValueError(f'Duplicate rule id {rule.id!r}')
+        if loaded and rule.stage < loaded[-1].stage:
+            raise ValueError(f'Rule {rule.id!r} is out of stage order')
+        ids.add(rule.id)
+        if not rule.comment and loaded and loaded[-1].stage == rule.stage:
+            if rule.date is not None:
+                raise ValueError(f'Rule {rule.id!r} shares the date of the rule before it, so it can\'t have one of its own')
+            rule = rule._replace(comment=loaded[-1].comment)
+            changes[-1].append(len(loaded))
+        else:
+            changes.append([len(loaded)])
+        loaded.append(rule)
+    for stage in Stage:
+        _date_changes(loaded, [change for change in changes if loaded[change[0]].stage == stage], stage, periods[stage])
+    return RuleTable(tuple(consonants), tuple(vowels), tuple(loaded))
+
+def _date_changes(loaded: list[Rule], changes: list[list[int]], stage: Stage, period: tuple[int, int]) -> None:
+    '''
+    Checks the dates of a stage's changes, estimates the missing ones evenly between the dated changes around them, and gives every rule of a change its
+    date, in place.
+    '''
+
+    # The start and end of the period act as dated changes just before and after the stage.
+    anchors = [(-1, period[0])]
+    for i, change in enumerate(changes):
+        rule = loaded[change[0]]
+        if rule.date is None:
+            continue
+        if not period[0] <= rule.date <= period[1]:
+            raise ValueError(f'Rule {rule.id!r} is dated outside the period of {stage.name}')
+        if rule.date < anchors[-1][1]:
+            raise ValueError(f'Rule {rule.id!r} is out of date order')
+        anchors.append((i, rule.date))
+    anchors.append((len(changes), period[1]))
+    for (start, first), (end, last) in zip(anchors, anchors[1:]):
+        if start >= 0:
+            for j in changes[start][1:]:
+                loaded[j] = loaded[j]._replace(date=first)
+        for i in range(start + 1, end):
+            date = first + round((last - first) * (i - start) / (end - start))
+            for j in changes[i]:
+                loaded[j] = loaded[j]._replace(date=date, interpolated=True)
+
+def read_source(module: str = 'sound_changes') -> str:
+    '''
+    Reads the source of a rule module from disk.
+
+    Parameters
+    ----------
+    module : str
+        The name of the module.
+
+    Returns
+    -------
+    str
+        The source.
+
+    Raises
+    ------
+    ModuleNotFoundError
+        If the module can't be found.
+    '''
+
+    spec = importlib.util.find_spec(module)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {module!r}', name=module)
+    return spec.loader.get_source(module)
+
+def source_hash(module: str = 'sound_changes') -> str:
+    '''
+    Hashes the source of a rule module as it is on disk, to tell whether it has changed.
+
+    Parameters
+    ----------
+    module : str
+        The name of the module.
+
+    Returns
+    -------
+    str
+        The SHA-256 hash of the source, in hex.
+    '''
+
+    return hashlib.sha256(read_source(module).encode('utf-8')).hexdigest()
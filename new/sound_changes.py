@@ -0,0 +1,330 @@
+'''
+The sound changes from Latin to Modern French, in the order they apply. See the Rule class for the meaning of each field.
+
+The consonants and vowels start out as the Latin inventory below, and each rule's changes to them take effect after it has been applied.
+'''
+
+from rules import Rule, Stage
+
+CONSONANTS = ('b', 'd', 'f', 'g', 'h', 'j', 'k', 'l', 'm', 'n', 'p', 'r', 's', 't', 'v', 'w', 'z')
+VOWELS = ('a', 'e', 'i', 'o', 'u')
+
+PWR = Stage.PROTO_WESTERN_ROMANCE
+PGIR = Stage.PROTO_GALLO_IBERO_ROMANCE
+EOF = Stage.EARLY_OLD_FRENCH
+OF = Stage.OLD_FRENCH
+LOF = Stage.LATE_OLD_FRENCH
+MF = Stage.MIDDLE_FRENCH
+EMF = Stage.EARLY_MODERN_FRENCH
+MOD = Stage.MODERN_FRENCH
+
+# The approximate first and last year of the changes of each stage. Changes without a date are only estimated, by spreading them evenly between the dated
+# changes of their stage. The dates that are given follow the order of the rules, which doesn't always match the usual dating of each change on its own.
+PERIODS = {
+    PWR: (1, 400),
+    PGIR: (400, 600),
+    EOF: (600, 900),
+    OF: (900, 1150),
+    LOF: (1150, 1300),
+    MF: (1300, 1500),
+    EMF: (1500, 1700),
+    MOD: (1700, 1900),
+}
+
+RULES = [
+    # Proto-Western Romance.
+
+    Rule('pwr.kw', PWR, 'kw', 'kʷ', 'Substitute "kʷ" for /kw/ and "gʷ" for /gw/. The velarized forms of /k/ and /g/ evolve differently from regular /k/ and /g/, but they\'re difficult to type, so this substitution should help.'),
+    Rule('pwr.gw', PWR, 'gw', 'gʷ', consonants=('+kʷ', '+gʷ')),
+
+    Rule('pwr.kw_dissimilation', PWR, 'kʷ(?=.+kʷ)', 'k', 'Dissimilation of multiple /kw/s.'),
+
+    Rule('pwr.s_prothesis', PWR, '^(?=s{C})', 'i', 'Introduction of short /i/ before initial /s/ + consonant.'),
+
+    # TODO: I'm not sure at the moment if this only affected /aj/ from <ae> or if it affected /ai/ + vowel clusters as well. Similarly for /oj/. For now I'm going to assume that it only affected <ae>/<oe>.
+    Rule('pwr.long_a', PWR, 'a:', 'a', 'Reduction of 10 vowels to 7. Unstressed /ɛ/, /ɔ/ raised to /e/, /o/, respectively.'),
+    Rule('pwr.open_e', PWR, 'aj(?={C}|$)|e(?!:)', 'ɛ'),
+    Rule('pwr.close_e', PWR, 'oj(?={C}|$)|e:|(?:i|y)(?!:)', 'e'),
+    Rule('pwr.long_i', PWR, '(?:i|y):', 'i'),
+    Rule('pwr.open_o', PWR, 'o(?!:)', 'ɔ'),
+    Rule('pwr.close_o', PWR, 'u(?!:)|o:', 'o'),
+    Rule('pwr.long_u', PWR, 'u:', 'u'),
+    Rule('pwr.unstressed_open_e', PWR, '(?<!/)ɛ', 'e'),
+    Rule('pwr.unstressed_open_o', PWR, '(?<!/)ɔ', 'o', vowels=('+ɛ', '+ɔ')),
+
+    # TODO: Based on examples, this appears to have also happened to final /n/ in words borrowed from Gaulish.
+    Rule('pwr.final_m_loss', PWR, '(?<={V}{C}*/?{V})(?:m|n)$', '', 'Loss of final /m/ except in monosyllables, which becomes /n/.'),
+    Rule('pwr.final_m', PWR, 'm$', 'n'),
+
+    # I'm going to leave /h/ in the consonants for the time being as it can reappear in Germanic borrowings in later periods.
+    Rule('pwr.h_loss', PWR, 'h', '', 'Loss of /h/.', date=100),
+
+    Rule('pwr.ns', PWR, 'ns', 's', '/ns/ > /s/.', date=100),
+
+    # TODO: There are some expections to this, but they aren't clearly defined, so I'm going to ignore them now.
+    Rule('pwr.rs', PWR, 'rs', 'ss', '/rs/ > /ss/.'),
+
+    # TODO: It's unspecified if this happens to /ɛr/ and /ɔr/ as well. I don't believe Latin ever allowed stress on the final syllable, and since /ɛ/ and /ɔ/ are only ever stressed, these combinations might not be possible. As such, I'm going to ignore them for now. However, it doesn't indicate whether it happens with stressed /e/ and /o/ either, but again, since I don't believe Latin ever allowed stress to fall on the final syllable, this probably doesn't occur, so I'm going to assume it's only unstressed until I see an example indicating otherwise. I also suspect that this doesn't happen in single syllable words, since Latin <per> > French <par>.
+    Rule('pwr.final_er', PWR, '(?<={V}{C}+)(e|o)r$', 'r\\1', 'Final /er/ > /re/, /or/ > /ro/.'),
+
+    # TODO: It's unspecified if this applies to /a/ or not, which typically resists being lost in other situations. For now, I'm going to assume that it's lost with the others.
+    Rule('pwr.velar_liquid_syncope', PWR, '(?<=k|g){V}(?=r|l)', '', 'Loss of unstressed interior syllables between /k/, /g/ and /r/, /l/.'),
+
+    Rule('pwr.front_hiatus', PWR, '(/?)(?:e|i)(?=/?{V})', 'j\\1', 'Reduction of /e/, /i/ in hiatus to /j/, followed by palatalization. Stress shifts forward. /k/ geminates before palatalization.', date=200),
+    Rule('pwr.palatalization', PWR, '(?<={C})j', 'ʲ'),
+    Rule('pwr.k_gemination', PWR, '(?<!k)kʲ', 'kkʲ'),
+
+    # TODO: Not gonna lie, I'm purely guessing on the "initial /w/ > /v/" part based on some examples that I've seen, but I have no idea how to explain certain later changes otherwise.
+    Rule('pwr.back_hiatus_after_vowel', PWR, '({V})(/?)(?:o|u)(?=/?{V})', '\\1\\2w', 'Reduction of /o/, /u/ in hiatus to /w/. Stress shifts backward if possible. Initial /w/ > /v/.'),
+    Rule('pwr.back_hiatus', PWR, '(/?)(?:o|u)(?=/?{V})', 'w\\1'),
+    Rule('pwr.initial_w', PWR, '^w', 'v'),
+
+    Rule('pwr.velar_palatalization', PWR, '(?<=k|g)(/?{front})', 'ʲ\\1', '/k/, /g/ palatalized before front vowels.', date=300),
+
+    Rule('pwr.palatal_stop', PWR, '^j|dʲ|gʲ|z', 'ɟ', 'Initial /j/ and /dʲ/, /gʲ/, /z/ > /ɟ/.', consonants=('+ɟ',)),
+
+    # Proto-Gallo-Ibero-Romance.
+
+    Rule('pgir.geminate_palatal_k', PGIR, 'kkʲ', 'ttʲ', '/kʲ/, /tʲ/ merge to /ʦʲ/.'),
+    Rule('pgir.palatal_affricate', PGIR, '(?:k|t)ʲ', 'ʦʲ', consonants=('+ʦ',)),
+
+    # TODO: I think the /ks/ case becomes /jss/ as opposed to /js/ as suggested because it maintains an /s/ in French, rather than leniting to /z/, so it must've been long.
+    # Rule('pgir.nkt', PGIR, '(?<=n)k(?=s|t)', ''),
+    Rule('pgir.ks', PGIR, 'k(?=s)', 'js', '/nkt/ > /nt/, /nks/ > /ns/, /kt/ > /jt/, /ks/ > /jss/, /gm/ > /wm/.'),
+    Rule('pgir.kt', PGIR, 'k(?=t)', 'j'),
+    Rule('pgir.gm', PGIR, 'gm', 'wm'),
+
+    # TODO: Based on examples, it appears that /ɔ/ remains before nasals.
+    Rule('pgir.open_e_diphthongization', PGIR, '/ɛ(?={C}ʲ?{V}|j)', 'j/ɛ', 'First diphthongization: stressed open /ɛ/ > /jɛ/, /ɔ/ > /wɔ/. This also happens in closed syllables before /j/.', date=400),
+    Rule('pgir.open_o_diphthongization', PGIR, '(?<!w)/ɔ(?=(?:{C-n-m}|{stop-ɟ}{liquid})ʲ?{V}|j)', 'w/ɔ'),
+
+    # TODO: Based on examples, I think the /a/ might need to be stressed. If you allow both stressed and unstressed /a/, you get contradicting examples. I'm not entirely sure on this though, so I might change it later.
+    Rule('pgir.a_rounding', PGIR, '/a(?={back_rounded}|w{V}|(?:g|k){back_rounded})', '/ɔ', '/a/ > /ɔ/ before back rounded vowels or /g/ + back rounded vowels. This also happens to /aw/ before /g/ + back rounded vowels.'),
+    Rule('pgir.aw_rounding', PGIR, 'aw(?=(?:g|k)/?{back_rounded})', 'ɔ'),
+    Rule('pgir.w_fortition', PGIR, '(?<={V-ɔ})w(?=/?{V})', 'v'),
+
+    # TODO: Based on examples, I'm guessing that preceding diphthongs still count.
+    Rule('pgir.lenition_b_f', PGIR, '(?<={V}w?j?)(?:b|f)(?=r?ʲ?/?{V})', 'v', 'First lenition.', date=450),
+    Rule('pgir.lenition_p', PGIR, '(?<={V}w?j?)p(?=(?:r|l)?ʲ?/?{V})', 'b'),
+    Rule('pgir.lenition_d', PGIR, '(?<={V}w?j?)d(?=r?ʲ?/?{V}|$)', 'ð'),
+    Rule('pgir.lenition_t', PGIR, '(?<={V}w?j?)t(?=r?ʲ?/?{V}|$)', 'd'),
+    Rule('pgir.lenition_s', PGIR, '(?<={V}w?j?)s(?=ʲ?/?{V})', 'z'),
+    Rule('pgir.lenition_ts', PGIR, '(?<={V}w?j?)ʦ(?=ʲ?/?{V})', 'ʣ'),
+    Rule('pgir.lenition_velar_after_open_o', PGIR, '(?<=ɔ)(?:g|k)(?=/?(?:{back_rounded}|w))', 'w'),
+    Rule('pgir.lenition_g_before_back', PGIR, '(?<={V})g(?=/?{back_rounded})', ''),
+    Rule('pgir.lenition_g_after_u', PGIR, '(?<=u|w)g(?=/?a)', ''),
+    Rule('pgir.lenition_g_after_o', PGIR, '(?<=o|ɔ)g(?=/?a)', 'v'),
+    Rule('pgir.lenition_g', PGIR, '(?<={V}w?j?)g(?=(?:n|r|l)?ʲ?/?{V})', 'j'),
+    Rule('pgir.lenition_k', PGIR, '(?<={V}w?j?)k(?=(?:r|l)?ʲ?/?{V})', 'g'),
+    Rule('pgir.lenition_kw', PGIR, '(?<=i|e|ɛ)kʷ(?=/?{V})', 'w', consonants=('+ð', '+ʣ')),
+
+    Rule('pgir.palatal_n', PGIR, 'jn|nj|nɟ|nʲ', 'ɲ', 'Formation of palatal new palatal consonants: /ɲ/, /ʎ/.'),
+    Rule('pgir.palatal_l', PGIR, 'jl|gl|lʲ', 'ʎ', consonants=('+ɲ', '+ʎ')),
+
+    # TODO: Based on examples, it looks like initial vowels are then reduced to /ə/.
+    # TODO: Consonant clusters are reduced after this, but the mechanisms are complicated. Ignoring it for now.
+    Rule('pgir.pretonic_loss', PGIR, '(?<={V}{C}*){V-a}(?={C}*(?:ʲ|j|w)?/{V})', '', 'First vowel loss: loss of pretonic vowels except /a/ when not initial. This sporadically occurs before the first lenition.'),
+
+    # Early Old French.
+
+    Rule('eof.palatal_stop_affricate', EOF, '^ɟ|(?<={C-w-j}ʲ?)ɟ', 'ʤ', '/ɟ/ when initial and following a consonant become /ʤ/. All others become /j/.'),
+    Rule('eof.palatal_stop_glide', EOF, 'ɟ', 'j', consonants=('-ɟ',)),
+
+    # TODO: It's unspecified if the palatalization passes through clusters. For now I'll assume that that situation doesn't occur.
+    Rule('eof.j_palatalization', EOF, 'j({C-ɲ-ʎ}(?!ʲ))', 'j\\1ʲ', '/j/ palatalizes following consonants.'),
+
+    Rule('eof.depalatalization_voiced_labial', EOF, '(?<={V})(?:b|v)ʲ(?=/?{V})', 'ʤ', 'Consonants depalatalize and eject a /j/ (sometimes two).'),
+    Rule('eof.depalatalization_voiceless_labial', EOF, '(?<={V})(?:p|f)ʲ(?=/?{V})', 'ʧ'),
+    Rule('eof.depalatalization_m', EOF, '(?<={V})mʲ(?=/?{V})', 'nʤ'),
+    Rule('eof.depalatalization_ar', EOF, 'arʲ(?=/?{V})', 'jarʲ'),
+    Rule('eof.depalatalization', EOF, '(?<={V})((?:{C-r}|ss)ʲ)(?=/?{V})', 'j\\1'),
+    Rule('eof.j_ejection', EOF, '({C}ʲ|ʤ|ʧ)(?=/(?:a|æ|e)j?w?(?:{C}ʲ?{V}|$))', '\\1j'),
+    Rule('eof.palatal_loss', EOF, 'ʲ', '', consonants=('+ʧ',)),
+
+    # TODO: Based on examples, it appears that /o/ remains before nasals, and /a/ remains before /ɲ/.
+    Rule('eof.close_e_diphthongization', EOF, '/e(?=(?:{C-j}|{stop}{liquid}){V}|$)', '/ej', 'Second diphthongization: stressed open /e/ > /ej/, /o/ > /ow/, /a/ > /æ/ when not followed by /j/.', date=600),
+    Rule('eof.close_o_diphthongization', EOF, '/o(?=(?:{C-j-n-m-ɲ}|{stop}{liquid}){V}|$)', '/ow'),
+    Rule('eof.a_fronting', EOF, '/a(?=(?:{C-j-ɲ}|{stop}{liquid}){V}|$)', '/æ', vowels=('+æ',)),
+
+    Rule('eof.open_o_rounded', EOF, '(?<=ɔ)g?{back_rounded}', 'w', '/ɔ/ combines with back rounded vowels to produce /ɔw/.'),
+
+    # TODO: I originally included these steps as part of the second lenition below, but based on examples, these need to happen before the posttonic vowel loss.
+    Rule('eof.g_loss_before_back', EOF, '(?<={V})g(?=/?{back_rounded})', '', 'Loss of /g/ near back rounded vowels.'),
+    Rule('eof.g_loss_before_a', EOF, '(?=o|u|ɔ|w)g(?=/?a)', ''),
+
+    # TODO: Because the vocalization of /l/ needed to occur after the vowel loss, this step continues with the reduction to /ə/ after the vocalization step below.
+    Rule('eof.posttonic_loss', EOF, '(?<=/{V}{C}*){V-a}', '', 'Loss of posttonic vowels except /a/, which reduces to /ə/. Remaining final vowels except /a/ reduced to /ə/.', date=700),
+
+    # TODO: Based on examples, it looks like this affects /ʎ/ before consonants as well.
+    Rule('eof.ll_before_a', EOF, 'lla', 'la', 'Vocalization of /l/ before consonants began in the ninth century with /l/ > /ɫ/. It\'s not specified exactly when, but it for certain had to have begun before the loss of gemination as vocalization occurred in /ll/ as well except before /a/. Vocalization won\'t complete until much later, however, when /ɫ/ > /w/.', date=800),
+    Rule('eof.ll_velarization', EOF, 'll', 'ɫɫ'),
+    Rule('eof.l_velarization', EOF, '(?:l|ʎ)(?={C-j-w})', 'ɫ', consonants=('+ɫ',)),
+
+    Rule('eof.posttonic_reduction', EOF, '(?<=/{V}{C}*){V}', 'ə', 'This is the continuation of the vowel loss mentioned above.', vowels=('+ə',)),
+
+    # TODO: Consonant clusters may be reduced here again.
+    Rule('eof.tl', EOF, 'tl', 'kl', '/tl/ > /kl/.'),
+
+    # TODO: Based on examples, I'm guessing preceding diphthongs still count.
+    Rule('eof.lenition_b_f', EOF, '(?<={V}w?j?)(?:b|f)(?=r?/?{V})', 'v', 'Second lenition.', date=800),
+    Rule('eof.lenition_p', EOF, '(?<={V}w?j?)p(?=(?:r|l)?/?{V})', 'b'),
+    Rule('eof.lenition_d', EOF, '(?<={V}w?j?)d(?=r?/?{V}|$)', 'ð'),
+    Rule('eof.lenition_t', EOF, '(?<={V}w?j?)t(?=r?/?{V}|$)', 'd'),
+    Rule('eof.lenition_s', EOF, '(?<={V}w?j?)s(?=/?{V})', 'z'),
+    Rule('eof.lenition_ts', EOF, '(?<={V}w?j?)ʦ(?=/?{V})', 'ʣ'),
+    Rule('eof.lenition_g', EOF, '(?<={V}w?j?)g(?=(?:n|r|l)?/?{V})', 'j'),
+    Rule('eof.lenition_k', EOF, '(?<={V}w?j?)k(?=(?:r|l)?/?{V})', 'g'),
+    Rule('eof.lenition_kw', EOF, '(?<=i|e|ɛ|æ)kʷ(?=/?{V})', 'w'),
+
+    # TODO: Although unspecified. I suspect this happened before /æ/ as well. It looks like this also affected /kk/ and /gg/.
+    Rule('eof.k_palatalization', EOF, 'k?k(?=/?(?:a|æ))', 'ʧ', 'Palatalization of /k/ > /ʧ/, /g/ > /ʤ/ before /a/.', date=800),
+    Rule('eof.g_palatalization', EOF, 'g?g(?=/?(?:a|æ))', 'ʤ', consonants=('+ʧ',)),
+
+    # TODO: The addition of /j/ after /ʧ/ or /ʤ/ seems to have been universal, but by Modern French, based on examples, the /j/ only remains if followed by a nasal. Compare the evolution of <cher> vs <chien>.
+    Rule('eof.ae_after_palatal', EOF, '(?<=ʧ|ʤ)/æ(?=(?:j|{nasal}))', 'j/ɛ', '/æ/ > /jɛ/ after /ʧ/ or /ʤ/ and followed by a nasal or /j/, or /aj/ before nasals if not preceeded by /j/, otherwise /ɛ/.'),
+    Rule('eof.ae_before_nasal', EOF, '(?<!j)/æ(?={nasal})', '/aj'),
+    Rule('eof.ae', EOF, 'æ', 'ɛ', vowels=('-æ',)),
+
+    Rule('eof.aw', EOF, 'aw', 'ɔ', '/aw/ > /ɔ/.'),
+
+    Rule('eof.degemination', EOF, '({C-r})\\1', '\\1', 'Loss of gemination accept for /rr/.'),
+
+    # TODO: I'm assuming this also happens to affricates based on /ʣ/ not being listed in the deaffrication step which happens later in combination with the following step in which it deaffricates to /z/. Otherwise, this sound would still exist in modern French.
+    Rule('eof.final_devoicing_b', EOF, 'b$', 'p', 'Final stops and fricatives devoiced.'),
+    Rule('eof.final_devoicing_v', EOF, 'v$', 'f'),
+    Rule('eof.final_devoicing_d', EOF, 'd$', 't'),
+    Rule('eof.final_devoicing_dh', EOF, 'ð$', 'θ'),
+    Rule('eof.final_devoicing_z', EOF, 'z$', 's'),
+    Rule('eof.final_devoicing_dz', EOF, 'ʣ$', 'ʦ'),
+    Rule('eof.final_devoicing_g', EOF, 'g$', 'k', consonants=('+θ',)),
+
+    Rule('eof.dz', EOF, 'ʣ(?!$)', 'z', '/ʣ/ > /z/ when not final.', consonants=('-ʣ',)),
+
+    Rule('eof.t_insertion', EOF, '(ɲ|ʎ)s', '\\1ʦ', '/t/ inserted between /ɲ/, /ʎ/ and following /s/.'),
+
+    # TODO: Based on examples, it looks like it happens to /ɲ/ when followed by consonants also.
+    Rule('eof.n_depalatalization_before_consonant', EOF, 'ɲ(?={C})', 'jn', 'Depalatalization of /ɲ/, /ʎ/ when following a consonant or final.'),
+    Rule('eof.n_depalatalization', EOF, '(?<={C-j})ɲ|(?<!j)ɲ$', 'jn'),
+    Rule('eof.l_depalatalization', EOF, '(?<={C})ʎ|ʎ$', 'l'),
+
+    Rule('eof.triphthong_i', EOF, 'j(/?)(?:a|ɛ|e)j', '\\1i', '/jaj/, /jɛj/, /jej/ > /i/ and /wɔj/ > /uj/.'),
+    Rule('eof.triphthong_uj', EOF, 'w(/?)ɔj', '\\1uj'),
+
+    # TODO: I think this occurs for unstressed /a/s in other places too, but need examples.
+    Rule('eof.final_a', EOF, 'a$', 'ə', 'Final /a/ > /ə/.'),
+
+    # Old French.
+
+    Rule('of.final_cluster_reduction', OF, '(?:f|p|k)(?=s$|t$)', '', 'Loss of /f/, /p/, /k/ before final /s/, /t/.'),
+
+    Rule('of.low_nasalization', OF, '((?:a|e|o|ɛ|ɔ|ɑ)(?:w|j)?)(?={nasal})', '\\1~', 'Nasalization of low vowels before all nasals.', date=950),
+
+    Rule('of.ej', OF, 'ej(?!~)', 'oj', '/ej/ > /oj/ (blocked by nasalization).'),
+
+    Rule('of.ow', OF, 'ow(?!p|b|v|f|m|~)', 'ew', '/ow/ > /ew/ (blocked by labials and nasalization).'),
+
+    Rule('of.wo', OF, 'w(/?)ɔ(?!~)', 'w\\1ɛ', '/wɔ/ > /wɛ/ (blocked by nasalization).'),
+
+    Rule('of.a_backing', OF, 'a(?=s|z)', 'ɑ', '/a/ > /ɑ/ before /s/ or /z/.', vowels=('+ɑ',)),
+
+    Rule('of.dental_fricative_loss', OF, 'θ|ð', '', 'Loss of /θ/ and /ð/. When it results in a hiatus of /a/ with a following vowel, the /a/ becomes /ə/.'),
+    Rule('of.a_hiatus', OF, 'a(?={V})', 'ə', consonants=('-θ', '-ð')),
+
+    Rule('of.kw', OF, 'kʷ', 'k', '/kʷ/ > /k/ and /gʷ/ > /g/.'),
+    Rule('of.gw', OF, 'gʷ', 'g', consonants=('-kʷ', '-gʷ')),
+
+    Rule('of.u_fronting', OF, 'u', 'y', '/u/ > /y/.', vowels=('+y',), date=1000),
+
+    Rule('of.stressed_nasal_e_merge', OF, '(?<!j)/(?:e|ɛ)(?=~)', '/a', 'Merge of /e~/ and /ɛ~/ to /a~/, but not in /jɛ~/ or /ej~/.'),
+    Rule('of.nasal_e_merge', OF, '(?<!j|/)(?:e|ɛ)(?=~)', 'a'),
+
+    Rule('of.high_nasalization', OF, '({high}(?:w|j)?)(?={nasal})', '\\1~', 'Nasalization of high vowels before all nasals.'),
+
+    Rule('of.e_hiatus', OF, '(?:e|ɛ)(?=/{V}|(?:w|j)/{V})', 'ə', 'Reduction of /e/ and /ɛ/ in hiatus to /ə/.'),
+
+    # TODO: What about /rɲ/?
+    Rule('of.final_rn', OF, 'r(?:n|m)$', 'r', 'Final /rn/, /rm/ > /r/.'),
+
+    # Late Old French.
+
+    Rule('lof.o_raising', LOF, 'o(?!j)', 'u', '/o/ > /u/.'),
+
+    Rule('lof.open_o_raising', LOF, 'ɔ(?=s|z)', 'o', '/ɔ/ > /o/ before /s/ or /z/.'),
+
+    Rule('lof.oe', LOF, 'w(/?)ɛ|ew', '\\1œ', '/wɛ/, /ew/ > /œ/, but /ø/ before /s/, /z/, or /t/ and /jœ/ before /ɫ/ when not after a labial or velar.'),
+    Rule('lof.stressed_oe_breaking', LOF, '(?<!{labial}|{velar})/œ(?=ɫ)', 'j/œ'),
+    Rule('lof.oe_breaking', LOF, '(?<!{labial}|{velar}|/)œ(?=ɫ)', 'jœ'),
+    Rule('lof.oe_closing', LOF, 'œ(?=s|z|t)', 'ø', vowels=('+ø', '+œ')),
+
+    # TODO: I'll probably add more as I encounter them.
+    Rule('lof.yj', LOF, '(/?)yj', 'ɥ\\1i', 'Stress shift to second element of diphthongs.'),
+    Rule('lof.y_glide', LOF, 'y(?=/?{V})', 'ɥ', consonants=('+ɥ',)),
+
+    Rule('lof.oj', LOF, '(/?)(?:o|ɔ)j', 'w\\1ɛ', '/oj/, /ɔj/ > /wɛ/.'),
+
+    # TODO: I'm marking /ɛ/ which evolve from /aj/ with "E", as it apparently evolves differently from other /ɛ/s.
+    Rule('lof.aj', LOF, 'aj', 'E', '/aj/ > /ɛ/.', vowels=('+E',)),
+
+    Rule('lof.closed_e', LOF, 'e(?={C-j-ɫ}{2,}|{C-j-ɫ}$)', 'ɛ', 'Closed /e/ > /ɛ/.'),
+
+    Rule('lof.ts', LOF, 'ʦ', 's', 'Deaffrication.', date=1250),
+    Rule('lof.tsh', LOF, 'ʧ', 'ʃ'),
+    Rule('lof.dzh', LOF, 'ʤ', 'ʒ', consonants=('-ʦ', '-ʧ', '-ʤ', '+ʃ', '+ʒ')),
+
+    Rule('lof.l_vocalization', LOF, 'ɫ', 'w', '/ɫ/ > /w/.'),
+
+    Rule('lof.s_loss', LOF, 's(?={C-j-w-ɥ})', ':', 'Loss of /s/ before consonants with lengthening of preceeding vowel.'),
+
+    # Middle French.
+
+    # TODO: I'm going to assume the other vowel + /w/ (from vowel + /ɫ/) combinations take affect here as well.
+    Rule('mf.aw', MF, 'aw', 'o', '/aw/ > /o/ (from previous /aɫ/).'),
+    Rule('mf.stressed_ew', MF, '(?<!j)/ɛw', '/o'),
+    Rule('mf.ew', MF, '(?<!j|/)ɛw', 'o'),
+    Rule('mf.front_w', MF, '(?:ɛ|e|œ)w', 'œ'),
+    Rule('mf.oe_closing', MF, 'œ(?=s|z|t)', 'ø'),
+    Rule('mf.uw', MF, 'uw', 'u'),
+
+    Rule('mf.ej', MF, 'ej', 'ɛ', '/ej/ > /ɛ/.'),
+
+    Rule('mf.nasal_u', MF, 'u~', 'ɔ~', 'Nasal /u~/ > /ɔ~/.'),
+
+    Rule('mf.denasalization', MF, '~(?={nasal}(?:/?{V}|j|w))', '', 'Denasalization of open vowels.'),
+
+    Rule('mf.nasal_loss', MF, '(?<=~){nasal}', '', 'Loss of nasals after nasal vowels.'),
+
+    # Early Modern French.
+
+    Rule('emf.length_loss', EMF, ':', '', 'Loss of long vowels.'),
+
+    # TODO: Wikipedia isn't very specific regarding which consonants are lost. Based on examples, it looks like /r/, /l/, /f/ and /k/ remain. Beyond that, I need to refer to other sources. For now, I'm going to just assume all other consonants except those that form diphthongs. Addtionally, based on examples, /l/ does appear to be lost after high vowels, however, I've seen one example, /nu:llum/ > /nyl/, which suggests it's not always true. One source suggested that examples like this are the exception, based on influence from Latin.
+    Rule('emf.final_consonant_loss', EMF, '(?<!{C-f-k-r-l-j-w-ɥ}){C-f-k-r-l-j-w-ɥ}+$', '', 'Loss of final consonants. This actually started in Middle French, but it was based on external sandhi.'),
+    Rule('emf.final_l_loss', EMF, '(?<={high})l$', ''),
+
+    # TODO: Wikipedia doesn't indicate when it becomes /ɛ/. I need to check other sources. Based on examples, it also appears to be blocked by nasalization.
+    Rule('emf.we', EMF, 'w(/?)ɛ(?!~)', 'w\\1a', '/wɛ/ > /wa/ or sometimes /ɛ/.'),
+
+    Rule('emf.ow', EMF, 'ɔw', 'u', '/ɔw/ > /u/.'),
+
+    Rule('emf.h_loss', EMF, 'h', '', 'Loss of /h/. It reemerged in borrowings from Germanic languages.', consonants=('-h',)),
+
+    # Modern French.
+
+    Rule('mod.uvular_r', MOD, 'r', 'ʁ', '/r/ > /ʁ/.', consonants=('-r', '+ʁ'), date=1700),
+
+    Rule('mod.palatal_l', MOD, 'ʎ', 'j', '/ʎ/ merges with /j/.'),
+
+    # TODO: Handling all possible resulting consonant clusters sounds like a huge pain, so for now I'm going to just remove all of them and then chalk it up to "use your best judgement".
+    Rule('mod.schwa_loss', MOD, 'ə', '', 'Loss of /ə/ unless it results in an invalid consonant cluster.'),
+
+    Rule('mod.nasal_lowering', MOD, '(?:i|e|y)(?=~)', 'ɛ', 'Lowering of nasal /i~/, /e~/ to /ɛ~/. In the 20th century, this has started to happen with /y~/, which originally shifted to /œ~/. As such, I\'ve implemented this change as well.'),
+
+    Rule('mod.a_merge', MOD, 'ɑ', 'a', 'Merge of /ɑ/ with /a/.'),
+
+    Rule('mod.nasal_a', MOD, 'a~', 'ɑ~', 'Nasal /a~/ shifts to /ɑ~/.'),
+
+    Rule('mod.final_open_o', MOD, 'ɔ$', 'o', 'Final /ɔ/ > /o/, /ɛ/ > /e/, /œ/ > /ø/.'),
+    Rule('mod.final_open_e', MOD, 'ɛ$', 'e'),
+    Rule('mod.final_oe', MOD, 'œ$', 'ø'),
+    Rule('mod.E', MOD, 'E', 'ɛ', vowels=('-E',)),
+]
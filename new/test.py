@@ -1,4 +1,19 @@
 import french_converter
+import batch
+import concurrent.futures
+import dead_rules
+import features
+import fuzz
+import codegen
+import rules
+import threading
+import transducer
+
+try:
+    import vectorized
+except ImportError:
+    # NumPy is only needed for the vectorized engine.
+    vectorized = None
 
 tests = {
     'p/artem': 'p/aʁ',
@@ -129,4 +144,178 @@ if __name__ == '__main__':
     for k, v in tests.items():
         if (result := french_converter.evolve(k)) != v:
             print(f'Error evolving {k} - expected {v} but got {result}')
+
+    # Every rule compiled with the re module has to behave exactly as it does with the regex module, and the internal encoding mustn't change anything.
+    regex_only = french_converter.compile_rules(rules.load_rules(), backend='regex', encode=False)
+    for k in tests:
+        result = k
+        for stage in rules.Stage:
+            result = french_converter.run_stage(stage, result, rulebook=regex_only)
+        if result != french_converter.evolve(k):
+            print(f'Backends differ on {k} - regex gives {result} but auto gives {french_converter.evolve(k)}')
+
+    # Every stage's form has to be what running the stages one at a time gives, in a batch as well.
+    columns = batch.BufferCascade().evolve_stages(tests)
+    for i, k in enumerate(tests):
+        forms = french_converter.evolve_stages(k)
+        result = k
+        for stage in rules.Stage:
+            result = french_converter.run_stage(stage, result)
+            if forms[stage] != result or columns[stage][i] != result:
+                print(f'Stage forms differ on {k} at {stage.name} - expected {result} but got {forms[stage]} and {columns[stage][i]}')
+
+    # Entering at a later stage has to pick up where the earlier stages left off, and stopping early has to give that stage's form.
+    for k in tests:
+        forms = list(french_converter.evolve_stages(k))
+        for stage in rules.Stage:
+            if (result := french_converter.evolve(forms[stage - 2] if stage > 1 else k, start=stage)) != tests[k]:
+                print(f'Entering at {stage.name} differs on {k} - expected {tests[k]} but got {result}')
+            if (result := french_converter.evolve(k, stop=stage)) != forms[stage - 1]:
+                print(f'Stopping at {stage.name} differs on {k} - expected {forms[stage - 1]} but got {result}')
+
+    # Splitting the cascade at any year, evolving up to the year before and entering in the year itself, has to give the same result as running it whole.
+    for k in tests:
+        for year in range(100, 1950, 50):
+            if (result := french_converter.evolve(french_converter.evolve(k, until=year - 1), entered=year)) != tests[k]:
+                print(f'Splitting in {year} differs on {k} - expected {tests[k]} but got {result}')
+
+    # The same goes for splitting it between any two rules, given by id.
+    ids = [compiled.rule.id for stage in french_converter.default_engine().rulebook.values() for compiled in stage.rules]
+    for k in tests:
+        for before, after in list(zip(ids, ids[1:]))[::10]:
+            if (result := french_converter.evolve(french_converter.evolve(k, until=before), entered=after)) != tests[k]:
+                print(f'Splitting between {before} and {after} differs on {k} - expected {tests[k]} but got {result}')
+
+    # A rule which was dropped as dead is still a point of the cascade, both to split it at and to stop at, where it has to agree with the full rules.
+    full = french_converter.Engine(french_converter.compile_rules(rules.load_rules()))
+    for dead in dead_rules.dead_rules():
+        for k in tests:
+            if (result := french_converter.evolve(french_converter.evolve(k, until=dead.rule.id), entered=dead.rule.id)) != tests[k]:
+                print(f'Splitting at dropped rule {dead.rule.id} differs on {k} - expected {tests[k]} but got {result}')
+            if (result := french_converter.evolve(k, until=dead.rule.id)) != (expected := full.evolve(k, until=dead.rule.id)):
+                print(f'Stopping at dropped rule {dead.rule.id} differs on {k} - expected {expected} but got {result}')
+
+    # Evolving a batch has to give the same results in the same order, with every repeated word only evolved once.
+    stats: list[french_converter.Throughput] = []
+    words = list(tests) * 3
+    for lazy in (False, True):
+        for k, result in zip(words, list(french_converter.evolve_many(words, lazy, stats.append))):
+            if result != tests[k]:
+                print(f'evolve_many differs on {k} - expected {tests[k]} but got {result}')
+    if [(s.words, s.unique) for s in stats] != [(len(words), len(tests))] * 2:
+        print(f'evolve_many reported {stats}')
+
+    # A cached engine has to give the same results, and hit the cache for every word it has already seen with the same rules.
+    for policy in ('lru', 'lfu'):
+        cache = french_converter.ResultCache(len(tests), policy)
+        cached = french_converter.Engine(french_converter.default_engine().rulebook, cache=cache)
+        for k in list(tests) * 2:
+            if (result := cached.evolve(k)) != tests[k]:
+                print(f'Engine with an {policy} cache differs on {k} - expected {tests[k]} but got {result}')
+        # Neither other rules nor a timeout can be served results cached without them.
+        french_converter.Engine(regex_only, cache=cache).evolve('p/artem')
+        french_converter.Engine(cached.rulebook, timeout=1.0, cache=cache).evolve('p/artem')
+        if cache.info() != (len(tests), len(tests) + 2, len(tests), len(tests)):
+            print(f'Engine with an {policy} cache reported {cache.info()}')
+    # With room for two words, LRU evicts the one used longest ago and LFU the one used least often.
+    for policy, kept in (('lru', 'b/ene'), ('lfu', 'p/artem')):
+        cache = french_converter.ResultCache(2, policy)
+        for k in ('p/artem', 'p/artem', 'p/artem', 'b/ene', 'm/are'):
+            if cache.get(k) is None:
+                cache.put(k, tests[k])
+        if cache.get(kept) is None:
+            print(f'{policy} cache evicted {kept}')
+
+    # The optimized engine has to agree with the converter as it was originally written, on random words as well as the test words.
+    # Some words are built to stress single rules, like long clusters before a final /er/.
+    reference = fuzz.ReferenceCascade()
+    for k in list(tests) + fuzz.generate_words(0, 500) + ['umulrtsger', 'ɲəjkasnltver', 'p/akstrmor']:
+        if (result := french_converter.evolve(k)) != reference.evolve(k):
+            print(f'Engine differs from the reference on {k} - expected {reference.evolve(k)} but got {result}')
+        if (forms := list(french_converter.evolve_stages(k))) != (expected := reference.evolve_stages(k)):
+            print(f'Stage forms differ from the reference on {k} - expected {expected} but got {forms}')
+
+    # A timeout mustn't change anything unless a rule runs out of time, which it has to report.
+    timed = french_converter.Engine(timeout=1.0)
+    for k, v in tests.items():
+        if (result := timed.evolve(k)) != v:
+            print(f'Engine with a timeout differs on {k} - expected {v} but got {result}')
+    try:
+        french_converter.Engine(timeout=0.0).evolve('p/artem' * 2000)
+        print('Engine with a timeout of 0 didn\'t time out')
+    except french_converter.RuleTimeoutError as e:
+        if e.rule_id not in {rule.id for rule in rules.load_rules().rules}:
+            print(f'Timeout names unknown rule {e.rule_id}')
+
+    # Reloading rules which haven't changed has to keep the engine, and with it everything cached for it.
+    current = french_converter.default_engine()
+    if french_converter.reload_rules().result() is not current or french_converter.default_engine() is not current:
+        print('Reloading unchanged rules replaced the engine')
+
+    # The rules the engine drops as dead can't match anything.
+    counts = dead_rules.profile(tests)
+    for rule, reason, _ in dead_rules.dead_rules():
+        if counts[rule.id]:
+            print(f'Dead rule {rule.id} matched {counts[rule.id]} words, though {reason}')
+
+    # A single engine has to give the same results when it's shared between threads.
+    engine = french_converter.Engine()
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        for k, result in zip(list(tests) * 20, executor.map(engine.evolve, list(tests) * 20)):
+            if result != tests[k]:
+                print(f'Shared engine differs on {k} - expected {tests[k]} but got {result}')
+
+    # Every phoneme the inventories ever contain needs features, and the bit tests have to agree with the resolved classes.
+    for stage in rules.Stage:
+        consonants, vowels = engine.inventory(stage)
+        for name in features.CLASSES:
+            members = features.natural_class(name, consonants, vowels)
+            for phoneme in consonants + vowels:
+                if features.in_class(phoneme, name) != (phoneme in members):
+                    print(f'Natural class {name} disagrees on {phoneme} at {stage.name}')
+
+    cascade = transducer.TransducerCascade()
+    for k in tests:
+        if (result := cascade.evolve(k)) != french_converter.evolve(k):
+            print(f'Transducer differs on {k} - got {result} but evolve gives {french_converter.evolve(k)}')
+
+    # Running out of states, even in the middle of a word, mustn't change the results, and the cap mustn't be exceeded.
+    cascade = transducer.TransducerCascade(max_states=300)
+    for k in list(tests) * 2:
+        if (result := cascade.evolve(k)) != french_converter.evolve(k):
+            print(f'Transducer with few states differs on {k} - got {result} but evolve gives {french_converter.evolve(k)}')
+        if cascade.size > cascade.max_states:
+            print(f'Transducer has {cascade.size} states, more than its cap of {cascade.max_states}')
+
+    for k, expected, result in codegen.check(codegen.load(codegen.generate()), list(tests)):
+        print(f'Generated module differs on {k} - got {result} but evolve gives {expected}')
+
+    for k, result in zip(tests, batch.BufferCascade().evolve(tests)):
+        if result != french_converter.evolve(k):
+            print(f'Batch mode differs on {k} - got {result} but evolve gives {french_converter.evolve(k)}')
+
+    for k, result in zip(tests, batch.evolve_threaded(tests, workers=4, chunk_size=16)):
+        if result != tests[k]:
+            print(f'Threaded batch mode differs on {k} - expected {tests[k]} but got {result}')
+
+    for k, result in zip(tests, batch.evolve_parallel(tests, processes=2, chunksize=16)):
+        if result != tests[k]:
+            print(f'Parallel batch mode differs on {k} - expected {tests[k]} but got {result}')
+
+    # With another thread running, the workers mustn't be forked, and have to compile the rules themselves.
+    running = threading.Event()
+    thread = threading.Thread(target=running.wait)
+    thread.start()
+    if batch.pool_context().get_start_method() == 'fork':
+        print('Worker processes are forked while another thread is running')
+    for k, result in zip(tests, batch.evolve_parallel(tests, processes=2, chunksize=16)):
+        if result != tests[k]:
+            print(f'Parallel batch mode with another thread running differs on {k} - expected {tests[k]} but got {result}')
+    running.set()
+    thread.join()
+
+    if vectorized is not None:
+        for k, result in zip(tests, vectorized.VectorizedCascade().evolve(list(tests))):
+            if result != french_converter.evolve(k):
+                print(f'Vectorized engine differs on {k} - got {result} but evolve gives {french_converter.evolve(k)}')
     # print(french_converter.evolve('sek/u:rum', True))
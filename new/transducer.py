@@ -0,0 +1,324 @@
+'''
+An experimental engine which runs the cascade as finite-state transducers.
+
+Every rule whose pattern can only look a bounded distance around the position it's tried at is a rewrite rule over a finite alphabet, and so can be run as a
+transducer which reads the word one character at a time, keeping a window of the characters before the current position and a buffer of the ones after it.
+Consecutive rules of this kind are composed into a single transducer. Its transitions are worked out lazily by feeding each character through the rules in
+turn, and then cached. Rules with unbounded lookarounds, like the vowel loss rules, fall back to a regex pass between two transducers.
+
+The transducers aren't compiled ahead of time. A state is the window and buffer of every rule, and some rules look up to eleven characters ahead, so over
+an alphabet of about fifty characters there are far too many states to build, let alone minimize. The states are only numbered as words reach them,
+so their number grows with the variety of the words, and a word whose states haven't all been reached is run through every rule one character at a time.
+That's many times slower than french_converter.evolve() (see benchmark.bench_transducer()), so this engine only pays off on a small vocabulary it has
+mostly seen before, and it isn't the one pass in linear time a compiled transducer would be. The number of states is capped across the whole cascade, so
+its memory stays bounded in a long-running process (each state takes about a kilobyte): a transducer which runs out of its share throws away its states
+and cached transitions, and starts numbering them again from the state it's in.
+'''
+
+import analysis
+import french_converter
+from french_converter import CompiledRule, CompiledStage, Step
+from rules import Stage
+from typing import Optional, Union
+
+# The state of a single rule: the characters before the current position (see RuleTransducer), the characters after it which haven't been decided yet, and
+# whether an empty match has just been replaced at the current position.
+_RuleState = tuple[str, str, bool]
+
+class RuleTransducer:
+    '''
+    A single rule run as a transducer. At each position, the rule's pattern is tried against the window and the buffer, which together contain everything
+    the pattern can look at, so the result is exactly that of the pattern's sub() method.
+    '''
+
+    def __init__(self, compiled: CompiledRule) -> None:
+        '''
+        Parameters
+        ----------
+        compiled : CompiledRule
+            The rule. Its pattern has to be expressible (see expressible()).
+        '''
+
+        low, high, behind, ahead = analysis.reach(compiled.pattern.pattern)
+        self.rule = compiled.rule
+        self.pattern = compiled.pattern
+        self.repl = compiled.rule.repl
+        self.literal = '\\' not in self.repl
+        # The window always holds at least one character once the word has started, so that '^' can't match anywhere but at the start.
+        self.behind = max(behind, 1)
+        # The buffer holds one more character than the pattern can look at, so that '$' can't match anywhere but at the end.
+        self.ahead = ahead
+        self.empty = high == 0
+
+    @staticmethod
+    def expressible(compiled: CompiledRule) -> bool:
+        '''
+        Checks whether a rule can be run as a transducer. Its pattern can't look an unbounded distance in either direction, and either always or never
+        matches the empty string.
+
+        Parameters
+        ----------
+        compiled : CompiledRule
+            The rule to check.
+
+        Returns
+        -------
+        bool
+            True if the rule can be run as a transducer.
+        '''
+
+        reach = analysis.reach(compiled.pattern.pattern)
+        return reach is not None and (reach[0] > 0 or reach[1] == 0)
+
+    def _decide(self, state: _RuleState, out: list[str]) -> _RuleState:
+        '''
+        Tries the pattern at the current position and moves past it.
+        '''
+
+        window, buffer, advance = state
+        match = None if advance and self.empty else self.pattern.match(window + buffer, len(window))
+        if match is None:
+            out.append(buffer[0])
+            return (window + buffer[0])[-self.behind:], buffer[1:], False
+        out.append(self.repl if self.literal else match.expand(self.repl))
+        width = match.end() - match.start()
+        if width == 0:
+            return window, buffer, True
+        return (window + buffer[:width])[-self.behind:], buffer[width:], False
+
+    def step(self, state: _RuleState, char: str) -> tuple[_RuleState, str]:
+        '''
+        Feeds a character to the rule.
+
+        Parameters
+        ----------
+        state : _RuleState
+            The current state.
+        char : str
+            The next character of the word.
+
+        Returns
+        -------
+        tuple[_RuleState, str]
+            The new state and the output.
+        '''
+
+        window, buffer, advance = state
+        state = window, buffer + char, advance
+        out: list[str] = []
+        while len(state[1]) > self.ahead:
+            state = self._decide(state, out)
+        return state, ''.join(out)
+
+    def flush(self, state: _RuleState) -> str:
+        '''
+        Finishes the word.
+
+        Parameters
+        ----------
+        state : _RuleState
+            The current state.
+
+        Returns
+        -------
+        str
+            The rest of the output.
+        '''
+
+        out: list[str] = []
+        while state[1]:
+            state = self._decide(state, out)
+        window, _, advance = state
+        if self.empty and not advance and (match := self.pattern.match(window, len(window))):
+            out.append(self.repl if self.literal else match.expand(self.repl))
+        return ''.join(out)
+
+class Transducer:
+    '''
+    The composition of a sequence of rule transducers. The states of the composition are numbered as they're discovered, and its transitions are cached,
+    up to a maximum number of states.
+    '''
+
+    def __init__(self, rules: list[RuleTransducer], max_states: int) -> None:
+        '''
+        Parameters
+        ----------
+        rules : list[RuleTransducer]
+            The rules, in order.
+        max_states : int
+            The number of states after which the states and cached transitions are thrown away (see reset()).
+        '''
+
+        self.rules = rules
+        self.max_states = max(max_states, 2)
+        self._start: tuple[_RuleState, ...] = tuple(('', '', False) for _ in rules)
+        self.reset()
+
+    def reset(self) -> None:
+        '''
+        Throws away every state but the start state, along with the cached transitions.
+        '''
+
+        self._states: list[tuple[_RuleState, ...]] = [self._start]
+        self._ids: dict[tuple[_RuleState, ...], int] = {self._start: 0}
+        self._transitions: dict[tuple[int, str], tuple[int, str]] = {}
+        self._finals: dict[int, str] = {}
+
+    def _id(self, states: tuple[_RuleState, ...]) -> int:
+        '''
+        Returns the number of a state of the composition, numbering it if it's new. If there's no room for it, every other state is thrown away first.
+        '''
+
+        number = self._ids.get(states)
+        if number is None:
+            if len(self._states) >= self.max_states:
+                self.reset()
+            number = self._ids[states] = len(self._states)
+            self._states.append(states)
+        return number
+
+    def _transition(self, state: int, char: str) -> tuple[int, str]:
+        '''
+        Works out a transition by feeding the character through every rule in turn.
+        '''
+
+        states = list(self._states[state])
+        chars = char
+        for i, rule in enumerate(self.rules):
+            out: list[str] = []
+            for c in chars:
+                states[i], produced = rule.step(states[i], c)
+                out.append(produced)
+            chars = ''.join(out)
+        # If numbering the new state resets the transducer, the transition from the old state is stored in the table which was thrown away.
+        transitions = self._transitions
+        result = transitions[state, char] = (self._id(tuple(states)), chars)
+        return result
+
+    def _final(self, state: int) -> str:
+        '''
+        Works out the output at the end of the word by flushing every rule in turn.
+        '''
+
+        states = list(self._states[state])
+        chars = ''
+        for i, rule in enumerate(self.rules):
+            out: list[str] = []
+            for c in chars:
+                states[i], produced = rule.step(states[i], c)
+                out.append(produced)
+            out.append(rule.flush(states[i]))
+            chars = ''.join(out)
+        self._finals[state] = chars
+        return chars
+
+    @property
+    def size(self) -> int:
+        '''
+        The number of states discovered so far.
+        '''
+
+        return len(self._states)
+
+    def __call__(self, word: str) -> str:
+        '''
+        Runs the word through the transducer.
+
+        Parameters
+        ----------
+        word : str
+            The word to transduce.
+
+        Returns
+        -------
+        str
+            The output.
+        '''
+
+        transitions = self._transitions
+        state = 0
+        out: list[str] = []
+        for char in word:
+            transition = transitions.get((state, char))
+            if transition is None:
+                transition = self._transition(state, char)
+                transitions = self._transitions
+            state, produced = transition
+            out.append(produced)
+        final = self._finals.get(state)
+        if final is None:
+            final = self._final(state)
+        out.append(final)
+        return ''.join(out)
+
+class TransducerCascade:
+    '''
+    The cascade as a sequence of transducers, with regex passes for the rules which can't be expressed as transducers. This engine is experimental.
+    '''
+
+    def __init__(self, rulebook: Optional[dict[Stage, CompiledStage]] = None, per_stage: bool = False, max_states: int = 50_000) -> None:
+        '''
+        Parameters
+        ----------
+        rulebook : dict[Stage, CompiledStage] | None
+            The compiled rules. Defaults to french_converter.compile_rulebook().
+        per_stage : bool
+            If True, each stage is compiled separately, so no transducer spans two stages. Otherwise the transducers span as much of the cascade as they can.
+        max_states : int
+            The number of states of all the transducers together, which is never exceeded. It's shared between the transducers in proportion to the
+            number of rules each of them composes.
+        '''
+
+        self.max_states = max_states
+        rulebook = rulebook or french_converter.compile_rulebook()
+        self.encoding = rulebook[Stage.PROTO_WESTERN_ROMANCE].encoding
+        groups: list[Union[list[RuleTransducer], Step]] = []
+        pending: list[RuleTransducer] = []
+
+        def end_segment() -> None:
+            if pending:
+                groups.append(pending.copy())
+                pending.clear()
+
+        for stage in rulebook.values():
+            for compiled in stage.rules:
+                if RuleTransducer.expressible(compiled):
+                    pending.append(RuleTransducer(compiled))
+                else:
+                    end_segment()
+                    groups.append(french_converter.plan_steps([compiled])[0])
+            if per_stage:
+                end_segment()
+        end_segment()
+        total = sum(len(group) for group in groups if isinstance(group, list))
+        self.segments: list[Union[Transducer, Step]] = [Transducer(group, max_states * len(group) // total) if isinstance(group, list) else group
+                                                        for group in groups]
+        self.transducers = [segment for segment in self.segments if isinstance(segment, Transducer)]
+
+    @property
+    def size(self) -> int:
+        '''
+        The number of states of all the transducers together.
+        '''
+
+        return sum(transducer.size for transducer in self.transducers)
+
+    def evolve(self, word: str) -> str:
+        '''
+        Simulates the sounds changes that occurred between Latin and French and returns the result. See french_converter.evolve().
+
+        Parameters
+        ----------
+        word : str
+            The word to apply the sound changes to.
+
+        Returns
+        -------
+        str
+            The evolved word.
+        '''
+
+        word = self.encoding.encode(word)
+        for segment in self.segments:
+            word = segment(word) if isinstance(segment, Transducer) else segment.apply(word)
+        return self.encoding.decode(word)
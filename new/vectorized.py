@@ -0,0 +1,516 @@
+'''
+An alternative engine which evolves a whole batch of words at once with NumPy. The words are stored as the rows of a matrix of character codes (in the
+internal encoding, so every character fits in a byte), padded with zeros, along with a vector of their lengths.
+
+Most steps replace single characters depending on a bounded context, like the lenition rules. A step like that is evaluated for every position of every word
+at once: each test its pattern makes becomes a boolean mask over the matrix shifted by the offset of the test, and the masks are combined. As re.sub()
+tries every position against the original word, and the matches of such a step can't overlap, this gives exactly the same result. The matched characters
+are then replaced in place or, if the replacement has a different length, the rows are compacted or expanded. Steps which can't be evaluated this way fall
+back to running the regex over each word.
+'''
+
+import analysis
+import french_converter
+import numpy as np
+from analysis import sre_parse
+from french_converter import CompiledStage, Encoding, Step
+from rules import Stage
+from typing import NamedTuple, Optional, Union
+
+# Expanding the optional and repeated parts of a pattern can produce a lot of alternatives. Patterns which produce more than this aren't vectorized.
+MAX_ALTERNATIVES = 256
+
+class _Set(NamedTuple):
+    '''
+    A test which consumes a single character, given as a lookup table of the codes it accepts.
+    '''
+
+    accepts: np.ndarray
+
+class _Anchor(NamedTuple):
+    '''
+    A zero-width test for the start ('^') or the end ('$') of the word.
+    '''
+
+    start: bool
+
+class _Assert(NamedTuple):
+    '''
+    A lookaround, with the alternatives its pattern expands to.
+    '''
+
+    behind: bool
+    negated: bool
+    alternatives: list[list['_Atom']]
+
+_Atom = Union[_Set, _Anchor, _Assert]
+
+def _lookup(codes: set[int], negated: bool = False) -> np.ndarray:
+    '''
+    Builds the lookup table for a set of character codes. The padding (code 0) is never accepted.
+    '''
+
+    accepts = np.zeros(256, dtype=bool)
+    accepts[[c for c in codes if c < 256]] = True
+    if negated:
+        accepts = ~accepts
+    accepts[0] = False
+    return accepts
+
+def _width(alternative: list[_Atom]) -> int:
+    return sum(isinstance(atom, _Set) for atom in alternative)
+
+def _expand(nodes) -> Optional[list[list[_Atom]]]:
+    '''
+    Expands a sequence of nodes into the fixed-width alternatives it can match, or returns None if it uses anything that can't be expressed this way.
+    '''
+
+    alternatives: list[list[_Atom]] = [[]]
+    for op, av in nodes:
+        if op is sre_parse.LITERAL:
+            options = [[_Set(_lookup({av}))]]
+        elif op is sre_parse.NOT_LITERAL:
+            options = [[_Set(_lookup({av, ord('\n')}, negated=True))]]
+        elif op is sre_parse.ANY:
+            options = [[_Set(_lookup({ord('\n')}, negated=True))]]
+        elif op is sre_parse.IN:
+            negated = bool(av) and av[0][0] is sre_parse.NEGATE
+            chars = analysis.characters(av[1:] if negated else av)
+            if chars is None:
+                return None
+            options = [[_Set(_lookup({ord(c) for c in chars} | ({ord('\n')} if negated else set()), negated))]]
+        elif op is sre_parse.AT:
+            if av in (sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING):
+                options = [[_Anchor(True)]]
+            elif av in (sre_parse.AT_END, sre_parse.AT_END_STRING):
+                options = [[_Anchor(False)]]
+            else:
+                return None
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            inner = _expand(av[1])
+            if inner is None:
+                return None
+            options = [[_Assert(av[0] < 0, op is sre_parse.ASSERT_NOT, inner)]]
+        elif op is sre_parse.SUBPATTERN:
+            options = _expand(av[-1])
+        elif op is sre_parse.BRANCH:
+            options = []
+            for branch in av[1]:
+                expanded = _expand(branch)
+                if expanded is None:
+                    return None
+                options.extend(expanded)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            low, high, child = av
+            expanded = _expand(child)
+            if expanded is None or high >= sre_parse.MAXREPEAT:
+                return None
+            counts: list[list[list[_Atom]]] = []
+            repeated: list[list[_Atom]] = [[]]
+            for count in range(high + 1):
+                if count >= low:
+                    counts.append(repeated)
+                repeated = [a + b for a in repeated for b in expanded]
+                if len(repeated) > MAX_ALTERNATIVES:
+                    return None
+            # The alternatives are kept in the order the regex engine tries them in, so a greedy repeat tries the most repetitions first.
+            if op is sre_parse.MAX_REPEAT:
+                counts.reverse()
+            options = [option for count in counts for option in count]
+        else:
+            return None
+        if options is None:
+            return None
+        alternatives = [a + b for a in alternatives for b in options]
+        if len(alternatives) > MAX_ALTERNATIVES:
+            return None
+    return alternatives
+
+def _reach(alternatives: list[list[_Atom]]) -> int:
+    '''
+    Returns how many columns either side of a position a set of alternatives can look at.
+    '''
+
+    reach = 0
+    for alternative in alternatives:
+        distance = 0
+        for atom in alternative:
+            if isinstance(atom, _Set):
+                distance += 1
+            elif isinstance(atom, _Assert):
+                distance += _reach(atom.alternatives) + (max(map(_width, atom.alternatives), default=0) if atom.behind else 0)
+        reach = max(reach, distance)
+    return reach
+
+class _Vectorized(NamedTuple):
+    '''
+    A step which can be evaluated for all positions at once. Either every alternative is empty, and the replacement is inserted, or every alternative
+    consumes at least one character, and the characters matched are replaced. The alternatives are in the order the regex engine tries them in.
+    '''
+
+    alternatives: list[list[_Atom]]
+    insert: bool
+    # Either the codes the matched characters are replaced with, or a lookup table mapping each matched character to a single code.
+    repl: Union[bytes, np.ndarray]
+    reach: int
+
+def vectorize(step: Step) -> Optional[Union[_Vectorized, np.ndarray]]:
+    '''
+    Works out how to evaluate a step over a whole matrix at once.
+
+    Parameters
+    ----------
+    step : Step
+        The step to vectorize.
+
+    Returns
+    -------
+    _Vectorized | np.ndarray | None
+        For a str.translate step, a lookup table mapping each code to its replacement, where -1 means the character is deleted. For other steps which can
+        be vectorized, a description of the step. None if the step has to be run over each word separately.
+    '''
+
+    if step.pattern is None:
+        table = np.arange(256, dtype=np.int16)
+        for source, target in step.repl.items():
+            if ord(source) > 0xff or (target and ord(target) > 0xff):
+                return None
+            table[ord(source)] = ord(target) if target else -1
+        return table
+    if isinstance(step.repl, str):
+        if '\\' in step.repl or any(ord(c) > 0xff for c in step.repl):
+            return None
+        repl: Union[bytes, np.ndarray] = step.repl.encode('latin-1')
+    else:
+        repl = np.arange(256, dtype=np.uint8)
+        for source, target in step.repl.items():
+            if ord(source) > 0xff or ord(target) > 0xff:
+                return None
+            repl[ord(source)] = ord(target)
+    alternatives = _expand(analysis.parse(step.pattern.pattern))
+    if not alternatives:
+        return None
+    widths = {_width(alternative) for alternative in alternatives}
+    if widths == {0} and isinstance(repl, bytes):
+        return _Vectorized(alternatives, True, repl, _reach(alternatives))
+    if 0 not in widths and (widths == {1} or isinstance(repl, bytes)):
+        return _Vectorized(alternatives, False, repl, _reach(alternatives))
+    return None
+
+def to_array(words: list[str], encoding: Encoding) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Encodes a batch of words as a matrix of character codes.
+
+    Parameters
+    ----------
+    words : list[str]
+        The words to encode.
+    encoding : Encoding
+        The encoding to use. See french_converter.Encoding.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The codes, one word per row, padded with zeros, and the length of each word.
+
+    Raises
+    ------
+    ValueError
+        If a word contains a character which doesn't fit in a byte once encoded, a null character, or a line break.
+    '''
+
+    try:
+        encoded = [encoding.encode(word).encode('latin-1') for word in words]
+    except UnicodeEncodeError as e:
+        raise ValueError(f'Word {e.object!r} can\'t be stored in an array') from None
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    flat = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    if (flat == 0).any() or (flat == ord('\n')).any():
+        raise ValueError('Words stored in an array can\'t contain null characters or line breaks')
+    codes = np.zeros((len(encoded), int(lengths.max(initial=0))), dtype=np.uint8)
+    codes[np.arange(codes.shape[1]) < lengths[:, None]] = flat
+    return codes, lengths
+
+def from_array(codes: np.ndarray, lengths: np.ndarray, encoding: Encoding) -> list[str]:
+    '''
+    Decodes a matrix of character codes back into words. See to_array().
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        The codes.
+    lengths : np.ndarray
+        The length of each word.
+    encoding : Encoding
+        The encoding the codes are in.
+
+    Returns
+    -------
+    list[str]
+        The words.
+    '''
+
+    flat = codes[np.arange(codes.shape[1]) < lengths[:, None]].tobytes().decode('latin-1')
+    ends = np.cumsum(lengths).tolist()
+    words = [flat[start:end] for start, end in zip([0] + ends[:-1], ends)]
+    return [encoding.decode(word) for word in words] if encoding.table else words
+
+class VectorizedCascade:
+    '''
+    The cascade as a sequence of operations over a matrix of character codes, with regex passes over each word for the steps which can't be vectorized.
+    '''
+
+    def __init__(self, rulebook: Optional[dict[Stage, CompiledStage]] = None) -> None:
+        '''
+        Parameters
+        ----------
+        rulebook : dict[Stage, CompiledStage] | None
+            The compiled rules. Defaults to french_converter.compile_rulebook().
+        '''
+
+        self.rulebook = rulebook or french_converter.compile_rulebook()
+        self.encoding = self.rulebook[Stage.PROTO_WESTERN_ROMANCE].encoding
+        # Each step is stored along with how to vectorize it, if it can be, and the codes of each of the clauses of its prefilter.
+        self.steps: list[tuple[Step, Optional[Union[_Vectorized, np.ndarray]], list[np.ndarray]]] = []
+        for stage in self.rulebook.values():
+            for step in stage.steps:
+                self.steps.append((step, vectorize(step), [np.array([ord(c) for c in clause if ord(c) < 256]) for clause in step.requires]))
+
+    @property
+    def coverage(self) -> tuple[int, int]:
+        '''
+        The number of steps which are vectorized and the total number of steps.
+        '''
+
+        return sum(vectorized is not None for _, vectorized, _ in self.steps), len(self.steps)
+
+    @staticmethod
+    def _mask(alternatives: list[list[_Atom]], padded: np.ndarray, lengths: np.ndarray, pad: int, width: int, offset: int,
+              tests: dict[tuple[int, int], np.ndarray]) -> np.ndarray:
+        '''
+        Evaluates a set of alternatives at every position of every word, starting the given number of columns after the position. The alternatives share
+        most of their atoms, so the result of each atom at each offset is cached in tests.
+        '''
+
+        mask = np.zeros((padded.shape[0], width), dtype=bool)
+        for alternative in alternatives:
+            matched = np.ones((padded.shape[0], width), dtype=bool)
+            position = offset
+            for atom in alternative:
+                test = tests.get((id(atom), position))
+                if test is None:
+                    if isinstance(atom, _Set):
+                        test = atom.accepts[padded[:, pad + position:pad + position + width]]
+                    elif isinstance(atom, _Anchor):
+                        here = np.arange(width) + position
+                        test = (here == 0)[None, :] if atom.start else here[None, :] == lengths[:, None]
+                    else:
+                        test = np.zeros_like(matched)
+                        for option in atom.alternatives:
+                            start = position - _width(option) if atom.behind else position
+                            test |= VectorizedCascade._mask([option], padded, lengths, pad, width, start, tests)
+                        if atom.negated:
+                            test = ~test
+                    tests[id(atom), position] = test
+                matched &= test
+                if isinstance(atom, _Set):
+                    position += 1
+            mask |= matched
+        return mask
+
+    @staticmethod
+    def _rebuild(codes: np.ndarray, lengths: np.ndarray, sizes: np.ndarray, fill) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Builds a new matrix in which each position of the old one has been replaced by sizes[row, column] codes. fill(out, rows, offsets) writes the new
+        codes given the offset in the new matrix of each old position.
+        '''
+
+        offsets = np.cumsum(sizes, axis=1) - sizes
+        new_lengths = sizes.sum(axis=1)
+        out = np.zeros((codes.shape[0], int(new_lengths.max(initial=0))), dtype=np.uint8)
+        fill(out, np.broadcast_to(np.arange(codes.shape[0])[:, None], sizes.shape), offsets)
+        return out, new_lengths
+
+    def _apply(self, step: Step, vectorized: Union[_Vectorized, np.ndarray], codes: np.ndarray, lengths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Applies a vectorized step to the matrix.
+        '''
+
+        if isinstance(vectorized, np.ndarray):
+            mapped = vectorized[codes]
+            mapped[codes == 0] = 0
+            deleted = mapped < 0
+            if not deleted.any():
+                return mapped.astype(np.uint8), lengths
+            keep = (codes != 0) & ~deleted
+            out, new_lengths = self._rebuild(codes, lengths, keep.astype(np.int64), lambda out, rows, offsets: out.__setitem__((rows[keep], offsets[keep]), mapped[keep]))
+            return out, new_lengths
+
+        # Evaluate the pattern at every position, including the one after the last character, where an insertion can happen.
+        pad = vectorized.reach
+        width = codes.shape[1] + 1
+        padded = np.zeros((codes.shape[0], width + 2 * pad), dtype=np.uint8)
+        padded[:, pad:pad + codes.shape[1]] = codes
+        inside = np.arange(width)[None, :] < lengths[:, None]
+        extended = padded[:, pad:pad + width]
+        repl = vectorized.repl
+
+        if vectorized.insert:
+            matched = self._mask(vectorized.alternatives, padded, lengths, pad, width, 0, {})
+            matched &= np.arange(width)[None, :] <= lengths[:, None]
+            if not matched.any():
+                return codes, lengths
+            sizes = inside.astype(np.int64) + matched * len(repl)
+
+            def fill(out, rows, offsets):
+                for i, code in enumerate(repl):
+                    out[rows[matched], offsets[matched] + i] = code
+                out[rows[inside], (offsets + matched * len(repl))[inside]] = extended[inside]
+
+            return self._rebuild(codes, lengths, sizes, fill)
+
+        # The length of the match at each position is that of the first alternative which matches there.
+        tests: dict[tuple[int, int], np.ndarray] = {}
+        if len({_width(alternative) for alternative in vectorized.alternatives}) == 1:
+            lengths_matched = self._mask(vectorized.alternatives, padded, lengths, pad, width, 0, tests) * _width(vectorized.alternatives[0])
+        else:
+            lengths_matched = np.zeros((codes.shape[0], width), dtype=np.int64)
+            for alternative in vectorized.alternatives:
+                found = self._mask([alternative], padded, lengths, pad, width, 0, tests) & (lengths_matched == 0)
+                lengths_matched[found] = _width(alternative)
+        matched = lengths_matched > 0
+        if not matched.any():
+            return codes, lengths
+        longest = int(lengths_matched.max())
+        if longest == 1 and (isinstance(repl, np.ndarray) or len(repl) == 1):
+            codes = codes.copy()
+            codes[matched[:, :-1]] = repl[codes[matched[:, :-1]]] if isinstance(repl, np.ndarray) else repl[0]
+            return codes, lengths
+
+        # A match which starts inside another one doesn't happen, as re.sub() carries on after the end of the first. The words in which two matches
+        # overlap are left alone here and run through the regex afterwards.
+        covered = np.zeros_like(matched)
+        for distance in range(1, longest):
+            covered[:, distance:] |= lengths_matched[:, :-distance] > distance
+        overlapping = np.flatnonzero((covered & matched).any(axis=1))
+        matched[overlapping] = False
+        covered[overlapping] = False
+        kept = inside & ~matched & ~covered
+        sizes = kept.astype(np.int64) + matched * len(repl)
+
+        def fill(out, rows, offsets):
+            out[rows[kept], offsets[kept]] = extended[kept]
+            for i, code in enumerate(repl):
+                out[rows[matched], offsets[matched] + i] = code
+
+        codes, lengths = self._rebuild(codes, lengths, sizes, fill)
+        return self._run(step, codes, lengths, overlapping) if overlapping.size else (codes, lengths)
+
+    @staticmethod
+    def _run(step: Step, codes: np.ndarray, lengths: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Runs a step which can't be vectorized over each of the given rows and writes back the ones it changes.
+        '''
+
+        words = from_array(codes[rows], lengths[rows], Encoding({}))
+        results = [step.apply(word) for word in words]
+        changed = [i for i, (word, result) in enumerate(zip(words, results)) if result != word]
+        if not changed:
+            return codes, lengths
+        return VectorizedCascade._write(codes, lengths, rows[changed], *to_array([results[i] for i in changed], Encoding({})))
+
+    @staticmethod
+    def _write(codes: np.ndarray, lengths: np.ndarray, rows: np.ndarray, new_codes: np.ndarray, new_lengths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Replaces the given rows of the matrix, widening it if needed.
+        '''
+
+        if new_codes.shape[1] > codes.shape[1]:
+            codes = np.pad(codes, ((0, 0), (0, new_codes.shape[1] - codes.shape[1])))
+        else:
+            codes = codes.copy()
+        lengths = lengths.copy()
+        codes[rows] = 0
+        codes[rows, :new_codes.shape[1]] = new_codes
+        lengths[rows] = new_lengths
+        return codes, lengths
+
+    def evolve_array(self, codes: np.ndarray, lengths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Simulates the sound changes that occurred between Latin and French on a batch of words stored as a matrix (see to_array()).
+
+        Parameters
+        ----------
+        codes : np.ndarray
+            The codes of the words, one word per row, padded with zeros.
+        lengths : np.ndarray
+            The length of each word.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            The codes and lengths of the evolved words.
+        '''
+
+        # Which characters each word contains, kept up to date as the steps change the words.
+        present = np.zeros((codes.shape[0], 256), dtype=bool)
+        present[np.arange(codes.shape[0])[:, None], codes] = True
+        for step, vectorized, clauses in self.steps:
+            # Only the words which contain a character from every clause of the prefilter can be changed by the step, so the step is only run on those.
+            candidates = np.ones(codes.shape[0], dtype=bool)
+            for clause in clauses:
+                candidates &= present[:, clause].any(axis=1)
+            rows = np.flatnonzero(candidates)
+            if not rows.size:
+                continue
+            before, before_lengths = codes[rows], lengths[rows]
+            if vectorized is not None:
+                after, after_lengths = self._apply(step, vectorized, before, before_lengths)
+            else:
+                after, after_lengths = self._run(step, before, before_lengths, np.arange(rows.size))
+
+            # Only write back the words which have changed.
+            common = min(before.shape[1], after.shape[1])
+            changed = (after_lengths != before_lengths) | (after[:, :common] != before[:, :common]).any(axis=1)
+            if not changed.any():
+                continue
+            rows, after, after_lengths = rows[changed], after[changed], after_lengths[changed]
+            codes, lengths = self._write(codes, lengths, rows, after, after_lengths)
+            present[rows] = False
+            present[rows[:, None], after] = True
+        return codes, lengths
+
+    def evolve(self, words: list[str]) -> list[str]:
+        '''
+        Simulates the sound changes that occurred between Latin and French on a batch of words and returns the results. See french_converter.evolve().
+        Words which can't be stored in an array are evolved separately.
+
+        Parameters
+        ----------
+        words : list[str]
+            The words to apply the sound changes to.
+
+        Returns
+        -------
+        list[str]
+            The evolved words, in the same order.
+        '''
+
+        try:
+            codes, lengths = to_array(words, self.encoding)
+        except ValueError:
+            results: list[Optional[str]] = [None] * len(words)
+            batch: list[int] = []
+            for i, word in enumerate(words):
+                try:
+                    to_array([word], self.encoding)
+                    batch.append(i)
+                except ValueError:
+                    result = word
+                    for stage in Stage:
+                        result = french_converter.run_stage(stage, result, rulebook=self.rulebook)
+                    results[i] = result
+            for i, result in zip(batch, self.evolve([words[i] for i in batch])):
+                results[i] = result
+            return results
+        return from_array(*self.evolve_array(codes, lengths), self.encoding)